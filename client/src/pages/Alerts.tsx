@@ -1,10 +1,10 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { Alert } from '../types';
 import { Badge } from '../components/ui/Badge';
 import { Button } from '../components/ui/Button';
 import { X, Bot, Shield, FileText, Search, Filter, Loader2, RefreshCw } from 'lucide-react';
 import { cn } from '../lib/utils';
-import { fetchAlerts } from '../services/api';
+import { fetchAlerts, subscribeFeed } from '../services/api';
 
 const Alerts: React.FC = () => {
     const [alerts, setAlerts] = useState<Alert[]>([]);
@@ -77,11 +77,17 @@ const Alerts: React.FC = () => {
         // setLocalModifications(prev => { const {[selectedAlert.id]: _, ...rest} = prev; return rest; });
     };
 
+    // Ids of alerts pushed since the current load started (newer than its snapshot)
+    const pushedIdsRef = useRef<Set<string>>(new Set());
+    const loadedRef = useRef(false);
+
     // Fetch alerts from API
     const loadAlerts = useCallback(async () => {
+        loadedRef.current = true;
+        const pushed = pushedIdsRef.current = new Set<string>();
         setRefreshing(true);
         try {
-            const data = await fetchAlerts({ limit: 100 });
+            const data = await fetchAlerts({ limit: 100, order: 'desc' });
 
             // Merge backend data with local modifications
             const mergedAlerts = data.map(alert => {
@@ -89,7 +95,12 @@ const Alerts: React.FC = () => {
                 return localMod ? { ...alert, ...localMod } : alert;
             });
 
-            setAlerts(mergedAlerts);
+            // Keep alerts the feed delivered while the request was in flight
+            const fetchedIds = new Set(mergedAlerts.map(a => a.id));
+            setAlerts(prev => [
+                ...prev.filter(a => pushed.has(a.id) && !fetchedIds.has(a.id)),
+                ...mergedAlerts
+            ].slice(0, 100));
             setError(null);
         } catch (err) {
             console.error('Failed to load alerts:', err);
@@ -126,13 +137,29 @@ const Alerts: React.FC = () => {
         return true;
     });
 
-    useEffect(() => {
-        loadAlerts();
+    // Keep the latest loader for the feed's handlers
+    const loadAlertsRef = useRef(loadAlerts);
+    loadAlertsRef.current = loadAlerts;
 
-        // Auto-refresh every 10 seconds
-        const interval = setInterval(loadAlerts, 10000);
-        return () => clearInterval(interval);
-    }, [loadAlerts]);
+    // New alerts are pushed by the backend instead of polled. The feed is
+    // opened first and alerts are loaded once it is positioned (hello), so an
+    // alert created in between arrives over the feed instead of being lost.
+    useEffect(() => {
+        return subscribeFeed({
+            onHello: () => loadAlertsRef.current(),
+            onAlert: (alert) => {
+                pushedIdsRef.current.add(alert.id);
+                setAlerts(prev =>
+                    prev.some(a => a.id === alert.id) ? prev : [alert, ...prev].slice(0, 100)
+                );
+            },
+            onReset: () => loadAlertsRef.current(),
+            onStatusChange: (connected) => {
+                // Feed unreachable: show what the API has until hello arrives
+                if (!connected && !loadedRef.current) loadAlertsRef.current();
+            },
+        });
+    }, []);
 
     return (
         <div className="space-y-6 animate-fade-in relative h-[calc(100vh-4rem)] flex flex-col">
@@ -8,7 +8,7 @@ import { ArrowRight, Send, Loader2, CheckCircle2, AlertTriangle, Shield } from '
 import { Modal } from '../components/ui/Modal';
 import { Alert } from '../types';
 import { cn } from '../lib/utils';
-import { fetchRealtimeMetrics, RealtimeComponent, fetchAlerts } from '../services/api';
+import { RealtimeComponent, fetchAlerts, subscribeFeed, applyMetricsDelta } from '../services/api';
 
 // Dynamic Heartbeat Visualization - generates SVG path from history data
 const HeartbeatLine = ({ color, history }: { color: string; history?: number[] }) => {
@@ -120,63 +120,66 @@ const Dashboard: React.FC = () => {
         realtimeComponents.find(c => c.id === selectedServiceId) || null,
         [realtimeComponents, selectedServiceId]);
 
-    // Poll real-time metrics from backend
+    // Live metrics and high-priority alerts, pushed by the backend feed
     useEffect(() => {
         let isMounted = true;
+        let loaded = false;
+        // Alerts pushed since the current load started (newer than its snapshot)
+        let pushedIds = new Set<string>();
 
-        const pollMetrics = async () => {
-            try {
-                const data = await fetchRealtimeMetrics();
-                if (isMounted) {
-                    setRealtimeComponents(data.components);
-                    setIsLive(true);
-                }
-            } catch (err) {
-                console.warn('Failed to fetch realtime metrics, using mock data');
-                setIsLive(false);
-            }
-        };
-
-        // Initial fetch
-        pollMetrics();
-
-        // Poll every 2 seconds for real-time updates
-        const interval = setInterval(pollMetrics, 2000);
-
-        return () => {
-            isMounted = false;
-            clearInterval(interval);
-        };
-    }, []);
-
-    // Poll high-priority alerts from backend
-    useEffect(() => {
-        let isMounted = true;
-
-        const pollAlerts = async () => {
+        const loadAlerts = async () => {
+            loaded = true;
+            const pushed = pushedIds = new Set<string>();
             try {
                 // Fetch only high and critical alerts
-                const allAlerts = await fetchAlerts({ limit: 50 });
+                const allAlerts = await fetchAlerts({ limit: 50, order: 'desc' });
                 if (isMounted) {
                     const highPriority = allAlerts.filter(a => ['critical', 'high'].includes(a.severity));
-                    setLiveAlerts(highPriority);
-                    setAlertsLoading(false);
+                    const fetchedIds = new Set(highPriority.map(a => a.id));
+                    setLiveAlerts(prev => [
+                        ...prev.filter(a => pushed.has(a.id) && !fetchedIds.has(a.id)),
+                        ...highPriority
+                    ].slice(0, 50));
                 }
             } catch (err) {
                 console.warn('Failed to fetch alerts, using mock data');
-                setAlertsLoading(false);
+            } finally {
+                if (isMounted) setAlertsLoading(false);
             }
         };
 
-        // Initial fetch
-        pollAlerts();
-
-        // Poll every 5 seconds for new alerts
-        const interval = setInterval(pollAlerts, 5000);
+        // Subscribe first and load once the feed is positioned (hello), so an
+        // alert created in between arrives over the feed instead of being lost
+        const unsubscribe = subscribeFeed({
+            onHello: (metrics) => {
+                if (!isMounted) return;
+                setRealtimeComponents(metrics.components);
+                setIsLive(true);
+                loadAlerts();
+            },
+            onMetrics: (delta) => {
+                if (isMounted) setRealtimeComponents(prev => applyMetricsDelta(prev, delta));
+            },
+            onAlert: (alert) => {
+                if (!isMounted || !['critical', 'high'].includes(alert.severity)) return;
+                pushedIds.add(alert.id);
+                setLiveAlerts(prev => prev.some(a => a.id === alert.id) ? prev : [alert, ...prev].slice(0, 50));
+            },
+            onReset: loadAlerts,
+            onStatusChange: (connected) => {
+                if (!isMounted) return;
+                setIsLive(connected);
+                if (!connected) {
+                    console.warn('Live feed disconnected, retrying...');
+                    // Feed unreachable: show what the API has until hello arrives
+                    if (!loaded) loadAlerts();
+                }
+            },
+        });
 
         return () => {
             isMounted = false;
-            clearInterval(interval);
+            unsubscribe();
         };
     }, []);
 
@@ -661,7 +664,7 @@ const Dashboard: React.FC = () => {
                             </div>
                             <div className="text-right">
                                 <div className="text-2xl font-bold font-mono">{selectedService.latency}ms</div>
-                                <div className="text-xs text-muted-foreground">Current Latency</div>
+                                <div className="text-xs text-muted-foreground">p50 Latency</div>
                             </div>
                         </div>
 
@@ -672,16 +675,16 @@ const Dashboard: React.FC = () => {
 
                         <div className="grid grid-cols-3 gap-2 text-center">
                             <div className="p-2 rounded bg-muted/20">
-                                <div className="text-xs text-muted-foreground">Uptime</div>
-                                <div className="font-mono font-bold text-green-500">99.99%</div>
+                                <div className="text-xs text-muted-foreground">p95</div>
+                                <div className="font-mono font-bold">{selectedService.p95 ?? 0}ms</div>
                             </div>
                             <div className="p-2 rounded bg-muted/20">
-                                <div className="text-xs text-muted-foreground">Error Rate</div>
-                                <div className="font-mono font-bold">0.001%</div>
+                                <div className="text-xs text-muted-foreground">p99</div>
+                                <div className="font-mono font-bold">{selectedService.p99 ?? 0}ms</div>
                             </div>
                             <div className="p-2 rounded bg-muted/20">
-                                <div className="text-xs text-muted-foreground">Load</div>
-                                <div className="font-mono font-bold">45%</div>
+                                <div className="text-xs text-muted-foreground">Throughput</div>
+                                <div className="font-mono font-bold">{selectedService.throughput ?? 0}/s</div>
                             </div>
                         </div>
                     </div>
@@ -128,11 +128,23 @@ function transformBackendAlert(backendAlert: BackendAlert): Alert {
 export async function fetchAlerts(options?: {
     severity?: string;
     limit?: number;
+    user?: string;
+    threatType?: string;
+    /** Cursor (X-Next-Cursor) for the page of older alerts */
+    before?: string;
+    /** Cursor (X-Prev-Cursor) for the page of newer alerts */
+    after?: string;
+    order?: 'asc' | 'desc';
 }): Promise<Alert[]> {
     try {
         const params = new URLSearchParams();
         if (options?.severity) params.append('severity', options.severity);
         if (options?.limit) params.append('limit', options.limit.toString());
+        if (options?.user) params.append('user', options.user);
+        if (options?.threatType) params.append('threat_type', options.threatType);
+        if (options?.before) params.append('before', options.before);
+        if (options?.after) params.append('after', options.after);
+        if (options?.order) params.append('order', options.order);
 
         const url = `${API_BASE_URL}/alerts${params.toString() ? '?' + params.toString() : ''}`;
 
@@ -212,9 +224,18 @@ export interface RealtimeComponent {
     id: string;
     name: string;
     status: 'healthy' | 'degraded' | 'down';
+    /** Pipeline stage the component reports (ingest, detection, ...) */
+    stage?: string;
+    /** p50 latency in ms */
     latency: number;
+    p95?: number;
+    p99?: number;
+    /** Mean latency (ms) for each of the last 10 seconds */
     history: number[];
+    /** Items per minute */
     activity: number;
+    /** Items per second */
+    throughput?: number;
 }
 
 export interface RealtimeMetrics {
@@ -276,6 +297,77 @@ export async function ingestLog(log: {
     }
 }
 
+// ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+// Live Feed (Server-Sent Events)
+// ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+/**
+ * Changed parts of the realtime metrics since the previous push
+ */
+export interface RealtimeMetricsDelta {
+    timestamp: string;
+    summary: Partial<RealtimeMetrics['summary']>;
+    components: RealtimeComponent[];
+}
+
+export interface FeedHandlers {
+    /** New alert created */
+    onAlert?: (alert: Alert) => void;
+    /** Connected fresh: full metrics baseline */
+    onHello?: (metrics: RealtimeMetrics) => void;
+    /** Metrics that changed since the last push */
+    onMetrics?: (delta: RealtimeMetricsDelta) => void;
+    /** Events were missed while disconnected; reload alerts */
+    onReset?: () => void;
+    /** Connection opened / lost (EventSource reconnects automatically) */
+    onStatusChange?: (connected: boolean) => void;
+}
+
+/**
+ * Subscribe to the backend push feed (new alerts + metric deltas).
+ *
+ * EventSource reconnects on its own and sends the last event id, so the
+ * backend replays anything missed in between. Returns an unsubscribe function.
+ */
+export function subscribeFeed(handlers: FeedHandlers): () => void {
+    const source = new EventSource(`${API_BASE_URL}/feed`);
+
+    const listen = <T,>(event: string, handler?: (data: T) => void) => {
+        if (!handler) return;
+        source.addEventListener(event, (e) => {
+            try {
+                handler(JSON.parse((e as MessageEvent).data));
+            } catch (error) {
+                console.error(`Failed to handle feed event ${event}:`, error);
+            }
+        });
+    };
+
+    listen<BackendAlert>('alert', handlers.onAlert && ((alert) => handlers.onAlert!(transformBackendAlert(alert))));
+    listen<{ cursor: number; metrics: RealtimeMetrics }>('hello', handlers.onHello && ((data) => handlers.onHello!(data.metrics)));
+    listen<RealtimeMetricsDelta>('metrics', handlers.onMetrics);
+    listen<unknown>('reset', handlers.onReset && (() => handlers.onReset!()));
+
+    source.onopen = () => handlers.onStatusChange?.(true);
+    source.onerror = () => handlers.onStatusChange?.(false);
+
+    return () => source.close();
+}
+
+/**
+ * Apply a metrics delta to the current component list
+ */
+export function applyMetricsDelta(
+    components: RealtimeComponent[],
+    delta: RealtimeMetricsDelta
+): RealtimeComponent[] {
+    if (delta.components.length === 0) return components;
+    const updated = new Map(delta.components.map(c => [c.id, c]));
+    const merged = components.map(c => updated.get(c.id) || c);
+    const known = new Set(components.map(c => c.id));
+    return [...merged, ...delta.components.filter(c => !known.has(c.id))];
+}
+
 // ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 // React Hooks (Optional)
 // ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -0,0 +1,272 @@
+"""
+Agent Worker Pool for Arxis SOC
+
+Runs CrewAI analysis for detection signals on a fixed number of concurrent
+workers, with per-signal timeouts, retry with exponential backoff, a bounded
+queue that sheds overflow back to storage, and backpressure metrics (queue
+depth, wait time, in-flight runs).
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from models import DetectionSignal
+
+
+# analyze(signal) -> agent output dict (blocking; runs in the threadpool)
+AnalyzeFn = Callable[[DetectionSignal], Dict[str, Any]]
+
+# on_result(signal, agent_output) -> None (runs on the event loop)
+ResultFn = Callable[[DetectionSignal, Dict[str, Any]], None]
+
+# observe(stage, seconds) -> None; receives "queue_wait" timings
+ObserveFn = Callable[[str, float], None]
+
+# pending(limit) -> up to `limit` stored signals awaiting analysis, oldest first
+PendingFn = Callable[[int], Iterable[DetectionSignal]]
+
+
+class AgentWorkerPool:
+    """
+    Bounded-concurrency pool of asyncio workers draining a signal queue.
+
+    At most `concurrency` analyses run at a time. An attempt that raises or
+    reports success=False is retried up to `max_retries` times with
+    exponential backoff; the last output (or a fallback describing the
+    failure) is always handed to `on_result`.
+
+    A timed-out attempt is not retried: its thread cannot be stopped, so it
+    keeps its concurrency slot until it returns and a retry would pay for
+    the same analysis twice.
+
+    The queue holds at most `max_queue` signals. Signals submitted while it
+    is full are shed: they stay pending in storage and `refill()` re-queues
+    them (through `pending`) once the queue has drained to half.
+    """
+
+    def __init__(
+        self,
+        analyze: AnalyzeFn,
+        on_result: ResultFn,
+        concurrency: int = 4,
+        timeout: float = 120.0,
+        max_retries: int = 2,
+        backoff_base: float = 2.0,
+        backoff_max: float = 30.0,
+        max_queue: int = 1000,
+        observe: Optional[ObserveFn] = None,
+        pending: Optional[PendingFn] = None
+    ):
+        self.analyze = analyze
+        self.on_result = on_result
+        self.observe = observe
+        self.pending = pending
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._queue: "asyncio.Queue[Tuple[DetectionSignal, float]]" = asyncio.Queue(maxsize=max(1, max_queue))
+        self._workers: list = []
+        self._tracked: Set[str] = set()
+
+        # Analysis threads, held from start until the thread returns (even
+        # after its attempt timed out)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._abandoned: Set[asyncio.Future] = set()
+        self._backlog = False
+
+        # Backpressure / throughput metrics
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.shed = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lifecycle
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def start(self) -> None:
+        """Spawn worker tasks on the running event loop."""
+        for worker_id in range(self.concurrency):
+            self._workers.append(asyncio.create_task(self._worker(worker_id)))
+
+    async def stop(self) -> None:
+        """Cancel all workers."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Submission
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def submit(self, signal: DetectionSignal) -> bool:
+        """
+        Queue a signal for analysis.
+
+        Returns:
+            False if the signal is already queued or being analyzed, or was
+            shed because the queue is full
+        """
+        if signal.signal_id in self._tracked:
+            return False
+        if self._queue.full():
+            self.shed += 1
+            self._backlog = True
+            return False
+
+        self._tracked.add(signal.signal_id)
+        self._queue.put_nowait((signal, time.monotonic()))
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+
+    def refill(self) -> int:
+        """
+        Queue stored pending signals into the free queue space, oldest first.
+
+        Returns:
+            Number of signals queued
+        """
+        if self.pending is None:
+            return 0
+
+        free = self._queue.maxsize - self._queue.qsize()
+        # Tracked signals are pending too; fetch past them to reach `free` new ones
+        queued = 0
+        for signal in self.pending(len(self._tracked) + free):
+            if self._queue.full():
+                break
+            if self.submit(signal):
+                queued += 1
+        # A full queue may have left more pending signals behind
+        self._backlog = self._queue.full()
+        return queued
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Workers
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            signal, enqueued_at = await self._queue.get()
+            wait = time.monotonic() - enqueued_at
+            self._total_wait += wait
+            if self.observe:
+                self.observe("queue_wait", wait)
+            self.in_flight += 1
+            started = time.monotonic()
+
+            try:
+                agent_output = await self._analyze_with_retries(signal)
+                if not agent_output.get("success", False):
+                    self.failed += 1
+                self.on_result(signal, agent_output)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️  Worker {worker_id} failed on signal {signal.signal_id}: {e}")
+            finally:
+                self.processed += 1
+                self._total_run += time.monotonic() - started
+                self.in_flight -= 1
+                self._tracked.discard(signal.signal_id)
+                self._queue.task_done()
+
+            if self._backlog and self._queue.qsize() <= self._queue.maxsize // 2:
+                try:
+                    self.refill()
+                except Exception as e:
+                    print(f"⚠️  Failed to re-queue shed signals: {e}")
+
+    async def _analyze_with_retries(self, signal: DetectionSignal) -> Dict[str, Any]:
+        agent_output: Optional[Dict[str, Any]] = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+
+            try:
+                agent_output = await self._run(signal)
+                if agent_output.get("success", False):
+                    return agent_output
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return self._failure_output(
+                    signal, f"Agent analysis timed out after {self.timeout:.0f}s"
+                )
+            except Exception as e:
+                agent_output = self._failure_output(signal, str(e))
+
+        return agent_output
+
+    async def _run(self, signal: DetectionSignal) -> Dict[str, Any]:
+        """One analysis attempt in the threadpool, bounded by a slot."""
+        await self._slots.acquire()
+        run = asyncio.ensure_future(run_in_threadpool(self.analyze, signal))
+        run.add_done_callback(self._run_finished)
+        try:
+            # shield: a timeout abandons the attempt but the run (and its
+            # slot) lives on until the thread returns
+            return await asyncio.wait_for(asyncio.shield(run), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._abandoned.add(run)
+            raise
+
+    def _run_finished(self, run: asyncio.Future) -> None:
+        self._slots.release()
+        self._abandoned.discard(run)
+        if not run.cancelled():
+            run.exception()  # retrieved here so abandoned failures are not logged as unhandled
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given retry attempt."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _failure_output(signal: DetectionSignal, error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "agent_trace": [],
+            "result": f"Alert generated by detection rule: {signal.signal_type}",
+            "signal_id": signal.signal_id,
+            "error": error
+        }
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Metrics
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool throughput and backpressure metrics."""
+        processed = self.processed
+        return {
+            "workers": self.concurrency,
+            "in_flight": self.in_flight,
+            "abandoned_runs": len(self._abandoned),
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "max_queue_depth": self.max_queue_depth,
+            "shed": self.shed,
+            "submitted": self.submitted,
+            "processed": processed,
+            "failed": self.failed,
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "avg_queue_wait_ms": round(1000 * self._total_wait / processed, 1) if processed else 0.0,
+            "avg_run_ms": round(1000 * self._total_run / processed, 1) if processed else 0.0,
+        }
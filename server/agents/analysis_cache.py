@@ -0,0 +1,225 @@
+"""
+Agent Analysis Cache for Arxis SOC
+
+Caches CrewAI analysis results under a normalized fingerprint of the signal,
+so structurally identical signals (same type, user, assets, locations and
+event shape) reuse a recent analysis instead of running the six-agent crew
+again. Entries expire after a TTL and the least recently used are evicted
+beyond a size cap.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional
+from models import DetectionSignal
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Fingerprinting
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _count_bucket(count: int) -> int:
+    """Bucket an event count by powers of two (1, 2, 4, 8, ...)."""
+    return 1 << (count.bit_length() - 1) if count > 0 else 0
+
+
+def signal_fingerprint(signal: DetectionSignal) -> str:
+    """
+    Normalized fingerprint of a signal for cache lookups.
+
+    Timestamps, IPs and ids are ignored and per-event-type counts are
+    bucketed, so repeats of the same attack map to the same key.
+    """
+    event_types = Counter(
+        getattr(log.event_type, "value", log.event_type) for log in signal.events
+    )
+    shape = {
+        "signal_type": signal.signal_type.value,
+        "user": signal.user,
+        "assets": sorted({log.asset for log in signal.events}),
+        "locations": sorted({log.location.strip().lower() for log in signal.events}),
+        "events": sorted((event_type, _count_bucket(count)) for event_type, count in event_types.items()),
+    }
+    encoded = json.dumps(shape, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Cache
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class AnalysisCache:
+    """
+    Thread-safe LRU + TTL cache of agent outputs.
+
+    Concurrent misses on the same fingerprint are collapsed: one caller runs
+    the analysis while the others wait for its result, for at most
+    `wait_seconds`. A waiter that gives up returns a failure rather than
+    starting a second run of a crew that is already slow; the worker pool's
+    retry then picks up the cached result (or takes over if the run failed).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 900.0,
+        wait_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.clock = clock
+
+        # fingerprint -> (stored_at, agent_output)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.wait_timeouts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get_or_analyze(
+        self,
+        signal: DetectionSignal,
+        analyze: Callable[[DetectionSignal], Dict[str, Any]],
+        variant: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Return a cached analysis for the signal, or run `analyze` and cache
+        its output if it succeeded.
+
+        Args:
+            signal: The signal to analyze
+            analyze: Produces the agent output on a miss
+            variant: Distinguishes analyses of the same signal (e.g. crew roster)
+        """
+        if not self.enabled:
+            return analyze(signal)
+
+        key = signal_fingerprint(signal)
+        if variant:
+            key = f"{key}:{variant}"
+
+        while True:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    self.hits += 1
+                    return _for_signal(cached, signal, key)
+
+                waiter = self._pending.get(key)
+                if waiter is None:
+                    self.misses += 1
+                    self._pending[key] = threading.Event()
+                    break
+
+            # Another worker is analyzing an identical signal; reuse its result
+            # (or take over if it failed)
+            if not waiter.wait(timeout=self.wait_seconds):
+                with self._lock:
+                    self.wait_timeouts += 1
+                return _wait_timeout_output(signal, self.wait_seconds)
+
+        try:
+            agent_output = analyze(signal)
+            if agent_output.get("success", False):
+                self._store(key, agent_output)
+            return agent_output
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, agent_output = entry
+        if self.clock() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return agent_output
+
+    def _store(self, key: str, agent_output: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock(), agent_output)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "wait_seconds": self.wait_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "wait_timeouts": self.wait_timeouts,
+            }
+
+
+def _for_signal(cached: Dict[str, Any], signal: DetectionSignal, key: str) -> Dict[str, Any]:
+    """Re-target a cached analysis at a new signal."""
+    return {
+        **cached,
+        "signal_id": signal.signal_id,
+        "cached": True,
+        "cached_from": cached["signal_id"],
+        "fingerprint": key,
+    }
+
+
+def _wait_timeout_output(signal: DetectionSignal, wait_seconds: float) -> Dict[str, Any]:
+    """Failed analysis for a signal whose identical in-flight run did not finish in time."""
+    return {
+        "success": False,
+        "agent_trace": [],
+        "result": f"Alert generated by detection rule: {signal.signal_type}",
+        "signal_id": signal.signal_id,
+        "error": f"Identical analysis still running after {wait_seconds:.0f}s"
+    }
+
+
+def create_analysis_cache() -> AnalysisCache:
+    """
+    Build the analysis cache from ARXIS_AGENT_CACHE_SIZE / ARXIS_AGENT_CACHE_TTL.
+
+    Waiters on an in-flight analysis give up after half of ARXIS_AGENT_TIMEOUT,
+    well before the agent workers abandon the waiting attempt, so the
+    failure reaches the pool's retry instead of a timeout (which is final).
+    """
+    return AnalysisCache(
+        max_entries=int(os.getenv("ARXIS_AGENT_CACHE_SIZE", "1000")),
+        ttl_seconds=float(os.getenv("ARXIS_AGENT_CACHE_TTL", "900")),
+        wait_seconds=float(os.getenv("ARXIS_AGENT_TIMEOUT", "120")) / 2
+    )
+
+
+# Global analysis cache instance
+analysis_cache = create_analysis_cache()
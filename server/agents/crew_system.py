@@ -2,9 +2,12 @@
 Arxis Agentic System - Specialized SOC Agents
 """
 
+import threading
+from contextlib import contextmanager
 from crewai import Agent, Task, Crew, Process
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterator, List, Optional
 from models import DetectionSignal
+from agents.analysis_cache import analysis_cache
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -128,12 +131,118 @@ def create_response_automation_agent() -> Agent:
     )
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Agent Registry
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# Crew roster, in pipeline order
+AGENT_FACTORIES = {
+    "orchestrator": create_orchestrator_agent,
+    "alert_handler": create_alert_handler_agent,
+    "threat_analyzer": create_threat_analyzer_agent,
+    "root_cause": create_root_cause_agent,
+    "compliance": create_compliance_agent,
+    "response": create_response_automation_agent,
+}
+
+# Agent role per roster name, for traces built without a leased agent set
+AGENT_ROLES = {
+    "orchestrator": "Orchestrator Agent",
+    "alert_handler": "Alert Handler Agent",
+    "threat_analyzer": "Threat Analyzer Agent",
+    "root_cause": "Root Cause Agent",
+    "compliance": "Compliance Agent",
+    "response": "Response Automation Agent",
+}
+
+
+def build_agent_set() -> Dict[str, Agent]:
+    """Build one instance of every agent in the roster."""
+    return {name: factory() for name, factory in AGENT_FACTORIES.items()}
+
+
+class AgentRegistry:
+    """
+    Long-lived pool of agent sets reused across crew runs.
+    
+    A crew run leases a whole set for its duration, so concurrent runs never
+    share an Agent instance. Sets are built on demand and kept for reuse, so
+    the pool grows to the peak number of concurrent runs and stays there.
+    """
+    
+    def __init__(self):
+        self._idle: List[Dict[str, Agent]] = []
+        self._lock = threading.Lock()
+        self.built = 0
+        self.leased = 0
+        self.reused = 0
+    
+    def warm(self, sets: int) -> None:
+        """Pre-build agent sets (e.g. one per agent worker) at startup."""
+        with self._lock:
+            missing = sets - (len(self._idle) + self.leased)
+        for _ in range(max(0, missing)):
+            agents = build_agent_set()
+            with self._lock:
+                self.built += 1
+                self._idle.append(agents)
+    
+    @contextmanager
+    def lease(self) -> Iterator[Dict[str, Agent]]:
+        """Borrow an agent set for one crew run."""
+        with self._lock:
+            agents = self._idle.pop() if self._idle else None
+            self.leased += 1
+            if agents is not None:
+                self.reused += 1
+        
+        if agents is None:
+            agents = build_agent_set()
+            with self._lock:
+                self.built += 1
+        
+        try:
+            yield agents
+        finally:
+            with self._lock:
+                self.leased -= 1
+                self._idle.append(agents)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Agent set counts."""
+        with self._lock:
+            return {
+                "agent_sets": self.built,
+                "idle": len(self._idle),
+                "leased": self.leased,
+                "reused": self.reused,
+            }
+
+
+# Global agent registry instance
+agent_registry = AgentRegistry()
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Task Definitions
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def create_tasks(signal: DetectionSignal) -> List[Task]:
-    """Create the sequential workflow tasks."""
+def create_tasks(
+    signal: DetectionSignal,
+    agents: Optional[Dict[str, Agent]] = None,
+    roster: Optional[List[str]] = None
+) -> List[Task]:
+    """
+    Create the sequential workflow tasks.
+    
+    Args:
+        signal: The signal under investigation
+        agents: Agent set to assign the tasks to (built fresh if omitted)
+        roster: Agents (AGENT_FACTORIES keys) whose tasks to include;
+            all of them if omitted
+    """
+    if agents is None:
+        agents = build_agent_set()
     
     # 1. Orchestration
     orchestrator_task = Task(
@@ -142,7 +251,7 @@ def create_tasks(signal: DetectionSignal) -> List[Task]:
         Determine the scope of the incident response required.
         Identify which specialized agents are needed for this investigation.
         """,
-        agent=create_orchestrator_agent(),
+        agent=agents["orchestrator"],
         expected_output="Incident Response Plan outlining the investigation strategy."
     )
 
@@ -154,7 +263,7 @@ def create_tasks(signal: DetectionSignal) -> List[Task]:
         Correlate these events into a single cohesive alert narrative.
         Filter out potential false positives or irrelevant noise.
         """,
-        agent=create_alert_handler_agent(),
+        agent=agents["alert_handler"],
         expected_output="Structured Alert Summary with key entities and noise filtered out."
     )
 
@@ -166,7 +275,7 @@ def create_tasks(signal: DetectionSignal) -> List[Task]:
         Explain the Attacker's Intent (e.g., Credential Access, Exfiltration).
         Assign a confidence score to this classification.
         """,
-        agent=create_threat_analyzer_agent(),
+        agent=agents["threat_analyzer"],
         expected_output="Threat Classification including MITRE mapping and Attacker Intent."
     )
 
@@ -178,7 +287,7 @@ def create_tasks(signal: DetectionSignal) -> List[Task]:
         Construct a timeline of the attack progression.
         Define the Blast Radius (what other systems might be affected?).
         """,
-        agent=create_root_cause_agent(),
+        agent=agents["root_cause"],
         expected_output="Forensic Timeline and Root Cause Analysis."
     )
 
@@ -190,7 +299,7 @@ def create_tasks(signal: DetectionSignal) -> List[Task]:
         Determine if this is a 'Reportable Incident'.
         Calculate the reporting deadline (e.g., T-72 hours).
         """,
-        agent=create_compliance_agent(),
+        agent=agents["compliance"],
         expected_output="Compliance Assessment Report with deadlines and regulatory obligations."
     )
 
@@ -201,57 +310,102 @@ def create_tasks(signal: DetectionSignal) -> List[Task]:
         Prioritize actions by 'Immediate Containment' vs 'Long-term Eradication'.
         Draft the formal Incident Note for the ticketing system (ServiceNow).
         """,
-        agent=create_response_automation_agent(),
+        agent=agents["response"],
         expected_output="Actionable Remediation Plan and Incident Ticket Draft."
     )
 
-    return [
-        orchestrator_task,
-        triage_task,
-        analysis_task,
-        forensics_task,
-        compliance_task,
-        response_task
-    ]
+    tasks = {
+        "orchestrator": orchestrator_task,
+        "alert_handler": triage_task,
+        "threat_analyzer": analysis_task,
+        "root_cause": forensics_task,
+        "compliance": compliance_task,
+        "response": response_task,
+    }
+    return [tasks[name] for name in (roster or AGENT_FACTORIES)]
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Crew Orchestration
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def run_agent_analysis(signal: DetectionSignal) -> Dict[str, Any]:
-    """
-    Run the full Arxis Agentic System workflow.
+# Partial task output included in progress events
+PROGRESS_OUTPUT_CHARS = 2000
+
+# on_progress(step) receives {"agent", "step", "total", "output"} per finished task
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+def run_agent_analysis(
+    signal: DetectionSignal,
+    roster: Optional[List[str]] = None,
+    on_progress: Optional[ProgressFn] = None
+) -> Dict[str, Any]:
     """
-    tasks = create_tasks(signal)
+    Run the Arxis Agentic System workflow.
     
-    crew = Crew(
-        agents=[
-            create_orchestrator_agent(),
-            create_alert_handler_agent(),
-            create_threat_analyzer_agent(),
-            create_root_cause_agent(),
-            create_compliance_agent(),
-            create_response_automation_agent()
-        ],
-        tasks=tasks,
-        process=Process.sequential,
-        verbose=True,
+    Structurally identical signals analyzed recently are served from the
+    analysis cache instead of kicking off the crew again.
+    
+    Args:
+        signal: The signal to analyze
+        roster: Subset of agents (AGENT_FACTORIES keys) to run, in order;
+            the full six-agent crew if omitted
+        on_progress: Called (from the crew's thread) as each task finishes
+    """
+    return analysis_cache.get_or_analyze(
+        signal,
+        lambda s: run_crew(s, roster, on_progress),
+        variant=",".join(roster) if roster else ""
     )
+
+
+def _task_callback(on_progress: ProgressFn, agent: Agent, step: int, total: int) -> Callable[[Any], None]:
+    def callback(output: Any) -> None:
+        text = str(getattr(output, "raw", output))
+        try:
+            on_progress({
+                "agent": agent.role,
+                "step": step,
+                "total": total,
+                "output": text[:PROGRESS_OUTPUT_CHARS],
+                "truncated": len(text) > PROGRESS_OUTPUT_CHARS
+            })
+        except Exception as e:
+            print(f"⚠️  Progress callback failed: {e}")
+    return callback
+
+
+def run_crew(
+    signal: DetectionSignal,
+    roster: Optional[List[str]] = None,
+    on_progress: Optional[ProgressFn] = None
+) -> Dict[str, Any]:
+    """
+    Run the crew for a signal.
     
+    Agents are leased from the registry; only the per-signal Tasks and the
+    Crew wrapper are built per run.
+    """
+    names = list(roster or AGENT_FACTORIES)
     try:
-        result = crew.kickoff()
+        with agent_registry.lease() as agents:
+            tasks = create_tasks(signal, agents, names)
+            if on_progress:
+                for step, (name, task) in enumerate(zip(names, tasks), start=1):
+                    task.callback = _task_callback(on_progress, agents[name], step, len(tasks))
+            
+            crew = Crew(
+                agents=[agents[name] for name in names],
+                tasks=tasks,
+                process=Process.sequential,
+                verbose=True,
+            )
+            result = crew.kickoff()
         
         return {
             "success": True,
-            "agent_trace": [
-                "Orchestrator Agent",
-                "Alert Handler Agent",
-                "Threat Analyzer Agent",
-                "Root Cause Agent",
-                "Compliance Agent",
-                "Response Automation Agent"
-            ],
+            "agent_trace": [agents[name].role for name in names],
             "result": str(result),
             "signal_id": signal.signal_id
         }
@@ -262,14 +416,7 @@ def run_agent_analysis(signal: DetectionSignal) -> Dict[str, Any]:
         # Fallback to rule-based output (Simulate agent path for UI)
         return {
             "success": False,
-            "agent_trace": [
-                "Orchestrator Agent",
-                "Alert Handler Agent",
-                "Threat Analyzer Agent",
-                "Root Cause Agent",
-                "Compliance Agent",
-                "Response Automation Agent"
-            ],
+            "agent_trace": [AGENT_ROLES.get(name, name) for name in names],
             "result": f"Alert generated by detection rule: {signal.signal_type}",
             "signal_id": signal.signal_id,
             "error": str(e)
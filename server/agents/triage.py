@@ -0,0 +1,188 @@
+"""
+Tiered Triage for Arxis SOC
+
+A fast deterministic scorer that routes each signal to the cheapest analysis
+path that fits its risk:
+
+- template: rule-based alert text, no LLM calls
+- reduced:  Alert Handler + Response Automation agents only
+- full:     the complete six-agent crew
+
+The score adds up signal type, severity, the user's alert history and the
+sensitivity of the assets involved.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+from models import DetectionSignal, SignalType, Severity
+
+
+TIER_TEMPLATE = "template"
+TIER_REDUCED = "reduced"
+TIER_FULL = "full"
+TIERS = (TIER_TEMPLATE, TIER_REDUCED, TIER_FULL)
+
+# Agents (crew_system.AGENT_FACTORIES keys) run for each LLM tier
+TIER_ROSTERS = {
+    TIER_REDUCED: ["alert_handler", "response"],
+    TIER_FULL: None,  # whole roster
+}
+
+SIGNAL_TYPE_SCORES = {
+    SignalType.SUSPICIOUS_LOGIN: 15,
+    SignalType.ANOMALOUS_ACCESS: 20,
+    SignalType.BRUTE_FORCE: 25,
+    SignalType.INSIDER_THREAT: 40,
+}
+
+SEVERITY_SCORES = {
+    Severity.LOW: 0,
+    Severity.MEDIUM: 10,
+    Severity.HIGH: 20,
+    Severity.CRITICAL: 35,
+}
+
+HISTORY_SCORE_PER_ALERT = 5
+HISTORY_SCORE_MAX = 20
+# Prior alerts beyond this many no longer change the score
+HISTORY_LOOKBACK = HISTORY_SCORE_MAX // HISTORY_SCORE_PER_ALERT
+SENSITIVE_ASSET_SCORE = 20
+
+DEFAULT_SENSITIVE_ASSETS = "customer,payment,employee,admin,finance,payroll,prod,vault"
+
+
+class TriageScorer:
+    """
+    Scores signals and picks an analysis tier.
+
+    Scores below `reduced_at` get a template alert, scores below `full_at`
+    get the reduced crew, everything else gets the full crew. With
+    mode="full" every signal goes to the full crew (scores are still
+    reported).
+    """
+
+    def __init__(
+        self,
+        mode: str = "full",
+        reduced_at: int = 40,
+        full_at: int = 70,
+        sensitive_assets: List[str] = None
+    ):
+        if mode not in ("full", "tiered"):
+            raise ValueError(f"Unknown triage mode: {mode}")
+        self.mode = mode
+        self.reduced_at = reduced_at
+        self.full_at = full_at
+        self.sensitive_assets = [
+            keyword.strip().lower()
+            for keyword in (sensitive_assets if sensitive_assets is not None
+                            else DEFAULT_SENSITIVE_ASSETS.split(","))
+            if keyword.strip()
+        ]
+
+        # Per-tier counters: runs, total seconds, agent invocations (LLM cost)
+        self._stats = {tier: {"signals": 0, "seconds": 0.0, "agent_runs": 0} for tier in TIERS}
+        self._lock = threading.Lock()
+
+    def score(self, signal: DetectionSignal, prior_alerts: int = 0) -> Tuple[int, List[str]]:
+        """
+        Risk score for a signal.
+
+        Args:
+            signal: The signal to score
+            prior_alerts: Number of earlier alerts for the signal's user
+
+        Returns:
+            (score, reasons) where reasons name each contributing factor
+        """
+        type_score = SIGNAL_TYPE_SCORES.get(signal.signal_type, 20)
+        severity_score = SEVERITY_SCORES.get(signal.severity, 10)
+        score = type_score + severity_score
+        reasons = [
+            f"{signal.signal_type.value} +{type_score}",
+            f"{signal.severity.value} severity +{severity_score}",
+        ]
+
+        if prior_alerts:
+            history_score = min(HISTORY_SCORE_MAX, prior_alerts * HISTORY_SCORE_PER_ALERT)
+            score += history_score
+            reasons.append(f"{prior_alerts} prior alerts +{history_score}")
+
+        sensitive = sorted({
+            log.asset for log in signal.events
+            if any(keyword in log.asset.lower() for keyword in self.sensitive_assets)
+        })
+        if sensitive:
+            score += SENSITIVE_ASSET_SCORE
+            reasons.append(f"sensitive asset {', '.join(sensitive)} +{SENSITIVE_ASSET_SCORE}")
+
+        return score, reasons
+
+    def tier_for(self, score: int) -> str:
+        """Analysis tier for a score."""
+        if self.mode == "full" or score >= self.full_at:
+            return TIER_FULL
+        if score >= self.reduced_at:
+            return TIER_REDUCED
+        return TIER_TEMPLATE
+
+    def record(self, tier: str, seconds: float, agent_runs: int) -> None:
+        """Account one analysis against its tier."""
+        with self._lock:
+            stats = self._stats[tier]
+            stats["signals"] += 1
+            stats["seconds"] += seconds
+            stats["agent_runs"] += agent_runs
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier signal counts, average latency and agent invocations."""
+        with self._lock:
+            tiers = {
+                tier: {
+                    "signals": stats["signals"],
+                    "agent_runs": stats["agent_runs"],
+                    "avg_latency_ms": round(1000 * stats["seconds"] / stats["signals"], 1)
+                    if stats["signals"] else 0.0,
+                }
+                for tier, stats in self._stats.items()
+            }
+        return {
+            "mode": self.mode,
+            "thresholds": {"reduced": self.reduced_at, "full": self.full_at},
+            "tiers": tiers,
+        }
+
+
+def template_analysis(signal: DetectionSignal, score: int, reasons: List[str]) -> Dict[str, Any]:
+    """Deterministic agent-free analysis for low-risk signals."""
+    assets = sorted({log.asset for log in signal.events}) or ["unknown"]
+    locations = sorted({log.location for log in signal.events}) or ["unknown"]
+    result = (
+        f"{signal.signal_type.value} detected for {signal.user} "
+        f"({len(signal.events)} events; assets: {', '.join(assets)}; "
+        f"locations: {', '.join(locations)}). "
+        f"Triaged as low risk (score {score}: {'; '.join(reasons)}), "
+        f"so no agent investigation was run."
+    )
+    return {
+        "success": True,
+        "agent_trace": ["Triage Scorer"],
+        "result": result,
+        "signal_id": signal.signal_id
+    }
+
+
+def create_triage_scorer() -> TriageScorer:
+    """Build the triage scorer from ARXIS_TRIAGE_* settings."""
+    sensitive = os.getenv("ARXIS_TRIAGE_SENSITIVE_ASSETS")
+    return TriageScorer(
+        mode=os.getenv("ARXIS_TRIAGE_MODE", "full").lower(),
+        reduced_at=int(os.getenv("ARXIS_TRIAGE_REDUCED_AT", "40")),
+        full_at=int(os.getenv("ARXIS_TRIAGE_FULL_AT", "70")),
+        sensitive_assets=sensitive.split(",") if sensitive is not None else None
+    )
+
+
+# Global triage scorer instance
+triage_scorer = create_triage_scorer()
@@ -0,0 +1,212 @@
+"""
+Indexed Alert Store for Arxis SOC
+
+Keeps alerts ordered by (timestamp, alert_id) alongside an id hash map and
+secondary indexes (severity, user, threat type) that are maintained on
+insert, so lookups, filtered listings and keyset pages (including time
+ranges, found by bisecting the sorted keys) cost proportional to the result.
+"""
+
+import base64
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+
+# Sort / pagination key of an alert: (epoch seconds, alert_id)
+AlertKey = Tuple[float, str]
+
+
+def parse_timestamp(timestamp: str) -> Optional[float]:
+    """Parse an ISO-8601 timestamp into epoch seconds (None if unparseable)."""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def alert_key(record: Dict[str, Any]) -> AlertKey:
+    """Pagination key of an alert record (unparseable timestamps sort first)."""
+    return (parse_timestamp(record.get("timestamp")) or 0.0, record["alert_id"])
+
+
+def encode_cursor(key: AlertKey) -> str:
+    """Opaque cursor string for a pagination key."""
+    raw = f"{key[0]!r}|{key[1]}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> AlertKey:
+    """
+    Parse a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        epoch, alert_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return (float(epoch), alert_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+
+
+class AlertIndex:
+    """
+    Alert records with O(1) id lookup and per-key secondary indexes.
+
+    Every list is kept sorted by alert_key(). Alerts are stamped at creation
+    so inserts almost always append; out-of-order records are insorted.
+
+    Not thread-safe on its own; ArxisStorage guards it with its lock.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self.records: List[Dict[str, Any]] = []
+        self.keys: Dict[str, AlertKey] = {}
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_severity: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.by_threat_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        for record in records:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Insert an alert record and update every index."""
+        key = self.keys[record["alert_id"]] = alert_key(record)
+        self.by_id[record["alert_id"]] = record
+        for records in (
+            self.records,
+            self.by_severity[record["severity"]],
+            self.by_user[record["user"]],
+            self.by_threat_type[record["threat_type"]],
+        ):
+            self._insert(records, record, key)
+
+    def _key(self, record: Dict[str, Any]) -> AlertKey:
+        return self.keys[record["alert_id"]]
+
+    def _insert(self, records: List[Dict[str, Any]], record: Dict[str, Any], key: AlertKey) -> None:
+        if not records or self._key(records[-1]) <= key:
+            records.append(record)
+        else:
+            insort(records, record, key=self._key)
+
+    def clear(self) -> None:
+        """Remove all alerts."""
+        self.records.clear()
+        self.keys.clear()
+        self.by_id.clear()
+        self.by_severity.clear()
+        self.by_user.clear()
+        self.by_threat_type.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lookups
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def get(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Get an alert by id."""
+        return self.by_id.get(alert_id)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent alerts, oldest first."""
+        return _tail(self.records, limit)
+
+    def with_severity(self, severity: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent alerts of a severity."""
+        return _tail(self.by_severity.get(severity, []), limit)
+
+    def for_user(self, user: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent alerts for a user."""
+        return _tail(self.by_user.get(user, []), limit)
+
+    def with_threat_type(self, threat_type: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent alerts of a threat type."""
+        return _tail(self.by_threat_type.get(threat_type, []), limit)
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[AlertKey] = None,
+        after: Optional[AlertKey] = None,
+        severity: Optional[str] = None,
+        user: Optional[str] = None,
+        threat_type: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of alerts, newest first.
+
+        Args:
+            limit: Page size
+            before: Only alerts with a key below this cursor (older page)
+            after: Only alerts with a key above this cursor (newer page);
+                the page is the oldest `limit` of those
+            severity / user / threat_type: Exact-match filters
+            start / end: Only alerts with start <= epoch < end
+
+        Returns:
+            Up to `limit` records; cost is O(log n + scanned) using the
+            narrowest matching index
+        """
+        if limit <= 0:
+            return []
+
+        candidates = [self.records]
+        if severity is not None:
+            candidates.append(self.by_severity.get(severity, []))
+        if user is not None:
+            candidates.append(self.by_user.get(user, []))
+        if threat_type is not None:
+            candidates.append(self.by_threat_type.get(threat_type, []))
+        records = min(candidates, key=len)
+
+        lo, hi = 0, len(records)
+        if after is not None:
+            lo = bisect_right(records, after, key=self._key)
+        if start is not None:
+            lo = max(lo, bisect_left(records, (start, ""), key=self._key))
+        if before is not None:
+            hi = bisect_left(records, before, key=self._key)
+        if end is not None:
+            hi = min(hi, bisect_left(records, (end, ""), key=self._key))
+
+        def matches(record: Dict[str, Any]) -> bool:
+            return (
+                (severity is None or record["severity"] == severity)
+                and (user is None or record["user"] == user)
+                and (threat_type is None or record["threat_type"] == threat_type)
+            )
+
+        page: List[Dict[str, Any]] = []
+        if after is not None and before is None:
+            # Walk forward from the cursor, then present newest first
+            for index in range(lo, hi):
+                if matches(records[index]):
+                    page.append(records[index])
+                    if len(page) == limit:
+                        break
+            page.reverse()
+        else:
+            for index in range(hi - 1, lo - 1, -1):
+                if matches(records[index]):
+                    page.append(records[index])
+                    if len(page) == limit:
+                        break
+        return page
+
+
+def _tail(records: List[Dict[str, Any]], limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Copy of the last `limit` records (all when limit is None)."""
+    if limit is None:
+        return records.copy()
+    if limit <= 0:
+        return []
+    return records[-limit:]
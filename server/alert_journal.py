@@ -0,0 +1,164 @@
+"""
+Append-Only Alert Journal for Arxis SOC
+
+Alerts are appended to a JSON Lines journal instead of rewriting the whole
+alert file on every insert. The journal is periodically folded into a JSON
+snapshot (the familiar data/alerts.json), so startup replays the snapshot
+plus the journal tail.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+
+class AlertJournal:
+    """
+    Snapshot + JSON Lines journal for alert persistence.
+
+    - append() costs O(1) disk I/O per alert
+    - fsync is batched: every `fsync_every` appends or `fsync_interval` seconds
+    - compaction rewrites the snapshot once the journal grows as large as it
+      (geometric schedule, so amortized cost per alert stays O(1))
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        fsync_every: int = 1,
+        fsync_interval: float = 0.0,
+        compact_min_entries: int = 1000
+    ):
+        self.snapshot_path = Path(data_dir) / "alerts.json"
+        self.journal_path = Path(data_dir) / "alerts.jsonl"
+
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_min_entries = compact_min_entries
+
+        self.snapshot_entries = 0
+        self.journal_entries = 0
+        self._corrupt = False
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._journal_file = None
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Replay
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Replay the snapshot followed by the journal tail.
+
+        Records are deduplicated by alert_id (the last copy wins): a crash
+        between writing a snapshot and truncating the journal leaves journal
+        entries that the snapshot already contains.
+        """
+        records: List[Dict[str, Any]] = []
+
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r") as f:
+                records = json.load(f)
+        self.snapshot_entries = len(records)
+
+        self.journal_entries = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "r") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                        self.journal_entries += 1
+                    except ValueError:
+                        # A torn write can only affect the last line; compacting
+                        # rewrites the journal so later appends stay parseable
+                        print(f"⚠️  Skipping corrupt journal line {line_number}")
+                        self._corrupt = True
+
+        unique = {record["alert_id"]: record for record in records}
+        if len(unique) < len(records):
+            print(f"♻️  Dropped {len(records) - len(unique)} duplicate journal entries")
+            # Rewrite the snapshot so the duplicates are not replayed again
+            self._corrupt = True
+        return list(unique.values())
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Writes
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append a single record to the journal."""
+        f = self._open_journal()
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+
+        self.journal_entries += 1
+        self._unsynced += 1
+
+        if self._fsync_due():
+            self.sync()
+
+    def sync(self) -> None:
+        """Force journal contents to stable storage."""
+        if self._journal_file and self._unsynced:
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def needs_compaction(self) -> bool:
+        """True once the journal is at least as large as the snapshot."""
+        if self._corrupt:
+            return True
+        return self.journal_entries >= max(self.compact_min_entries, self.snapshot_entries)
+
+    def compact(self, records: List[Dict[str, Any]]) -> None:
+        """Write `records` as the new snapshot and truncate the journal."""
+        tmp_path = self.snapshot_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(records, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        self._close_journal()
+        open(self.journal_path, "w").close()
+
+        self.snapshot_entries = len(records)
+        self.journal_entries = 0
+        self._corrupt = False
+        self._unsynced = 0
+
+    def reset(self) -> None:
+        """Drop all persisted alerts."""
+        self.compact([])
+
+    def close(self) -> None:
+        """Flush pending writes and close the journal."""
+        self.sync()
+        self._close_journal()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Internals
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _open_journal(self):
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, "a")
+        return self._journal_file
+
+    def _close_journal(self) -> None:
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def _fsync_due(self) -> bool:
+        if self.fsync_every > 0 and self._unsynced >= self.fsync_every:
+            return True
+        if self.fsync_interval > 0:
+            return time.monotonic() - self._last_fsync >= self.fsync_interval
+        return False
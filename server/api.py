@@ -11,6 +11,8 @@ This is the orchestration layer connecting all components.
 
 import uuid
 import asyncio
+import time
+import json
 import os
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
@@ -20,80 +22,310 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
-from models import SecurityLog, Alert, MetricsSummary, Severity
+from models import SecurityLog, DetectionSignal, Alert, MetricsSummary, Severity
 from storage import storage
+from alert_index import alert_key, encode_cursor, decode_cursor, parse_timestamp
 from detection_engine import detection_engine
-from agents.crew_system import run_agent_analysis
+from detection_checkpoint import encode_checkpoint, write_checkpoint, load_checkpoint, replay_recent_logs
+from agent_workers import AgentWorkerPool
+from signal_aggregation import SignalAggregator
+from event_stream import EventBroker, SSE_HEADERS, parse_cursor, sse_events, sse_message
+from pipeline_metrics import pipeline_metrics, render_metric
+from agents.crew_system import run_agent_analysis, agent_registry, AGENT_FACTORIES
+from agents.triage import triage_scorer, template_analysis, TIER_TEMPLATE, TIER_ROSTERS, HISTORY_LOOKBACK
+from agents.analysis_cache import analysis_cache
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Background Processing
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-async def process_pending_signals():
-    """Background task: Process signals with CrewAI agents."""
+def build_alert(signal: DetectionSignal, agent_output: Dict[str, Any]) -> Alert:
+    """Turn agent output for a signal into a finalized alert."""
+    return Alert(
+        alert_id=str(uuid.uuid4()),
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        user=signal.user,
+        threat_type=signal.signal_type.value,
+        severity=signal.severity,
+        explanation=agent_output.get("result", "No explanation available"),
+        recommendation="Review immediately and verify user identity",
+        agent_trace=agent_output.get("agent_trace", []),
+        raw_events=[event.model_dump() if hasattr(event, 'model_dump') else event 
+                   for event in signal.events],
+        metadata={
+            "signal_id": signal.signal_id,
+            "agent_success": agent_output.get("success", False),
+            "triage": agent_output.get("triage"),
+            **signal.metadata
+        }
+    )
+
+
+# Agent progress events for in-flight signals (see GET /signals/stream):
+#   signal_queued -> analysis_started -> agent_step (per task) -> analysis_completed
+agent_events = EventBroker(history=int(os.getenv("ARXIS_STREAM_HISTORY", "1000")))
+
+
+def analyze_signal(signal: DetectionSignal) -> Dict[str, Any]:
+    """
+    Triage a signal and run the matching analysis path (blocking; called
+    from the worker pool).
+    """
+    with pipeline_metrics.time("triage"):
+        prior_alerts = len(storage.get_alerts_for_user(signal.user, limit=HISTORY_LOOKBACK))
+        score, reasons = triage_scorer.score(signal, prior_alerts)
+        tier = triage_scorer.tier_for(score)
+    started = time.perf_counter()
+    agent_events.publish("analysis_started", {
+        "signal_id": signal.signal_id,
+        "signal_type": signal.signal_type.value,
+        "user": signal.user,
+        "tier": tier,
+        "score": score
+    })
+    
+    if tier == TIER_TEMPLATE:
+        agent_output = template_analysis(signal, score, reasons)
+        agent_runs = 0
+    else:
+        roster = TIER_ROSTERS[tier]
+        print(f"\n🤖 Processing signal {signal.signal_id} with AI agents ({tier} crew, score {score})...")
+        with pipeline_metrics.time("agent_analysis"):
+            agent_output = run_agent_analysis(
+                signal,
+                roster,
+                on_progress=lambda step: agent_events.publish(
+                    "agent_step", {"signal_id": signal.signal_id, **step}
+                )
+            )
+        agent_runs = 0 if agent_output.get("cached") else len(roster or AGENT_FACTORIES)
+    
+    triage_scorer.record(tier, time.perf_counter() - started, agent_runs)
+    agent_output["triage"] = {"tier": tier, "score": score, "reasons": reasons}
+    return agent_output
+
+
+def finalize_signal(signal: DetectionSignal, agent_output: Dict[str, Any]) -> None:
+    """Store the alert for an analyzed signal and retire the signal."""
+    alert = build_alert(signal, agent_output)
+    with pipeline_metrics.time("storage"):
+        storage.add_alert(alert)
+        storage.mark_signal_processed(signal.signal_id)
+    feed_events.publish("alert", alert.model_dump(mode="json"))
+    agent_events.publish("analysis_completed", {
+        "signal_id": signal.signal_id,
+        "alert_id": alert.alert_id,
+        "success": agent_output.get("success", False),
+        "cached": agent_output.get("cached", False),
+        "agent_trace": alert.agent_trace
+    })
+    
+    print(f"✅ Alert {alert.alert_id} created from signal {signal.signal_id}")
+
+
+def pending_signals(limit: int) -> List[DetectionSignal]:
+    """Stored signals still awaiting analysis, oldest first."""
+    return [DetectionSignal(**signal_dict) for signal_dict in storage.get_pending_signals(limit)]
+
+
+agent_pool = AgentWorkerPool(
+    analyze=analyze_signal,
+    on_result=finalize_signal,
+    concurrency=int(os.getenv("ARXIS_AGENT_WORKERS", "4")),
+    timeout=float(os.getenv("ARXIS_AGENT_TIMEOUT", "120")),
+    max_retries=int(os.getenv("ARXIS_AGENT_MAX_RETRIES", "2")),
+    backoff_base=float(os.getenv("ARXIS_AGENT_RETRY_BACKOFF", "2")),
+    max_queue=int(os.getenv("ARXIS_AGENT_QUEUE_SIZE", "1000")),
+    observe=pipeline_metrics.observe,
+    pending=pending_signals
+)
+
+
+# The first signal for a (user, signal_type) goes to the agents at once; repeats
+# within this many seconds are folded into one follow-up incident (0 = off)
+SIGNAL_AGGREGATION_WINDOW = float(os.getenv("ARXIS_SIGNAL_AGGREGATION_WINDOW", "30"))
+
+signal_aggregator = SignalAggregator(
+    window_seconds=SIGNAL_AGGREGATION_WINDOW,
+    max_events=int(os.getenv("ARXIS_SIGNAL_AGGREGATION_MAX_EVENTS", "100"))
+)
+
+
+def dispatch_signals(signals: List[DetectionSignal]) -> List[str]:
+    """
+    Route new detection signals towards agent analysis.
+    
+    With aggregation enabled, the first signal for a (user, signal_type) is
+    released now and repeats are folded into a follow-up incident released
+    by the aggregation loop; otherwise every signal is released now.
+    
+    Returns:
+        For each input signal, the id of the signal that will be analyzed
+    """
+    if SIGNAL_AGGREGATION_WINDOW <= 0:
+        release_signals(signals)
+        return [signal.signal_id for signal in signals]
+    
+    signal_ids = []
+    immediate = []
+    for signal in signals:
+        incident, release_now = signal_aggregator.add(signal)
+        if release_now:
+            immediate.append(incident)
+        signal_ids.append(incident.signal_id)
+    release_signals(immediate)
+    return signal_ids
+
+
+def release_signals(signals: List[DetectionSignal]) -> None:
+    """Persist signals and hand them straight to the agent workers."""
+    if not signals:
+        return
+    with pipeline_metrics.time("storage", len(signals)):
+        storage.add_signals(signals)
+    for signal in signals:
+        if agent_pool.submit(signal):
+            agent_events.publish("signal_queued", {
+                "signal_id": signal.signal_id,
+                "signal_type": signal.signal_type.value,
+                "user": signal.user,
+                "severity": signal.severity.value
+            })
+
+
+async def aggregation_loop() -> None:
+    """Release follow-up incidents as their aggregation windows close."""
     while True:
+        delay = signal_aggregator.next_due_in()
+        await asyncio.sleep(1.0 if delay is None else min(delay, 1.0))
         try:
-            pending = storage.get_pending_signals()
-            
-            for signal_dict in pending:
-                # Convert to DetectionSignal object
-                from models import DetectionSignal
-                signal = DetectionSignal(**signal_dict)
-                
-                print(f"\n🤖 Processing signal {signal.signal_id} with AI agents...")
-                
-                # Run agent analysis in threadpool to avoid blocking event loop
-                agent_output = await run_in_threadpool(run_agent_analysis, signal)
-                
-                # Parse agent output into alert
-                alert = Alert(
-                    alert_id=str(uuid.uuid4()),
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                    user=signal.user,
-                    threat_type=signal.signal_type.value,
-                    severity=signal.severity,
-                    explanation=agent_output.get("result", "No explanation available"),
-                    recommendation="Review immediately and verify user identity",
-                    agent_trace=agent_output.get("agent_trace", []),
-                    raw_events=[event.model_dump() if hasattr(event, 'model_dump') else event 
-                               for event in signal.events],
-                    metadata={
-                        "signal_id": signal.signal_id,
-                        "agent_success": agent_output.get("success", False),
-                        **signal.metadata
-                    }
-                )
-                
-                # Store alert
-                storage.add_alert(alert)
-                storage.mark_signal_processed(signal.signal_id)
-                
-                print(f"✅ Alert {alert.alert_id} created from signal {signal.signal_id}")
-        
+            release_signals(signal_aggregator.due())
         except Exception as e:
-            print(f"⚠️  Error in background processing: {e}")
-        
-        # Check every 5 seconds
-        await asyncio.sleep(5)
+            print(f"⚠️  Failed to release aggregated signals: {e}")
+
+
+async def run_detection(fn, *args):
+    """
+    Call a detection engine method from the event loop.
+    
+    The in-process engine is pure CPU work and runs inline; the sharded
+    engine waits on its worker processes, so it runs in the threadpool.
+    """
+    if detection_engine.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Detection State Checkpoints
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+CHECKPOINT_PATH = os.getenv(
+    "ARXIS_CHECKPOINT_PATH",
+    os.path.join(os.getenv("ARXIS_DATA_DIR", "data"), "detection_state.ckpt")
+)
+CHECKPOINT_INTERVAL = float(os.getenv("ARXIS_CHECKPOINT_INTERVAL", "30"))
+CHECKPOINT_REPLAY = int(os.getenv("ARXIS_CHECKPOINT_REPLAY", "1000"))
+
+
+def restore_detection_state() -> None:
+    """
+    Warm-start detection windows from the last checkpoint plus recent logs.
+    
+    Logs ingested after the checkpoint are only replayed when the storage
+    backend keeps logs across restarts (SQLite); the memory backend starts
+    with an empty log buffer, so windows come from the checkpoint alone.
+    """
+    started = time.perf_counter()
+    checkpoint = load_checkpoint(detection_engine, CHECKPOINT_PATH)
+    if checkpoint is None:
+        replayed = replay_recent_logs(detection_engine, storage, CHECKPOINT_REPLAY)
+    elif checkpoint["log_cursor"] is None:
+        # Older checkpoint without a cursor: can't tell which logs it covers
+        replayed = 0
+    elif not storage.persistent_logs:
+        print("⚠️  Logs ingested after the detection checkpoint are not kept by the memory "
+              "backend; windows restored from the checkpoint only (use ARXIS_STORAGE_BACKEND=sqlite "
+              "to replay them)")
+        replayed = 0
+    else:
+        replayed = replay_recent_logs(detection_engine, storage, CHECKPOINT_REPLAY, after=checkpoint["log_cursor"])
+    
+    if checkpoint is not None or replayed:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"♻️  Detection state warm start in {elapsed_ms:.0f}ms ({replayed} logs replayed)")
+
+
+async def checkpoint_detection_state() -> None:
+    """Write a checkpoint without blocking ingestion on disk I/O."""
+    # Export where detection runs for a consistent view (the event loop, or
+    # the threadpool for the sharded engine); compress and write in the threadpool.
+    # The in-process engine analyzes every log on the loop right after storing
+    # it, so the cursor read here covers exactly the exported state.
+    log_cursor = storage.get_log_cursor()
+    snapshot = await run_detection(detection_engine.export_state)
+    data = await run_in_threadpool(encode_checkpoint, snapshot, log_cursor)
+    await run_in_threadpool(write_checkpoint, CHECKPOINT_PATH, data)
+
+
+async def checkpoint_loop() -> None:
+    """Periodically checkpoint detection state."""
+    while True:
+        await asyncio.sleep(CHECKPOINT_INTERVAL)
+        try:
+            await checkpoint_detection_state()
+        except Exception as e:
+            print(f"⚠️  Detection checkpoint failed: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup/shutdown lifecycle."""
-    # Start background task for processing signals
-    task = asyncio.create_task(process_pending_signals())
-    print("✅ Background signal processor started")
+    agent_events.attach(asyncio.get_running_loop())
+    feed_events.attach(asyncio.get_running_loop())
+    restore_detection_state()
+    checkpointer = asyncio.create_task(checkpoint_loop()) if CHECKPOINT_INTERVAL > 0 else None
+    aggregation = asyncio.create_task(aggregation_loop()) if SIGNAL_AGGREGATION_WINDOW > 0 else None
+    feed_metrics_task = asyncio.create_task(feed_metrics_loop()) if FEED_METRICS_INTERVAL > 0 else None
+    
+    # Build one agent set per worker up front so the first runs don't pay for it
+    try:
+        await run_in_threadpool(agent_registry.warm, agent_pool.concurrency)
+    except Exception as e:
+        print(f"⚠️  Could not pre-build agents: {e}")
+    
+    # Start agent workers; ingestion feeds them directly from here on
+    agent_pool.start()
+    # Signals left pending by a previous run (e.g. SQLite backend); any that
+    # don't fit the queue are re-queued as it drains
+    recovered = agent_pool.refill()
+    print(f"✅ Background signal processor started ({agent_pool.concurrency} workers)")
+    if recovered:
+        print(f"♻️  Re-queued {recovered} pending signals")
     
     yield
     
     # Shutdown
-    task.cancel()
+    for task in (checkpointer, aggregation, feed_metrics_task):
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    # Persist open incidents so they are re-queued as pending on restart
+    storage.add_signals(signal_aggregator.drain())
+    await agent_pool.stop()
+    try:
+        await checkpoint_detection_state()
+    except Exception as e:
+        print(f"⚠️  Final detection checkpoint failed: {e}")
+    detection_engine.close()
+    storage.flush()
     print("🛑 Background processor stopped")
 
 
@@ -132,55 +364,251 @@ async def ingest_log(log: SecurityLog):
     2. Run detection engine
     3. If signal detected → queue for agent processing
     """
-    # Store log
-    storage.add_log(log)
+    with pipeline_metrics.time("ingest"):
+        # Store log
+        with pipeline_metrics.time("storage"):
+            storage.add_log(log)
+        
+        # Run detection
+        with pipeline_metrics.time("detection"):
+            signal = await run_detection(detection_engine.analyze, log)
+        
+        if signal:
+            # Fold into an open incident (or store it) and queue for agent processing
+            signal_id, = dispatch_signals([signal])
+            print(f"🚨 Detection: {signal.signal_type.value} for {signal.user}")
+            
+            return {
+                "status": "detected",
+                "signal_type": signal.signal_type.value,
+                "signal_id": signal_id
+            }
+        
+        return {"status": "ok"}
+
+
+# Logs are stored and analyzed in chunks of this size while a batch streams in
+BATCH_CHUNK_SIZE = 1000
+
+# Cap on per-record validation errors echoed back to the client
+MAX_BATCH_ERRORS = 20
+
+
+async def _iter_ndjson_lines(request: Request):
+    """Yield non-empty lines of an NDJSON body as it streams in."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def _iter_json_array(request: Request):
+    """Yield the raw items of a JSON array body."""
+    try:
+        items = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of logs")
+
+    for item in items:
+        yield item
+
+
+@app.post("/logs/batch", status_code=200)
+async def ingest_log_batch(request: Request):
+    """
+    Ingest a batch of security logs.
+    
+    Accepts either a JSON array of logs or a streamed NDJSON body
+    (Content-Type: application/x-ndjson), one log per line.
+    
+    Flow:
+    1. Validate each record (invalid records are rejected individually)
+    2. Store valid logs in bulk
+    3. Run detection over the whole batch
+    4. Queue detected signals for agent processing
+    """
+    content_type = request.headers.get("content-type", "")
+    is_ndjson = "ndjson" in content_type or "jsonl" in content_type
+    
+    started = time.perf_counter()
+    if is_ndjson:
+        records = _iter_ndjson_lines(request)
+        parse = SecurityLog.model_validate_json
+    else:
+        records = _iter_json_array(request)
+        parse = SecurityLog.model_validate
     
-    # Run detection
-    signal = detection_engine.analyze(log)
+    accepted = 0
+    errors = []
+    detections = []
+    chunk: List[SecurityLog] = []
+    chunk_indexes: List[int] = []
+    index = 0
     
-    if signal:
-        # Store signal for background processing
-        storage.add_signal(signal)
-        print(f"🚨 Detection: {signal.signal_type.value} for {signal.user}")
+    async for record in records:
+        try:
+            chunk.append(parse(record))
+            chunk_indexes.append(index)
+        except ValidationError as e:
+            if len(errors) < MAX_BATCH_ERRORS:
+                first = e.errors()[0]
+                field = ".".join(str(part) for part in first["loc"]) or "log"
+                errors.append({"index": index, "error": f"{field}: {first['msg']}"})
+        index += 1
         
-        return {
-            "status": "detected",
-            "signal_type": signal.signal_type.value,
-            "signal_id": signal.signal_id
-        }
+        if len(chunk) >= BATCH_CHUNK_SIZE:
+            await _flush_chunk(chunk, chunk_indexes, detections)
+            accepted += len(chunk)
+            chunk, chunk_indexes = [], []
+    
+    if chunk:
+        await _flush_chunk(chunk, chunk_indexes, detections)
+        accepted += len(chunk)
+    
+    if index == 0:
+        raise HTTPException(status_code=400, detail="Empty batch")
     
-    return {"status": "ok"}
+    if detections:
+        print(f"🚨 Batch detection: {len(detections)} signals in {accepted} logs")
+    
+    pipeline_metrics.observe("ingest", time.perf_counter() - started, accepted)
+    
+    return {
+        "status": "detected" if detections else "ok",
+        "accepted": accepted,
+        "rejected": index - accepted,
+        "errors": errors,
+        "detections": detections
+    }
+
+
+async def _flush_chunk(
+    chunk: List[SecurityLog],
+    chunk_indexes: List[int],
+    detections: List[Dict[str, Any]]
+) -> None:
+    """Store and analyze a chunk of validated logs, recording detections."""
+    with pipeline_metrics.time("storage", len(chunk)):
+        storage.add_logs(chunk)
+    with pipeline_metrics.time("detection", len(chunk)):
+        signals = await run_detection(detection_engine.analyze_batch, chunk)
+    detected = [(record_index, signal) for record_index, signal in zip(chunk_indexes, signals) if signal]
+    signal_ids = dispatch_signals([signal for _, signal in detected])
+    
+    for (record_index, signal), signal_id in zip(detected, signal_ids):
+        detections.append({
+            "index": record_index,
+            "signal_type": signal.signal_type.value,
+            "signal_id": signal_id
+        })
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Frontend API Endpoints
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+# Fields dropped by view=summary (the bulky ones list views don't need)
+SUMMARY_OMIT_FIELDS = {"raw_events", "explanation"}
+
+
+def _parse_time_param(name: str, value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    epoch = parse_timestamp(value)
+    if epoch is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp")
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
 @app.get("/alerts", response_model=List[Alert])
 async def get_alerts(
     severity: str = None,
-    limit: int = 100
+    limit: int = 100,
+    user: Optional[str] = None,
+    threat_type: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    order: str = "asc"
 ):
     """
-    Get all alerts, optionally filtered by severity.
+    Get alerts, one keyset page at a time.
     
     Query params:
     - severity: Filter by severity (LOW/MEDIUM/HIGH/CRITICAL)
-    - limit: Max number of alerts to return
+    - user, threat_type: Exact-match filters
+    - start, end: ISO-8601 time range (start <= timestamp < end)
+    - limit: Page size
+    - before: Cursor; return the page of older alerts (X-Next-Cursor)
+    - after: Cursor; return the page of newer alerts (X-Prev-Cursor)
+    - fields: Comma-separated fields to return (alert_id is always included)
+    - view: "summary" omits raw_events and explanation
+    - order: "asc" (oldest first, default) or "desc" within the page
+    
+    Without a cursor the page holds the most recent matching alerts.
+    Response headers X-Next-Cursor / X-Prev-Cursor carry the cursors for
+    the adjacent older / newer pages.
     """
+    sev = None
     if severity:
         try:
             sev = Severity(severity.upper())
-            alerts = storage.get_alerts_by_severity(sev)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid severity level")
-    else:
-        alerts = storage.get_all_alerts()
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    
+    try:
+        before_key = decode_cursor(before) if before else None
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Convert to Alert objects and apply limit
-    alert_objects = [Alert(**alert) for alert in alerts[-limit:]]
+    projection = None
+    if fields:
+        projection = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = projection - set(Alert.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        projection.add("alert_id")
+    elif view == "summary":
+        projection = set(Alert.model_fields) - SUMMARY_OMIT_FIELDS
+    elif view not in (None, "full"):
+        raise HTTPException(status_code=400, detail="view must be summary or full")
     
-    return alert_objects
+    page = storage.query_alerts(
+        limit,
+        before=before_key,
+        after=after_key,
+        severity=sev,
+        user=user,
+        threat_type=threat_type,
+        start=_parse_time_param("start", start),
+        end=_parse_time_param("end", end)
+    )
+    
+    headers = {}
+    if page:
+        headers["X-Next-Cursor"] = encode_cursor(alert_key(page[-1]))
+        headers["X-Prev-Cursor"] = encode_cursor(alert_key(page[0]))
+    if order == "asc":
+        page.reverse()
+    
+    # Stored records are validated Alert dumps; skip re-validating them
+    if projection is not None:
+        page = [{key: alert[key] for key in alert if key in projection} for alert in page]
+    return JSONResponse(content=page, headers=headers)
 
 
 @app.get("/alerts/{alert_id}", response_model=Alert)
@@ -211,6 +639,92 @@ async def get_metrics():
     return MetricsSummary(**metrics)
 
 
+@app.get("/metrics/rollups")
+async def get_metric_rollups(minutes: int = 60):
+    """
+    Per-minute rate series for dashboard graphs.
+    
+    Returns log, signal and alert counts per minute for the last `minutes`
+    minutes (oldest first, up to the retained hour), running totals and the
+    top threat types and users by alert count.
+    """
+    return storage.get_rollups(minutes)
+
+
+
+
+@app.get("/metrics/agents")
+async def get_agent_metrics():
+    """
+    Get agent worker pool metrics.
+    
+    Returns worker count, in-flight runs, queue depth (backpressure),
+    retry/timeout counters and average queue wait / run time, plus
+    signal aggregation, analysis cache, agent registry and per-tier
+    triage counters (latency and agent runs).
+    """
+    return {
+        **agent_pool.stats(),
+        "aggregation": signal_aggregator.stats(),
+        "cache": analysis_cache.stats(),
+        "agents": agent_registry.stats(),
+        "triage": triage_scorer.stats()
+    }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Agent Progress Streams (Server-Sent Events)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+@app.get("/signals/stream")
+async def stream_agent_progress(request: Request, cursor: Optional[int] = None):
+    """
+    Stream agent progress for all in-flight signals (SSE).
+    
+    Events: signal_queued, analysis_started, agent_step (one per finished
+    agent task, with partial output), analysis_completed. Reconnecting
+    clients resume after `Last-Event-ID` (or `?cursor=`).
+    """
+    after = parse_cursor(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        sse_events(agent_events, request.is_disconnected, after=after if after is not None else cursor),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@app.get("/signals/{signal_id}/stream")
+async def stream_signal_progress(signal_id: str, request: Request):
+    """
+    Stream agent progress for one signal (SSE), ending once its alert is created.
+    
+    Buffered events for the signal are replayed first, so subscribing just
+    after detection does not miss early steps. A fresh subscription starts
+    at the oldest buffered event rather than 0, so a wrapped buffer does not
+    open the stream with a reset the signal filter cannot judge.
+    """
+    after = parse_cursor(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        sse_events(
+            agent_events,
+            request.is_disconnected,
+            after=after if after is not None else agent_events.buffer_cursor,
+            accept=lambda event, data: data.get("signal_id") == signal_id,
+            until=lambda event, data: event == "analysis_completed"
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@app.get("/metrics/detection")
+async def get_detection_metrics():
+    """
+    Get detection state metrics.
+    
+    Returns tracked users, buffered window events and TTL/LRU eviction counts.
+    """
+    return await run_detection(detection_engine.state_stats)
 
 
 @app.get("/health")
@@ -244,7 +758,7 @@ async def chat_with_ai(request: ChatRequest):
         from chatbot import get_ai_response, get_quick_action_response
         
         # Gather context
-        alerts = storage.get_all_alerts()
+        alerts = storage.get_recent_alerts(20)
         context = {}
         
         
@@ -286,7 +800,7 @@ async def chat_with_ai(request: ChatRequest):
             from collections import Counter
             severity_counts = Counter(a.get("severity") for a in alerts[-20:])
             context["alert_stats"] = {
-                "total": len(alerts),
+                "total": storage.get_alert_count(),
                 "critical": severity_counts.get("CRITICAL", 0),
                 "high": severity_counts.get("HIGH", 0),
                 "medium": severity_counts.get("MEDIUM", 0),
@@ -327,102 +841,204 @@ async def get_realtime_metrics():
     """
     Get real-time system metrics for heartbeat visualization.
     
-    Returns activity data for:
-    - Log Collector: based on recent log ingest rate
-    - Threat Intelligence: based on detection signals
-    - SIEM Engine: based on overall processing
-    - Alert Pipeline: based on alert creation rate
-    - Analytics Engine: based on agent processing
-    - Database: based on storage operations
-    """
-    import random
-    
-    # Get recent activity from storage
-    recent_logs = storage.get_recent_logs(100)
-    recent_alerts = storage.get_all_alerts()[-20:]
-    pending_signals = storage.get_pending_signals()
-    
-    # Calculate activity rates (events in last minute simulation)
-    log_rate = len(recent_logs) if recent_logs else 0
-    alert_rate = len(recent_alerts) if recent_alerts else 0
-    signal_rate = len(pending_signals) if pending_signals else 0
-    
-    # Generate realistic latency values based on actual activity
-    # More activity = slightly higher latency
-    def compute_latency(base: int, activity: int, variance: int = 10) -> int:
-        load_factor = min(activity / 20, 1.5)  # Cap at 1.5x
-        jitter = random.randint(-variance, variance)
-        return max(5, int(base * load_factor + jitter))
-    
-    # Generate history arrays (last 10 readings) with realistic variance
-    def generate_history(base: int, activity: int) -> list:
-        history = []
-        for _ in range(10):
-            history.append(compute_latency(base, activity, 5))
-        return history
-    
-    components = [
-        {
-            "id": "1",
-            "name": "Log Collector",
-            "status": "healthy" if log_rate > 0 else "degraded",
-            "latency": compute_latency(45, log_rate),
-            "history": generate_history(45, log_rate),
-            "activity": log_rate
-        },
-        {
-            "id": "2", 
-            "name": "Threat Intelligence",
-            "status": "healthy",
-            "latency": compute_latency(120, signal_rate),
-            "history": generate_history(120, signal_rate),
-            "activity": signal_rate
-        },
-        {
-            "id": "3",
-            "name": "SIEM Engine",
-            "status": "healthy",
-            "latency": compute_latency(85, log_rate + signal_rate),
-            "history": generate_history(85, log_rate + signal_rate),
-            "activity": log_rate + signal_rate
-        },
-        {
-            "id": "4",
-            "name": "Alert Pipeline",
-            "status": "healthy" if signal_rate == 0 else "degraded",
-            "latency": compute_latency(150, alert_rate + signal_rate * 3),
-            "history": generate_history(150, alert_rate + signal_rate * 3),
-            "activity": alert_rate
-        },
-        {
-            "id": "5",
-            "name": "Analytics Engine",
-            "status": "healthy",
-            "latency": compute_latency(310, alert_rate),
-            "history": generate_history(310, alert_rate),
-            "activity": alert_rate
-        },
-        {
-            "id": "6",
-            "name": "Database",
+    The same payload is pushed to GET /feed subscribers as "metrics" deltas.
+    """
+    return build_realtime_metrics()
+
+
+# Dashboard components and the pipeline stage each one reports
+REALTIME_COMPONENTS = [
+    ("1", "Log Collector", "ingest"),
+    ("2", "Threat Intelligence", "triage"),
+    ("3", "SIEM Engine", "detection"),
+    ("4", "Alert Pipeline", "queue_wait"),
+    ("5", "Analytics Engine", "agent_analysis"),
+    ("6", "Database", "storage"),
+]
+
+
+def build_realtime_metrics() -> Dict[str, Any]:
+    """
+    Build real-time system metrics for heartbeat visualization.
+    
+    Each component reports measured latency for its pipeline stage (see
+    pipeline_metrics.py):
+    - Log Collector: ingest handlers (/logs, /logs/batch)
+    - Threat Intelligence: triage scoring
+    - SIEM Engine: detection engine
+    - Alert Pipeline: time signals wait for an agent worker
+    - Analytics Engine: agent analysis runs
+    - Database: storage operations
+    
+    `latency` is the p50 in ms, `history` the mean latency of each of the
+    last 10 seconds and `activity` the stage's items per minute.
+    """
+    # Totals from the storage rollup (no store scans, no storage lock)
+    rollup = storage.rollup
+    log_rate = rollup.rate("logs")
+    signal_rate = rollup.pending_signals
+    
+    components = []
+    for component_id, name, stage in REALTIME_COMPONENTS:
+        stats = pipeline_metrics.stage_stats(stage)
+        components.append({
+            "id": component_id,
+            "name": name,
+            "stage": stage,
             "status": "healthy",
-            "latency": compute_latency(12, log_rate + alert_rate),
-            "history": generate_history(12, log_rate + alert_rate),
-            "activity": log_rate + alert_rate
-        }
-    ]
+            "latency": stats["p50_ms"],
+            "p95": stats["p95_ms"],
+            "p99": stats["p99_ms"],
+            "history": stats["history"],
+            "activity": round(stats["rate"] * 60),
+            "throughput": stats["rate"]
+        })
+    
+    # Idle collector / backed-up alert queue
+    if log_rate == 0:
+        components[0]["status"] = "degraded"
+    if signal_rate > 0:
+        components[3]["status"] = "degraded"
     
     return {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "components": components,
         "summary": {
-            "total_logs": log_rate,
-            "total_alerts": alert_rate,
+            "total_logs": rollup.total_logs,
+            "total_alerts": rollup.total_alerts,
             "pending_signals": signal_rate
         }
     }
 
 
+@app.get("/metrics/prom")
+async def get_prometheus_metrics():
+    """
+    Prometheus text exposition of pipeline latency, throughput and totals.
+    """
+    rollup = storage.rollup
+    pool = agent_pool.stats()
+    body = pipeline_metrics.prometheus() + "".join([
+        render_metric("arxis_logs_total", "counter", "Logs ingested",
+                      [("", {}, rollup.total_logs)]),
+        render_metric("arxis_signals_total", "counter", "Detection signals stored",
+                      [("", {}, rollup.total_signals)]),
+        render_metric("arxis_signals_pending", "gauge", "Signals awaiting agent analysis",
+                      [("", {}, rollup.pending_signals)]),
+        render_metric("arxis_alerts_total", "counter", "Alerts created by severity",
+                      [("", {"severity": severity}, count)
+                       for severity, count in rollup.severity_counts(level.value for level in Severity).items()]),
+        render_metric("arxis_agent_queue_depth", "gauge", "Signals queued for agent workers",
+                      [("", {}, pool["queue_depth"])]),
+        render_metric("arxis_agent_in_flight", "gauge", "Agent analyses running",
+                      [("", {}, pool["in_flight"])]),
+    ])
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Live Feed (Server-Sent Events)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# New alerts and metric deltas, pushed once per event instead of polled per client
+feed_events = EventBroker(history=int(os.getenv("ARXIS_FEED_HISTORY", "1000")))
+
+# Seconds between metric delta pushes (0 = no metrics on the feed)
+FEED_METRICS_INTERVAL = float(os.getenv("ARXIS_FEED_METRICS_INTERVAL", "2"))
+
+# Last metrics pushed to the feed (baseline for deltas and for new subscribers)
+feed_metrics: Dict[str, Any] = {}
+
+
+# Component fields compared for deltas. history, activity and throughput
+# drift every second, so diffing them would resend every component each push;
+# they ride along whenever one of these changes.
+DELTA_COMPONENT_FIELDS = ("name", "stage", "status", "latency", "p95", "p99")
+
+
+def _component_key(component: Dict[str, Any]) -> tuple:
+    return tuple(component.get(field) for field in DELTA_COMPONENT_FIELDS)
+
+
+def diff_realtime_metrics(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes between two realtime metric payloads.
+    
+    Components are compared on DELTA_COMPONENT_FIELDS only; a changed
+    component is sent whole.
+    
+    Returns:
+        {"timestamp", "summary": {changed keys}, "components": [changed components]}
+    """
+    previous_components = {c["id"]: _component_key(c) for c in previous.get("components", [])}
+    previous_summary = previous.get("summary", {})
+    return {
+        "timestamp": current["timestamp"],
+        "summary": {
+            key: value for key, value in current["summary"].items()
+            if previous_summary.get(key) != value
+        },
+        "components": [
+            component for component in current["components"]
+            if previous_components.get(component["id"]) != _component_key(component)
+        ]
+    }
+
+
+async def feed_metrics_loop() -> None:
+    """Compute realtime metrics once per interval and push what changed."""
+    global feed_metrics
+    while True:
+        await asyncio.sleep(FEED_METRICS_INTERVAL)
+        if not feed_events.subscribers:
+            continue
+        try:
+            current = build_realtime_metrics()
+            delta = diff_realtime_metrics(feed_metrics, current)
+            feed_metrics = current
+            if delta["summary"] or delta["components"]:
+                feed_events.publish("metrics", delta)
+        except Exception as e:
+            print(f"⚠️  Feed metrics update failed: {e}")
+
+
+async def feed_stream(request: Request, after: Optional[int]):
+    """SSE body for /feed: hello handshake (new clients), then live events."""
+    if after is None:
+        # Fresh client: hand over the current cursor and a metrics baseline;
+        # the client loads existing alerts once and applies events from here
+        after = feed_events.cursor
+        yield sse_message(after, "hello", {
+            "cursor": after,
+            "metrics": feed_metrics or build_realtime_metrics()
+        })
+    
+    async for message in sse_events(feed_events, request.is_disconnected, after=after):
+        yield message
+
+
+@app.get("/feed")
+async def live_feed(request: Request, cursor: Optional[int] = None):
+    """
+    Push feed of new alerts and metric deltas (Server-Sent Events).
+    
+    Handshake:
+    - No cursor: a "hello" event with the current cursor and a full metrics
+      snapshot, then live events
+    - `Last-Event-ID` header (EventSource reconnect) or `?cursor=`: missed
+      events are replayed, or a "reset" event is sent if they are no longer
+      buffered (the client should reload alerts)
+    
+    Events: alert (full alert), metrics ({summary, components} that changed)
+    """
+    after = parse_cursor(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        feed_stream(request, after if after is not None else cursor),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Debug Endpoints (POC only)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -438,7 +1054,7 @@ async def debug_signals():
     """Get all signals for debugging."""
     return {
         "pending": storage.get_pending_signals(),
-        "total": len(storage.signals)
+        "total": storage.get_signal_count()
     }
 
 
@@ -0,0 +1,500 @@
+"""
+Load & Latency Benchmark for Arxis SOC
+
+Drives the full ingestion pipeline (FastAPI app → storage → detection →
+agent workers) with seeded synthetic traffic and reports ingest throughput,
+request and pipeline-stage latency percentiles, storage growth and memory.
+
+Traffic is reproducible: logs come from a seeded random source and carry
+simulated timestamps spaced at the target rate, so detection windows see
+the same event stream on every run. Agent analysis is replaced by a stub
+with a fixed latency, so results measure the platform rather than the LLM.
+
+Usage:
+    python benchmark.py --events 20000 --batch 500
+    python benchmark.py --events 5000 --rate 500 --mix brute_force=0.01,escalation=0.005
+    python benchmark.py --socket                      # over a local TCP socket (uvicorn)
+    python benchmark.py --output bench.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from log_generator import generate_log, generate_ip, user_pool, ASSETS, SAFE_LOCATIONS, SUSPICIOUS_LOCATIONS
+
+
+# Simulated clock start, so timestamps are identical across runs
+BENCH_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# Events per second used to space simulated timestamps when --rate is 0
+DEFAULT_SIM_RATE = 100.0
+
+# Failed logins per brute-force burst (the default rule fires above 5)
+BRUTE_FORCE_BURST = 8
+
+DEFAULT_MIX = "brute_force=0.005,escalation=0.002"
+
+# Report keys compared against a baseline: (path, higher_is_better)
+COMPARED_METRICS = [
+    (("ingest", "events_per_second"), True),
+    (("requests", "p95_ms"), False),
+    (("stages", "ingest", "p95_ms"), False),
+    (("stages", "detection", "p95_ms"), False),
+    (("stages", "storage", "p95_ms"), False),
+]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Traffic
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "scenario=probability,..." into a dict."""
+    mix = {}
+    for part in filter(None, (item.strip() for item in text.split(","))):
+        name, _, value = part.partition("=")
+        if name not in ATTACKS:
+            raise ValueError(f"Unknown attack scenario: {name} (choose from {', '.join(ATTACKS)})")
+        mix[name] = float(value)
+    return mix
+
+
+class TrafficGenerator:
+    """
+    Seeded synthetic traffic: background logs from log_generator with
+    attack scenarios injected at the configured per-event probabilities.
+
+    Args:
+        seed: Random seed
+        users: Size of the user population (see log_generator.user_pool)
+        mix: Attack scenario -> probability of starting one per event
+        sim_rate: Events per simulated second (timestamp spacing)
+    """
+
+    def __init__(self, seed: int, users: int, mix: Dict[str, float], sim_rate: float):
+        self.rng = random.Random(seed)
+        self.users = user_pool(users)
+        self.mix = mix
+        self.step = timedelta(seconds=1.0 / sim_rate)
+        self.clock = BENCH_EPOCH
+        self.injected = {name: 0 for name in ATTACKS}
+
+    def _timestamp(self) -> str:
+        self.clock += self.step
+        return self.clock.isoformat()
+
+    def _log(self, user: str, event_type: str, location: str, asset: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "timestamp": self._timestamp(),
+            "user": user,
+            "event_type": event_type,
+            "ip": generate_ip(self.rng),
+            "location": location,
+            "asset": asset or self.rng.choice(ASSETS),
+        }
+
+    def brute_force(self) -> List[Dict[str, Any]]:
+        """A burst of failed logins for one user from one risky location."""
+        user = self.rng.choice(self.users)
+        location = self.rng.choice(SUSPICIOUS_LOCATIONS)
+        return [self._log(user, "failed_login", location) for _ in range(BRUTE_FORCE_BURST)]
+
+    def escalation(self) -> List[Dict[str, Any]]:
+        """Privilege escalation followed by a data download on the same asset."""
+        user = self.rng.choice(self.users)
+        asset = self.rng.choice(ASSETS)
+        location = self.rng.choice(SAFE_LOCATIONS)
+        return [
+            self._log(user, "privilege_escalation", location, asset),
+            self._log(user, "data_download", location, asset),
+        ]
+
+    def logs(self, count: int) -> Iterator[Dict[str, Any]]:
+        """Yield `count` logs (attack events included)."""
+        produced = 0
+        while produced < count:
+            for name, probability in self.mix.items():
+                if self.rng.random() < probability:
+                    self.injected[name] += 1
+                    for log in ATTACKS[name](self)[:count - produced]:
+                        produced += 1
+                        yield log
+            if produced < count:
+                produced += 1
+                yield generate_log(self.rng, self._timestamp(), self.users)
+
+
+ATTACKS = {
+    "brute_force": TrafficGenerator.brute_force,
+    "escalation": TrafficGenerator.escalation,
+}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Measurement helpers
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of latency samples (seconds) in ms."""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return round(1000 * ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {"p50_ms": rank(0.5), "p95_ms": rank(0.95), "p99_ms": rank(0.99), "max_ms": rank(1.0)}
+
+
+def memory_usage() -> Dict[str, Optional[float]]:
+    """Current and peak resident memory of this process in MB (None if unknown)."""
+    current = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        peak = peak_kb / 2 ** 20 if sys.platform == "darwin" else peak_kb / 2 ** 10
+    except ImportError:
+        pass
+    return {
+        "rss_mb": round(current, 1) if current is not None else None,
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+    }
+
+
+def directory_size(path: str) -> int:
+    """Total size of the files under a directory, in bytes."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def stub_agent_analysis(latency: float):
+    """Stand-in for run_agent_analysis that sleeps `latency` seconds."""
+    def analyze(signal, roster=None, on_progress=None) -> Dict[str, Any]:
+        if latency > 0:
+            time.sleep(latency)
+        return {
+            "success": True,
+            "agent_trace": ["Benchmark Stub"],
+            "result": f"Benchmark analysis of {signal.signal_type.value} for {signal.user}",
+            "signal_id": signal.signal_id,
+        }
+    return analyze
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Driver
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def configure_environment(args: argparse.Namespace, data_dir: str) -> None:
+    """Point the app at a scratch data dir before it is imported."""
+    os.environ["ARXIS_DATA_DIR"] = data_dir
+    os.environ["ARXIS_STORAGE_BACKEND"] = args.storage
+    os.environ["ARXIS_SIGNAL_AGGREGATION_WINDOW"] = str(args.aggregation_window)
+    os.environ["ARXIS_AGENT_WORKERS"] = str(args.agent_workers)
+    os.environ.setdefault("ARXIS_CHECKPOINT_INTERVAL", "0")
+    os.environ.setdefault("ARXIS_FEED_METRICS_INTERVAL", "0")
+
+
+async def send_traffic(client, args: argparse.Namespace, traffic: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Post logs with `args.concurrency` producers at up to `args.rate` events/s.
+
+    Returns:
+        Sent/accepted counts, detections by signal type, request latencies
+        and the wall-clock duration
+    """
+    batch_size = max(1, args.batch)
+    path = "/logs/batch" if args.batch > 0 else "/logs"
+    latencies: List[float] = []
+    detections: Dict[str, int] = {}
+    totals = {"sent": 0, "accepted": 0, "errors": 0}
+    started = time.perf_counter()
+
+    def next_batch() -> List[Dict[str, Any]]:
+        batch = []
+        for log in traffic:
+            batch.append(log)
+            if len(batch) == batch_size:
+                break
+        return batch
+
+    async def producer() -> None:
+        while True:
+            batch = next_batch()
+            if not batch:
+                return
+            if args.rate > 0:
+                # Pace against the schedule so the aggregate rate holds
+                due = started + totals["sent"] / args.rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            totals["sent"] += len(batch)
+
+            sent_at = time.perf_counter()
+            try:
+                response = await client.post(path, json=batch if args.batch > 0 else batch[0])
+            except Exception as e:
+                totals["errors"] += 1
+                print(f"⚠️  Request failed: {e}")
+                continue
+            latencies.append(time.perf_counter() - sent_at)
+
+            if response.status_code != 200:
+                totals["errors"] += 1
+                continue
+            body = response.json()
+            if args.batch > 0:
+                totals["accepted"] += body.get("accepted", 0)
+                found = body.get("detections", [])
+            else:
+                totals["accepted"] += 1
+                found = [body] if body.get("status") == "detected" else []
+            for detection in found:
+                detections[detection["signal_type"]] = detections.get(detection["signal_type"], 0) + 1
+
+    await asyncio.gather(*(producer() for _ in range(max(1, args.concurrency))))
+    return {**totals, "detections": detections, "latencies": latencies,
+            "duration": time.perf_counter() - started}
+
+
+async def wait_for_agents(api, timeout: float) -> bool:
+    """Wait until the agent pool is idle (aggregated incidents are released first)."""
+    if api.SIGNAL_AGGREGATION_WINDOW > 0:
+        api.release_signals(api.signal_aggregator.drain())
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = api.agent_pool.stats()
+        if stats["queue_depth"] == 0 and stats["in_flight"] == 0:
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one benchmark and return its report."""
+    import httpx
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="arxis-bench-")
+    configure_environment(args, data_dir)
+
+    import api
+    from pipeline_metrics import pipeline_metrics
+
+    api.run_agent_analysis = stub_agent_analysis(args.agent_latency / 1000)
+    traffic = TrafficGenerator(
+        seed=args.seed,
+        users=args.users,
+        mix=parse_mix(args.mix),
+        sim_rate=args.rate or DEFAULT_SIM_RATE
+    )
+
+    storage_before = directory_size(data_dir)
+    memory_before = memory_usage()
+
+    if args.socket:
+        sent, drained = await _run_over_socket(api, args, traffic)
+    else:
+        async with api.lifespan(api.app):
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                sent = await send_traffic(client, args, traffic.logs(args.events))
+            drained = await wait_for_agents(api, args.drain_timeout)
+
+    rollup = api.storage.get_rollups(1)["totals"]
+    stages = pipeline_metrics.snapshot()
+    for stats in stages.values():
+        stats.pop("history", None)
+
+    return {
+        "config": {
+            "events": args.events,
+            "rate": args.rate,
+            "batch": args.batch,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "users": args.users,
+            "mix": parse_mix(args.mix),
+            "storage": args.storage,
+            "transport": "socket" if args.socket else "asgi",
+            "agent_latency_ms": args.agent_latency,
+        },
+        "ingest": {
+            "sent": sent["sent"],
+            "accepted": sent["accepted"],
+            "errors": sent["errors"],
+            "duration_s": round(sent["duration"], 3),
+            "events_per_second": round(sent["accepted"] / sent["duration"], 1) if sent["duration"] else 0.0,
+        },
+        "requests": {"count": len(sent["latencies"]), **percentiles(sent["latencies"])},
+        "attacks_injected": traffic.injected,
+        "detections": sent["detections"],
+        "agents_drained": drained,
+        "stages": stages,
+        "detection_state": api.detection_engine.state_stats(),
+        "storage": {
+            **rollup,
+            "bytes_on_disk": directory_size(data_dir) - storage_before,
+        },
+        "memory": {
+            "rss_before_mb": memory_before["rss_mb"],
+            **memory_usage(),
+        },
+    }
+
+
+async def _run_over_socket(api, args: argparse.Namespace, traffic: TrafficGenerator):
+    """Serve the app with uvicorn on a local port and send traffic over TCP."""
+    import httpx
+    import socket
+    import uvicorn
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+
+    try:
+        limits = httpx.Limits(max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            sent = await send_traffic(client, args, traffic.logs(args.events))
+        drained = await wait_for_agents(api, args.drain_timeout)
+    finally:
+        server.should_exit = True
+        await serving
+    return sent, drained
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Reporting
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _lookup(report: Dict[str, Any], path) -> Optional[float]:
+    value: Any = report
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of `report` against `baseline`.
+
+    Returns:
+        One message per compared metric that got worse by more than
+        `tolerance` (a fraction, e.g. 0.2 = 20%)
+    """
+    regressions = []
+    for path, higher_is_better in COMPARED_METRICS:
+        current, previous = _lookup(report, path), _lookup(baseline, path)
+        if not current or not previous:
+            continue
+        change = (current - previous) / previous
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{'.'.join(path)}: {previous} → {current} ({change:+.0%})")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    ingest = report["ingest"]
+    requests_ = report["requests"]
+    print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("📊 Arxis Benchmark")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"📥 Ingest:     {ingest['accepted']} logs in {ingest['duration_s']}s "
+          f"→ {ingest['events_per_second']} events/s ({ingest['errors']} errors)")
+    print(f"⏱️  Requests:   p50 {requests_['p50_ms']}ms | p95 {requests_['p95_ms']}ms | "
+          f"p99 {requests_['p99_ms']}ms | max {requests_['max_ms']}ms")
+    for stage, stats in report["stages"].items():
+        if stats["count"]:
+            print(f"   {stage:15s} n={stats['count']:<7d} p50 {stats['p50_ms']}ms | "
+                  f"p95 {stats['p95_ms']}ms | p99 {stats['p99_ms']}ms")
+    print(f"🎯 Attacks:    {report['attacks_injected']}")
+    print(f"🚨 Detections: {report['detections']}")
+    print(f"💾 Storage:    {report['storage']}")
+    print(f"🧠 Memory:     {report['memory']}")
+    if not report["agents_drained"]:
+        print("⚠️  Agent queue did not drain before the timeout")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Arxis SOC load & latency benchmark")
+    parser.add_argument("--events", type=int, default=10000, help="Logs to send")
+    parser.add_argument("--rate", type=float, default=0, help="Target events/s (0 = as fast as possible)")
+    parser.add_argument("--batch", type=int, default=500, help="Logs per /logs/batch request (0 = POST /logs per log)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent producers")
+    parser.add_argument("--seed", type=int, default=42, help="Traffic seed")
+    parser.add_argument("--users", type=int, default=1000, help="Size of the user population")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Attack mix, e.g. brute_force=0.01,escalation=0.005")
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="memory", help="Storage backend")
+    parser.add_argument("--aggregation-window", type=float, default=0, help="Signal aggregation window (seconds)")
+    parser.add_argument("--agent-workers", type=int, default=4, help="Agent worker pool size")
+    parser.add_argument("--agent-latency", type=float, default=10, help="Stub agent analysis latency (ms)")
+    parser.add_argument("--drain-timeout", type=float, default=60, help="Seconds to wait for agents to finish")
+    parser.add_argument("--socket", action="store_true", help="Serve over a local TCP socket with uvicorn")
+    parser.add_argument("--data-dir", help="Data directory (default: a fresh temp dir)")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own log output")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression vs baseline (fraction)")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    print(f"🔥 Sending {args.events} logs (seed {args.seed}, batch {args.batch}, "
+          f"rate {args.rate or 'unlimited'})...")
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+        report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n🚨 Regressions vs {args.compare}:")
+            for message in regressions:
+                print(f"   {message}")
+            return 1
+        print(f"\n✅ No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Detection State Checkpoints for Arxis SOC
+
+Persists the detection engine's sliding-window state so a restart resumes
+brute-force counters and escalation tracking instead of starting cold.
+
+Checkpoint file format:
+    b"ARXCKPT1" + zlib(JSON {"version", "saved_at", "clock", "log_cursor", "users"})
+
+`log_cursor` is the storage's log sequence at the time of the snapshot, so a
+restart replays exactly the logs ingested after it, whatever their timestamps.
+
+Logs in the window state are stored as packed tuples (see pack_log), so
+checkpoints stay small and load without re-validating every log.
+"""
+
+import json
+import os
+import time
+import zlib
+from typing import Any, Dict, Optional
+from models import SecurityLog
+
+
+MAGIC = b"ARXCKPT1"
+VERSION = 3
+
+# Version 1 checkpoints have no log cursor; versions 1-2 store every
+# threshold window event with its full log
+SUPPORTED_VERSIONS = (1, 2, 3)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Encoding
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def encode_checkpoint(snapshot: Dict[str, Any], log_cursor: Optional[int] = None) -> bytes:
+    """
+    Serialize an engine export_state() snapshot to checkpoint bytes.
+
+    Args:
+        snapshot: export_state() output
+        log_cursor: storage.get_log_cursor() read when the snapshot was taken
+    """
+    payload = {
+        "version": VERSION,
+        "saved_at": time.time(),
+        "clock": snapshot["clock"],
+        "log_cursor": log_cursor,
+        "users": snapshot["users"],
+    }
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return MAGIC + zlib.compress(body, 1)
+
+
+def decode_checkpoint(data: bytes) -> Dict[str, Any]:
+    """
+    Parse checkpoint bytes.
+
+    Raises:
+        ValueError: If the data is not a checkpoint of a supported version
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("not an Arxis detection checkpoint")
+
+    try:
+        payload = json.loads(zlib.decompress(data[len(MAGIC):]))
+    except (zlib.error, json.JSONDecodeError) as e:
+        raise ValueError(f"corrupt checkpoint: {e}")
+
+    if payload.get("version") not in SUPPORTED_VERSIONS:
+        raise ValueError(f"unsupported checkpoint version: {payload.get('version')}")
+    payload.setdefault("log_cursor", None)
+    return payload
+
+
+def write_checkpoint(path: str, data: bytes) -> None:
+    """Atomically replace the checkpoint file with `data`."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Save / Restore
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def save_checkpoint(engine, path: str, log_cursor: Optional[int] = None) -> int:
+    """
+    Snapshot an engine's window state to disk.
+
+    Args:
+        engine: DetectionEngine or ShardedDetectionEngine
+        path: Checkpoint file path
+        log_cursor: Storage log sequence covered by the engine's state
+
+    Returns:
+        Number of users written
+    """
+    snapshot = engine.export_state()
+    write_checkpoint(path, encode_checkpoint(snapshot, log_cursor))
+    return len(snapshot["users"])
+
+
+def load_checkpoint(engine, path: str) -> Optional[Dict[str, Any]]:
+    """
+    Restore an engine's window state from disk.
+
+    Args:
+        engine: DetectionEngine or ShardedDetectionEngine
+        path: Checkpoint file path
+
+    Returns:
+        The checkpoint payload ("clock", "log_cursor", ...), or None if
+        there was no usable checkpoint
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            payload = decode_checkpoint(f.read())
+        engine.import_state(payload)
+    except Exception as e:
+        print(f"⚠️  Ignoring detection checkpoint {path}: {e}")
+        return None
+
+    print(f"✅ Restored detection state for {len(payload['users'])} users from {path}")
+    return payload
+
+
+def replay_recent_logs(engine, storage, limit: int, after: Optional[int] = None) -> int:
+    """
+    Rebuild windows from the most recent stored logs.
+
+    With `after` (the checkpoint's log cursor), only logs ingested after the
+    checkpoint are replayed, in ingestion order and including late events
+    with older timestamps, so nothing captured in the checkpoint is counted
+    twice. Signals raised during replay are discarded: they were dispatched
+    when the logs were first ingested.
+
+    Returns:
+        Number of logs replayed
+    """
+    if limit <= 0:
+        return 0
+
+    rows = storage.get_recent_logs(limit) if after is None else storage.get_logs_after(after, limit)
+    logs = []
+    for row in rows:
+        try:
+            logs.append(SecurityLog.model_validate(row))
+        except ValueError:
+            continue
+
+    if logs:
+        engine.analyze_batch(logs)
+    return len(logs)
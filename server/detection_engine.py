@@ -2,155 +2,160 @@
 Detection Engine for Arxis SOC
 
 Rules-based threat detection that analyzes incoming logs and generates signals.
-Each detection rule has a clear, testable condition.
+Rules are declared in rules/default_rules.json (see detection_rules.py) and
+compiled once into an event-type dispatch table.
 """
 
-import uuid
-from datetime import datetime, timezone, timedelta
-from typing import List, Optional
-from collections import defaultdict, deque
-from models import SecurityLog, DetectionSignal, SignalType, Severity
+import os
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from models import SecurityLog, DetectionSignal
+from detection_state import UserStateStore
+from detection_rules import (
+    DEFAULT_RULES_PATH,
+    Rule,
+    load_rule_specs,
+    compile_rules,
+    build_dispatch_table,
+    to_epoch,
+)
 
 
 class DetectionEngine:
     """
     Stateful detection engine using sliding windows and pattern matching.
     
-    Rules:
+    Default rules:
     1. BRUTE_FORCE: >5 failed logins in 2 minutes
     2. SUSPICIOUS_LOGIN: Login from unusual/risky location
     3. INSIDER_THREAT: Privilege escalation + data access
     """
     
-    def __init__(self):
-        # Sliding window: last 2 minutes of failed logins per user
-        self.failed_login_window: dict = defaultdict(lambda: deque(maxlen=20))
+    # Pure CPU work; safe to call directly on the event loop
+    blocking = False
+    
+    def __init__(
+        self,
+        rules_path: Optional[str] = None,
+        rules: Optional[List[Rule]] = None,
+        state_ttl: float = 3600.0,
+        max_users: int = 100_000,
+        clock: Optional[Callable[[], datetime]] = None
+    ):
+        if rules is None:
+            rules = compile_rules(load_rule_specs(Path(rules_path or DEFAULT_RULES_PATH)))
+        self.rules = rules
         
-        # Track privilege escalations for insider threat correlation
-        self.recent_escalations: dict = defaultdict(lambda: deque(maxlen=10))
+        # Shared per-user rule state; idle users never outlive the longest window
+        longest_window = max((rule.window_seconds or 0 for rule in rules), default=0)
+        self.state = UserStateStore(idle_ttl=max(state_ttl, longest_window), max_users=max_users)
+        for rule in rules:
+            rule.store = self.state
+            if clock is not None:
+                rule.clock = clock
         
-        # Suspicious locations
-        self.suspicious_locations = {
-            "Russia",
-            "North Korea",
-            "Unknown",
-            "Tor Exit Node",
-            "Romania",
-            "Iran",
-        }
+        # event_type -> handlers of the rules that can match it
+        self.dispatch = build_dispatch_table(rules)
+        
+        # event_type -> whether any of its rules needs the parsed timestamp
+        self.needs_epoch = {event_type: False for event_type in self.dispatch}
+        for rule in rules:
+            if rule.needs_epoch:
+                for event_type, _ in rule.handlers():
+                    self.needs_epoch[event_type] = True
     
-    def analyze(self, log: SecurityLog) -> Optional[DetectionSignal]:
+    def analyze(
+        self,
+        log: SecurityLog,
+        collect: Optional[List[DetectionSignal]] = None
+    ) -> Optional[DetectionSignal]:
         """
         Analyze a single log and return a detection signal if a rule matches.
         
+        Every rule registered for the log's event type sees the log (so
+        windows stay current); the first signal in rule order is returned.
+        
         Args:
             log: The security log to analyze
+            collect: Optional list that receives the signal of every matching
+                rule, not only the first (detection replay counts per rule)
             
         Returns:
             DetectionSignal if a threat is detected, None otherwise
         """
-        # Rule 1: Brute Force Detection
-        if log.event_type == "failed_login":
-            signal = self._check_brute_force(log)
-            if signal:
-                return signal
-        
-        # Rule 2: Suspicious Login
-        if log.event_type in ["successful_login", "new_country_login"]:
-            signal = self._check_suspicious_login(log)
-            if signal:
-                return signal
+        event_type = getattr(log.event_type, "value", log.event_type)
+        handlers = self.dispatch.get(event_type)
+        if not handlers:
+            return None
         
-        # Rule 3: Insider Threat
-        if log.event_type == "privilege_escalation":
-            # Track escalation
-            self.recent_escalations[log.user].append(log)
+        epoch = to_epoch(log.timestamp) if self.needs_epoch[event_type] else None
         
-        if log.event_type == "data_download":
-            signal = self._check_insider_threat(log)
+        detected = None
+        for handler in handlers:
+            signal = handler(log, epoch)
             if signal:
-                return signal
-        
-        return None
-    
-    def _check_brute_force(self, log: SecurityLog) -> Optional[DetectionSignal]:
-        """Detect brute force attacks: >5 failed logins in 2 minutes."""
-        user = log.user
-        now = datetime.fromisoformat(log.timestamp.replace('Z', '+00:00'))
-        
-        # Add current failed login to window
-        self.failed_login_window[user].append(log)
-        
-        # Count failed logins in last 2 minutes
-        two_minutes_ago = now - timedelta(minutes=2)
-        recent_failures = [
-            l for l in self.failed_login_window[user]
-            if datetime.fromisoformat(l.timestamp.replace('Z', '+00:00')) > two_minutes_ago
-        ]
-        
-        if len(recent_failures) > 5:
-            return DetectionSignal(
-                signal_id=str(uuid.uuid4()),
-                signal_type=SignalType.BRUTE_FORCE,
-                user=user,
-                severity=Severity.HIGH,
-                events=recent_failures,
-                detected_at=datetime.now(timezone.utc).isoformat(),
-                metadata={
-                    "failed_attempts": len(recent_failures),
-                    "time_window": "2 minutes",
-                    "ips": list(set([l.ip for l in recent_failures]))
-                }
-            )
+                if detected is None:
+                    detected = signal
+                if collect is not None:
+                    collect.append(signal)
         
-        return None
+        return detected
     
-    def _check_suspicious_login(self, log: SecurityLog) -> Optional[DetectionSignal]:
-        """Detect logins from suspicious locations."""
-        if log.location in self.suspicious_locations:
-            return DetectionSignal(
-                signal_id=str(uuid.uuid4()),
-                signal_type=SignalType.SUSPICIOUS_LOGIN,
-                user=log.user,
-                severity=Severity.HIGH,
-                events=[log],
-                detected_at=datetime.now(timezone.utc).isoformat(),
-                metadata={
-                    "location": log.location,
-                    "ip": log.ip,
-                    "risk_reason": "Geographic anomaly"
-                }
-            )
-        
-        return None
-    
-    def _check_insider_threat(self, log: SecurityLog) -> Optional[DetectionSignal]:
+    def analyze_batch(self, logs: List[SecurityLog]) -> List[Optional[DetectionSignal]]:
         """
-        Detect insider threats: privilege escalation followed by data download.
-        """
-        user = log.user
+        Analyze a batch of logs in order.
         
-        # Check if user had recent privilege escalation
-        if self.recent_escalations[user]:
-            # Find most recent escalation
-            recent_escalations = list(self.recent_escalations[user])
+        Args:
+            logs: The security logs to analyze
             
-            return DetectionSignal(
-                signal_id=str(uuid.uuid4()),
-                signal_type=SignalType.INSIDER_THREAT,
-                user=user,
-                severity=Severity.CRITICAL,
-                events=recent_escalations + [log],
-                detected_at=datetime.now(timezone.utc).isoformat(),
-                metadata={
-                    "pattern": "privilege_escalation → data_download",
-                    "asset": log.asset,
-                    "escalation_count": len(recent_escalations)
-                }
-            )
-        
-        return None
+        Returns:
+            One entry per log: the DetectionSignal it triggered, or None
+        """
+        analyze = self.analyze
+        return [analyze(log) for log in logs]
+    
+    def export_state(self) -> Dict[str, Any]:
+        """Snapshot all per-user window state as plain data."""
+        encoders = {rule.id: rule.export_state for rule in self.rules}
+        return {
+            "clock": self.state.clock,
+            "users": self.state.export(encoders)
+        }
+    
+    def import_state(self, snapshot: Dict[str, Any]) -> None:
+        """Restore window state from export_state() output."""
+        decoders = {rule.id: rule.import_state for rule in self.rules}
+        self.state.restore(snapshot["users"], snapshot["clock"], decoders)
+    
+    def state_stats(self) -> Dict[str, Any]:
+        """Size of per-user detection state and eviction counters."""
+        return self.state.stats()
+    
+    def close(self) -> None:
+        """Release resources (nothing to do for the in-process engine)."""
+
+
+def create_detection_engine():
+    """
+    Build the detection engine selected by ARXIS_DETECTION_SHARDS.
+    
+    - 1 (default): a single in-process DetectionEngine
+    - n > 1: n worker processes partitioned by user (see sharded_detection.py)
+    """
+    options = {
+        "rules_path": os.getenv("ARXIS_RULES_PATH"),
+        "state_ttl": float(os.getenv("ARXIS_DETECTION_STATE_TTL", "3600")),
+        "max_users": int(os.getenv("ARXIS_DETECTION_MAX_USERS", "100000")),
+    }
+    shards = int(os.getenv("ARXIS_DETECTION_SHARDS", "1"))
+    
+    if shards > 1:
+        from sharded_detection import ShardedDetectionEngine
+        return ShardedDetectionEngine(shards, **options)
+    
+    return DetectionEngine(**options)
 
 
 # Global detection engine instance
-detection_engine = DetectionEngine()
+detection_engine = create_detection_engine()
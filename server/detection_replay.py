@@ -0,0 +1,297 @@
+"""
+Detection Replay for Arxis SOC
+
+Backtests detection rules against stored history: logs are streamed from a
+file through a fresh DetectionEngine as fast as the CPU allows, and the run
+reports signals per rule / signal type / severity and replay throughput.
+Every rule that matches a log is counted, so overlapping rules are not
+hidden behind the first one (live ingest only emits the first signal per
+log; `signalled_logs` is that count).
+
+Replay runs on a simulated clock. Rule windows already follow log
+timestamps; the engine's clock is also set to the timestamp of the log being
+analyzed, so every signal's detected_at is the event time that triggered it
+rather than the moment of the replay.
+
+Sources (by file extension):
+- .ndjson / .jsonl: one log per line (log_generator / bulk_log_generator output)
+- .json: a JSON array of logs, or {"logs": [...]}
+- .npz: a bulk_log_generator columnar dataset
+- .db / .sqlite: the logs table of an Arxis SQLite database
+
+Logs are replayed in file order, which for all of the above is ingestion
+order.
+
+Usage:
+    python detection_replay.py logs.ndjson
+    python detection_replay.py logs.npz --rules rules/custom.json --signals signals.ndjson
+    python detection_replay.py data/arxis.db --output report.json
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from models import SecurityLog
+from detection_engine import DetectionEngine
+from detection_rules import to_epoch, unpack_log
+
+
+LOG_FIELDS = ("timestamp", "user", "event_type", "ip", "location", "asset")
+
+# Logs fetched per SQLite round trip
+SQLITE_CHUNK = 10_000
+
+
+class SimulatedClock:
+    """
+    Clock that reads the timestamp of the log currently being replayed.
+
+    The timestamp is only parsed when a rule fires, so advancing the clock
+    costs one attribute store per log.
+    """
+
+    def __init__(self):
+        self.timestamp: Optional[str] = None
+
+    def __call__(self) -> datetime:
+        return datetime.fromisoformat(self.timestamp.replace("Z", "+00:00"))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Sources
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def read_ndjson(path: str) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Yield logs from an NDJSON file (blank lines skipped).
+
+    A line that is not valid JSON (e.g. torn by a crash mid-write) yields
+    None, which replay counts as skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+
+
+def read_json(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield logs from a JSON array (or an object with a "logs" array)."""
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    logs = document.get("logs") if isinstance(document, dict) else document
+    if not isinstance(logs, list):
+        raise ValueError(f"{path}: expected a list of logs")
+    yield from logs
+
+
+def read_npz(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield logs from a bulk_log_generator .npz dataset."""
+    from bulk_log_generator import LogColumns
+    yield from LogColumns.load(path).rows()
+
+
+def read_sqlite(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield logs from the logs table of an Arxis SQLite database, oldest first."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                f"SELECT id, {', '.join(LOG_FIELDS)} FROM logs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, SQLITE_CHUNK)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for row in rows:
+                yield dict(zip(LOG_FIELDS, row[1:]))
+    finally:
+        conn.close()
+
+
+READERS = {
+    ".ndjson": read_ndjson,
+    ".jsonl": read_ndjson,
+    ".json": read_json,
+    ".npz": read_npz,
+    ".db": read_sqlite,
+    ".sqlite": read_sqlite,
+}
+
+
+def read_logs(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield log dicts from any supported source, chosen by file extension."""
+    reader = READERS.get(Path(path).suffix.lower())
+    if reader is None:
+        raise ValueError(f"{path}: unsupported file type (expected one of {', '.join(READERS)})")
+    return reader(path)
+
+
+def to_log(row: Dict[str, Any]) -> SecurityLog:
+    """
+    Build a SecurityLog from a stored log dict.
+
+    Stored history was validated when it was ingested, so only the event
+    type is checked here (a KeyError / ValueError / TypeError marks a
+    malformed row); replay parses the timestamp.
+    """
+    return unpack_log(tuple(row[field] for field in LOG_FIELDS))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Replay
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def replay(
+    rows: Iterable[Dict[str, Any]],
+    engine: Optional[DetectionEngine] = None,
+    clock: Optional[SimulatedClock] = None,
+    rules_path: Optional[str] = None,
+    signals_out=None,
+    progress_every: int = 0
+) -> Dict[str, Any]:
+    """
+    Run logs through detection and tally the signals.
+
+    Args:
+        rows: Log dicts in replay order
+        engine: Engine to replay through (default: a fresh engine on `clock`)
+        clock: Simulated clock bound to `engine`
+        rules_path: Rule file for the default engine
+        signals_out: Optional text file; each signal is written to it as one JSON line
+        progress_every: Print progress every this many logs (0 = never)
+
+    Returns:
+        Report with log/signal counts (signals from every matching rule,
+        signalled_logs as live ingest would emit), signals per rule, signal
+        type and severity, the simulated time span and replay throughput
+    """
+    if engine is None:
+        clock = clock or SimulatedClock()
+        # No user cap: results should depend on the rules and the logs, not on memory limits
+        engine = DetectionEngine(rules_path=rules_path, clock=clock, max_users=sys.maxsize)
+    elif clock is None:
+        raise ValueError("replaying through a given engine needs the SimulatedClock bound to it")
+
+    by_rule: Counter = Counter()
+    by_signal_type: Counter = Counter()
+    by_severity: Counter = Counter()
+    logs = skipped = signalled = 0
+    first_timestamp = last_timestamp = None
+    first_epoch = last_epoch = 0.0
+
+    analyze = engine.analyze
+    signals = []
+    started = time.perf_counter()
+    for row in rows:
+        try:
+            log = to_log(row)
+            # Rejects malformed timestamps for every event type, not only
+            # those a rule happens to parse
+            epoch = to_epoch(log.timestamp)
+        except (KeyError, ValueError, TypeError, AttributeError):
+            skipped += 1
+            continue
+
+        clock.timestamp = log.timestamp
+        signals.clear()
+        analyze(log, signals)
+        logs += 1
+
+        if first_timestamp is None:
+            first_timestamp, first_epoch = log.timestamp, epoch
+        last_timestamp, last_epoch = log.timestamp, epoch
+
+        if signals:
+            signalled += 1
+        for signal in signals:
+            by_rule[signal.metadata.get("rule")] += 1
+            by_signal_type[signal.signal_type.value] += 1
+            by_severity[signal.severity.value] += 1
+            if signals_out is not None:
+                signals_out.write(signal.model_dump_json() + "\n")
+
+        if progress_every and logs % progress_every == 0:
+            elapsed = time.perf_counter() - started
+            print(f"📈 {logs:,} logs, {sum(by_rule.values()):,} signals ({logs / elapsed:,.0f} logs/s)")
+    elapsed = time.perf_counter() - started
+
+    simulated = max(0.0, last_epoch - first_epoch)
+    return {
+        "logs": logs,
+        "skipped": skipped,
+        "signals": sum(by_rule.values()),
+        "signalled_logs": signalled,
+        "signals_by_rule": dict(by_rule.most_common()),
+        "signals_by_type": dict(by_signal_type.most_common()),
+        "signals_by_severity": dict(by_severity.most_common()),
+        "first_event": first_timestamp,
+        "last_event": last_timestamp,
+        "simulated_seconds": round(simulated, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "logs_per_second": round(logs / elapsed, 1) if elapsed else 0.0,
+        "speedup": round(simulated / elapsed, 1) if elapsed else 0.0,
+        "state": engine.state_stats(),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("⏪ Arxis Detection Replay")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"📥 Logs:       {report['logs']:,} replayed ({report['skipped']:,} skipped)")
+    print(f"🕒 History:    {report['first_event']} → {report['last_event']} "
+          f"({report['simulated_seconds'] / 3600:.1f}h)")
+    print(f"⚡ Throughput: {report['logs_per_second']:,.0f} logs/s in {report['elapsed_seconds']}s "
+          f"({report['speedup']:,.0f}x real time)")
+    print(f"🚨 Signals:    {report['signals']:,} from {report['signalled_logs']:,} logs")
+    for rule, count in report["signals_by_rule"].items():
+        print(f"   {rule:25s} {count:,}")
+    print(f"   by type:     {report['signals_by_type']}")
+    print(f"   by severity: {report['signals_by_severity']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Arxis detection replay / backtesting")
+    parser.add_argument("source", help="Log file (.ndjson/.jsonl, .json, .npz, or an Arxis .db)")
+    parser.add_argument("--rules", help="Rule file (default: rules/default_rules.json)")
+    parser.add_argument("--signals", help="Write every signal to this NDJSON file")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--progress", type=int, default=0, help="Print progress every N logs")
+    args = parser.parse_args()
+
+    print(f"⏪ Replaying {args.source}...")
+    try:
+        rows = read_logs(args.source)
+        if args.signals:
+            with open(args.signals, "w", encoding="utf-8") as signals_out:
+                report = replay(rows, rules_path=args.rules, signals_out=signals_out,
+                                progress_every=args.progress)
+        else:
+            report = replay(rows, rules_path=args.rules, progress_every=args.progress)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"⚠️  Replay failed: {e}")
+        return 1
+    print_report(report)
+
+    if args.signals:
+        print(f"\n✅ Signals written to {args.signals}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
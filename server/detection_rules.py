@@ -0,0 +1,543 @@
+"""
+Declarative Detection Rules for Arxis SOC
+
+Rules are written in JSON (or YAML, when PyYAML is installed) and compiled
+once into an event-type dispatch table, so each log is only evaluated
+against the rules that can match its event_type.
+
+Rule types:
+- match:     field predicates on a single event
+- threshold: more than N matching events per group within a time window
+- sequence:  ordered steps per group (e.g. escalation → download)
+
+See rules/default_rules.json for the built-in rule set.
+"""
+
+import json
+import re
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import SecurityLog, DetectionSignal, SignalType, Severity, EventType
+from detection_state import UserStateStore
+
+
+ALL_EVENT_TYPES = [event_type.value for event_type in EventType]
+LOG_FIELDS = set(SecurityLog.model_fields)
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "rules" / "default_rules.json"
+
+
+class RuleError(ValueError):
+    """Raised when a rule definition is invalid."""
+
+
+def to_epoch(timestamp: str) -> float:
+    """Parse an ISO-8601 log timestamp into epoch seconds."""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+
+def utc_now() -> datetime:
+    """Wall-clock time, the default clock for signal detected_at."""
+    return datetime.now(timezone.utc)
+
+
+def field_value(log: SecurityLog, field: str) -> str:
+    """Read a log field as a plain string (enums unwrapped)."""
+    value = getattr(log, field)
+    return getattr(value, "value", value)
+
+
+def pack_log(log: SecurityLog) -> tuple:
+    """Compact tuple form of a validated log (for IPC and checkpoints)."""
+    return (
+        log.timestamp,
+        log.user,
+        getattr(log.event_type, "value", log.event_type),
+        log.ip,
+        log.location,
+        log.asset,
+    )
+
+
+def unpack_log(row: tuple) -> SecurityLog:
+    """Rebuild a log packed by pack_log()."""
+    timestamp, user, event_type, ip, location, asset = row
+    # Packed logs were validated when first ingested; skip re-validation
+    return SecurityLog.model_construct(
+        timestamp=timestamp,
+        user=user,
+        event_type=EventType(event_type),
+        ip=ip,
+        location=location,
+        asset=asset,
+    )
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Sliding Window
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# Most recent events attached to a threshold signal (the count stays exact)
+DEFAULT_MAX_EVENTS = 100
+
+
+class SlidingWindow:
+    """
+    Time-ordered window of events with pre-parsed epoch timestamps.
+
+    Every event in the window is counted as an (epoch, tracked value) entry,
+    but only the most recent `max_events` logs are kept, so a burst costs
+    O(1) memory per event beyond that and a firing event copies at most
+    `max_events` logs. Expired entries are evicted from the left and the
+    per-value counts of the tracked field are kept up to date on every
+    add/evict, so each event costs amortized O(1). Assumes events for one
+    key arrive in (roughly) timestamp order.
+    """
+
+    __slots__ = ("entries", "recent", "value_counts", "track")
+
+    def __init__(self, track: Optional[str] = None, max_events: int = DEFAULT_MAX_EVENTS):
+        # (epoch, tracked value or None) for every event in the window
+        self.entries: deque = deque()
+        # (epoch, log) for the most recent events only
+        self.recent: deque = deque(maxlen=max_events)
+        self.value_counts: Dict[str, int] = {}
+        self.track = track
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, epoch: float, log: SecurityLog) -> None:
+        self.count(epoch, field_value(log, self.track) if self.track else None)
+        self.recent.append((epoch, log))
+
+    def count(self, epoch: float, value: Optional[str]) -> None:
+        """Count an event whose log is not kept (checkpoint restore)."""
+        self.entries.append((epoch, value))
+        if value is not None:
+            self.value_counts[value] = self.value_counts.get(value, 0) + 1
+
+    def evict_through(self, cutoff: float) -> None:
+        """Drop events with epoch <= cutoff."""
+        entries = self.entries
+        value_counts = self.value_counts
+        while entries and entries[0][0] <= cutoff:
+            _, value = entries.popleft()
+            if value is not None:
+                remaining = value_counts[value] - 1
+                if remaining:
+                    value_counts[value] = remaining
+                else:
+                    del value_counts[value]
+
+        recent = self.recent
+        while recent and recent[0][0] <= cutoff:
+            recent.popleft()
+
+    def logs(self) -> List[SecurityLog]:
+        """The most recent logs in the window (at most max_events)."""
+        return [log for _, log in self.recent]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Predicates & Metadata Templates
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Predicate = Callable[[SecurityLog], bool]
+
+
+def _compile_predicate(spec: Dict[str, Any], rule_id: str) -> Predicate:
+    field = spec.get("field")
+    op = spec.get("op", "eq")
+    value = spec.get("value")
+
+    if field not in LOG_FIELDS:
+        raise RuleError(f"{rule_id}: unknown field {field!r}")
+
+    if op == "eq":
+        return lambda log: field_value(log, field) == value
+    if op == "ne":
+        return lambda log: field_value(log, field) != value
+    if op in ("in", "not_in"):
+        if not isinstance(value, list):
+            raise RuleError(f"{rule_id}: {op!r} needs a list value")
+        values = frozenset(value)
+        if op == "in":
+            return lambda log: field_value(log, field) in values
+        return lambda log: field_value(log, field) not in values
+    if op == "prefix":
+        return lambda log: field_value(log, field).startswith(value)
+    if op == "regex":
+        pattern = re.compile(value)
+        return lambda log: pattern.search(field_value(log, field)) is not None
+
+    raise RuleError(f"{rule_id}: unknown operator {op!r}")
+
+
+def _compile_predicates(specs: List[Dict[str, Any]], rule_id: str) -> Predicate:
+    predicates = [_compile_predicate(spec, rule_id) for spec in specs or []]
+    if not predicates:
+        return lambda log: True
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda log: all(predicate(log) for predicate in predicates)
+
+
+class MatchContext:
+    """What a metadata template can reference when a rule fires."""
+
+    __slots__ = ("log", "events", "count", "value_counts", "track")
+
+    def __init__(self, log, events, count, value_counts=None, track=None):
+        self.log = log
+        self.events = events
+        self.count = count
+        self.value_counts = value_counts
+        self.track = track
+
+    def distinct(self, field: str) -> List[str]:
+        if field == self.track and self.value_counts is not None:
+            return list(self.value_counts)
+        return list(dict.fromkeys(field_value(event, field) for event in self.events))
+
+
+def _compile_metadata(spec: Dict[str, Any], rule_id: str) -> List[Tuple[str, Callable[[MatchContext], Any]]]:
+    """
+    Compile metadata templates. String values may reference the match:
+
+    - "$count"           number of correlated events
+    - "$field:<name>"    field of the triggering log
+    - "$distinct:<name>" distinct values of a field across matched events
+
+    Anything else is copied verbatim.
+    """
+    compiled = []
+    for key, value in (spec or {}).items():
+        if value == "$count":
+            compiled.append((key, lambda ctx: ctx.count))
+        elif isinstance(value, str) and value.startswith(("$field:", "$distinct:")):
+            kind, field = value[1:].split(":", 1)
+            if field not in LOG_FIELDS:
+                raise RuleError(f"{rule_id}: unknown field {field!r} in metadata")
+            if kind == "field":
+                compiled.append((key, lambda ctx, f=field: field_value(ctx.log, f)))
+            else:
+                compiled.append((key, lambda ctx, f=field: ctx.distinct(f)))
+        else:
+            compiled.append((key, lambda ctx, v=value: v))
+    return compiled
+
+
+def _distinct_field(spec: Dict[str, Any]) -> Optional[str]:
+    """First field referenced as $distinct:<field>, if any."""
+    for value in (spec or {}).values():
+        if isinstance(value, str) and value.startswith("$distinct:"):
+            return value.split(":", 1)[1]
+    return None
+
+
+def _event_types(spec: Dict[str, Any], rule_id: str) -> List[str]:
+    event_types = spec.get("event_types") or ALL_EVENT_TYPES
+    for event_type in event_types:
+        if event_type not in ALL_EVENT_TYPES:
+            raise RuleError(f"{rule_id}: unknown event type {event_type!r}")
+    return list(event_types)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Compiled Rules
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# handler(log, epoch) -> Optional[DetectionSignal]
+Handler = Callable[[SecurityLog, Optional[float]], Optional[DetectionSignal]]
+
+
+class Rule:
+    """Common compiled-rule behaviour: identity, grouping and signal output."""
+
+    # Whether handlers need the log's epoch timestamp
+    needs_epoch = False
+    
+    # Longest time window the rule looks back over (seconds)
+    window_seconds: Optional[float] = None
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.id = spec.get("id")
+        if not self.id:
+            raise RuleError("every rule needs an 'id'")
+
+        try:
+            self.signal_type = SignalType(spec["signal_type"])
+            self.severity = Severity(spec.get("severity", "HIGH"))
+        except (KeyError, ValueError) as e:
+            raise RuleError(f"{self.id}: invalid signal_type/severity ({e})")
+
+        self.group_by = spec.get("group_by", "user")
+        if self.group_by not in LOG_FIELDS:
+            raise RuleError(f"{self.id}: unknown group_by field {self.group_by!r}")
+
+        self.metadata = _compile_metadata(spec.get("metadata"), self.id)
+
+        # Per-group state; DetectionEngine rebinds this to its shared store
+        self.store = UserStateStore()
+
+        # Source of detected_at; DetectionEngine rebinds this when given a clock
+        self.clock: Callable[[], datetime] = utc_now
+
+    def handlers(self) -> List[Tuple[str, Handler]]:
+        """(event_type, handler) pairs to register in the dispatch table."""
+        raise NotImplementedError
+
+    def export_state(self, state: Any) -> Any:
+        """Encode one group's state as plain JSON-compatible data."""
+        raise NotImplementedError
+
+    def import_state(self, data: Any) -> Any:
+        """Rebuild one group's state from export_state() output."""
+        raise NotImplementedError
+
+    def _signal(self, ctx: MatchContext) -> DetectionSignal:
+        metadata = {key: render(ctx) for key, render in self.metadata}
+        metadata["rule"] = self.id
+        return DetectionSignal(
+            signal_id=str(uuid.uuid4()),
+            signal_type=self.signal_type,
+            user=ctx.log.user,
+            severity=self.severity,
+            events=ctx.events,
+            detected_at=self.clock().isoformat(),
+            metadata=metadata
+        )
+
+
+class MatchRule(Rule):
+    """Fires on every event that satisfies the predicates."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.event_types = _event_types(spec, self.id)
+        self.where = _compile_predicates(spec.get("where"), self.id)
+
+    def handlers(self) -> List[Tuple[str, Handler]]:
+        return [(event_type, self.evaluate) for event_type in self.event_types]
+
+    def evaluate(self, log: SecurityLog, epoch: Optional[float]) -> Optional[DetectionSignal]:
+        if not self.where(log):
+            return None
+        return self._signal(MatchContext(log, [log], 1))
+
+
+class ThresholdRule(Rule):
+    """
+    Fires while more than `threshold` matching events fall in the window.
+
+    `$count` and the tracked `$distinct` field cover the whole window; the
+    signal carries only the most recent `max_events` events.
+    """
+
+    needs_epoch = True
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.event_types = _event_types(spec, self.id)
+        self.where = _compile_predicates(spec.get("where"), self.id)
+        try:
+            self.threshold = int(spec["threshold"])
+            self.window_seconds = float(spec["window_seconds"])
+        except (KeyError, TypeError, ValueError):
+            raise RuleError(f"{self.id}: threshold rules need 'threshold' and 'window_seconds'")
+        self.track = _distinct_field(spec.get("metadata"))
+        self.max_events = int(spec.get("max_events", DEFAULT_MAX_EVENTS))
+
+    def handlers(self) -> List[Tuple[str, Handler]]:
+        return [(event_type, self.evaluate) for event_type in self.event_types]
+
+    def evaluate(self, log: SecurityLog, epoch: Optional[float]) -> Optional[DetectionSignal]:
+        if not self.where(log):
+            return None
+
+        key = field_value(log, self.group_by)
+        window = self.store.get(key, self.id, self._new_window, epoch)
+
+        window.evict_through(epoch - self.window_seconds)
+        window.add(epoch, log)
+
+        count = len(window)
+        if count > self.threshold:
+            return self._signal(MatchContext(log, window.logs(), count, window.value_counts, self.track))
+        return None
+
+    def _new_window(self) -> SlidingWindow:
+        return SlidingWindow(self.track, self.max_events)
+
+    def export_state(self, window: SlidingWindow) -> Any:
+        return {
+            "entries": [[epoch, value] for epoch, value in window.entries],
+            "recent": [[epoch, pack_log(log)] for epoch, log in window.recent],
+        }
+
+    def import_state(self, data: Any) -> SlidingWindow:
+        window = self._new_window()
+        if isinstance(data, list):
+            # Checkpoint version <= 2: every event with its log
+            for epoch, row in data:
+                window.add(epoch, unpack_log(row))
+            return window
+        for epoch, value in data["entries"]:
+            window.count(epoch, value)
+        for epoch, row in data["recent"]:
+            window.recent.append((epoch, unpack_log(row)))
+        return window
+
+
+class SequenceRule(Rule):
+    """
+    Fires when the final step follows all earlier steps for the same group.
+
+    Each step keeps its most recent `max_events` matches (optionally only
+    those within `window_seconds`); a step only records an event once the
+    previous step has a live match, which enforces ordering.
+    """
+
+    # Always true: event time drives expiry of idle per-user state
+    needs_epoch = True
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        steps = spec.get("steps") or []
+        if len(steps) < 2:
+            raise RuleError(f"{self.id}: sequence rules need at least two steps")
+
+        self.steps = [
+            (_event_types(step, self.id), _compile_predicates(step.get("where"), self.id))
+            for step in steps
+        ]
+        self.max_events = int(spec.get("max_events", 10))
+        window = spec.get("window_seconds")
+        self.window_seconds = float(window) if window is not None else None
+        self.reset_on_match = bool(spec.get("reset_on_match", False))
+
+    def handlers(self) -> List[Tuple[str, Handler]]:
+        return [
+            (event_type, self.evaluate)
+            for event_type in dict.fromkeys(
+                event_type for event_types, _ in self.steps for event_type in event_types
+            )
+        ]
+
+    def evaluate(self, log: SecurityLog, epoch: Optional[float]) -> Optional[DetectionSignal]:
+        key = field_value(log, self.group_by)
+        event_type = field_value(log, "event_type")
+        last = len(self.steps) - 1
+
+        # Later steps first, so one event never satisfies two steps at once
+        for index in range(last, -1, -1):
+            event_types, where = self.steps[index]
+            if event_type not in event_types or not where(log):
+                continue
+
+            progress = self.store.peek(key, self.id, epoch)
+            if index > 0 and not self._has_live(progress, index - 1, epoch):
+                continue
+
+            if index == last:
+                return self._complete(key, progress, log, epoch)
+
+            if progress is None:
+                progress = self.store.get(key, self.id, self._new_progress, epoch)
+            progress[index].append((epoch, log))
+            return None
+
+        return None
+
+    def _new_progress(self) -> list:
+        return [deque(maxlen=self.max_events) for _ in range(len(self.steps) - 1)]
+
+    def export_state(self, progress: list) -> Any:
+        return [[[epoch, pack_log(log)] for epoch, log in step] for step in progress]
+
+    def import_state(self, data: Any) -> list:
+        progress = self._new_progress()
+        for step, events in zip(progress, data):
+            step.extend((epoch, unpack_log(row)) for epoch, row in events)
+        return progress
+
+    def _has_live(self, progress, index: int, epoch: Optional[float]) -> bool:
+        if not progress:
+            return False
+        step = progress[index]
+        if self.window_seconds is not None:
+            cutoff = epoch - self.window_seconds
+            while step and step[0][0] <= cutoff:
+                step.popleft()
+        return bool(step)
+
+    def _complete(self, key, progress, log: SecurityLog, epoch: Optional[float]) -> DetectionSignal:
+        for index in range(len(progress)):
+            self._has_live(progress, index, epoch)
+
+        precursors = [event for step in progress for _, event in step]
+        if self.reset_on_match:
+            self.store.discard(key, self.id)
+
+        return self._signal(MatchContext(log, precursors + [log], len(precursors)))
+
+
+RULE_TYPES = {
+    "match": MatchRule,
+    "threshold": ThresholdRule,
+    "sequence": SequenceRule,
+}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Loading & Compilation
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load_rule_specs(path: Path) -> List[Dict[str, Any]]:
+    """Read rule definitions from a JSON or YAML file."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix in (".yml", ".yaml"):
+            try:
+                import yaml
+            except ImportError:
+                raise RuleError("YAML rule files need PyYAML (pip install pyyaml)")
+            document = yaml.safe_load(f)
+        else:
+            document = json.load(f)
+
+    specs = document.get("rules") if isinstance(document, dict) else document
+    if not isinstance(specs, list):
+        raise RuleError(f"{path}: expected a list of rules")
+    return specs
+
+
+def compile_rules(specs: List[Dict[str, Any]]) -> List[Rule]:
+    """Compile rule definitions, skipping any with "enabled": false."""
+    rules = []
+    seen = set()
+    for spec in specs:
+        if not spec.get("enabled", True):
+            continue
+        kind = spec.get("type")
+        if kind not in RULE_TYPES:
+            raise RuleError(f"{spec.get('id')}: unknown rule type {kind!r}")
+        rule = RULE_TYPES[kind](spec)
+        if rule.id in seen:
+            raise RuleError(f"duplicate rule id {rule.id!r}")
+        seen.add(rule.id)
+        rules.append(rule)
+    return rules
+
+
+def build_dispatch_table(rules: List[Rule]) -> Dict[str, List[Handler]]:
+    """Index rule handlers by event type, preserving rule order."""
+    table: Dict[str, List[Handler]] = {event_type: [] for event_type in ALL_EVENT_TYPES}
+    for rule in rules:
+        for event_type, handler in rule.handlers():
+            table[event_type].append(handler)
+    return table
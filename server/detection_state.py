@@ -0,0 +1,168 @@
+"""
+Per-User Detection State for Arxis SOC
+
+Holds the window state of stateful detection rules, keyed by group (user).
+Users idle for longer than the TTL are expired, and a global cap evicts the
+least-recently-seen users first, so memory is bounded by active users
+rather than every identity ever seen.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+class UserStateStore:
+    """
+    LRU + TTL store of per-user rule state.
+
+    Time is event time (log timestamps), tracked as a high-water mark so
+    late events never move the clock backwards. Every touch moves a user to
+    the recent end, so the front of the ordering is always the idlest user
+    and both expiry and eviction pop from the front in O(1).
+    """
+
+    def __init__(self, idle_ttl: float = 3600.0, max_users: int = 100_000):
+        self.idle_ttl = idle_ttl
+        self.max_users = max_users
+
+        # key -> [last_seen_epoch, {rule_id: state}]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self.clock = 0.0
+
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Access
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def get(self, key: str, rule_id: str, factory: Callable[[], Any], now: float) -> Any:
+        """Get (creating if needed) a rule's state for a user, marking it active."""
+        entry = self._touch(key, now)
+        if entry is None:
+            entry = self._entries[key] = [self.clock, {}]
+            self._enforce_cap()
+
+        states = entry[1]
+        state = states.get(rule_id)
+        if state is None:
+            state = states[rule_id] = factory()
+        return state
+
+    def peek(self, key: str, rule_id: str, now: float) -> Optional[Any]:
+        """Get a rule's state for a user without creating it."""
+        entry = self._touch(key, now)
+        if entry is None:
+            return None
+        return entry[1].get(rule_id)
+
+    def discard(self, key: str, rule_id: str) -> None:
+        """Drop a rule's state for a user."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[1].pop(rule_id, None)
+        if not entry[1]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Checkpointing
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def export(self, encoders: Dict[str, Callable[[Any], Any]]) -> List[list]:
+        """
+        Encode every user's state, least recently seen first.
+
+        Returns:
+            [[key, last_seen, {rule_id: encoded_state}], ...]
+        """
+        return [
+            [key, last_seen, {
+                rule_id: encoders[rule_id](state)
+                for rule_id, state in states.items()
+                if rule_id in encoders
+            }]
+            for key, (last_seen, states) in self._entries.items()
+        ]
+
+    def restore(self, entries: List[list], clock: float, decoders: Dict[str, Callable[[Any], Any]]) -> None:
+        """Replace current state with export() output (unknown rules are skipped)."""
+        self._entries.clear()
+        self.clock = clock
+        for key, last_seen, encoded in entries:
+            states = {
+                rule_id: decoders[rule_id](data)
+                for rule_id, data in encoded.items()
+                if rule_id in decoders
+            }
+            if states:
+                self._entries[key] = [last_seen, states]
+        self._expire()
+        self._enforce_cap()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Eviction
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _touch(self, key: str, now: float) -> Optional[list]:
+        if now is not None and now > self.clock:
+            self.clock = now
+        self._expire()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[0] = self.clock
+            self._entries.move_to_end(key)
+        return entry
+
+    def _expire(self) -> None:
+        """Pop users idle for longer than the TTL (oldest first)."""
+        cutoff = self.clock - self.idle_ttl
+        entries = self._entries
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if entry[0] > cutoff:
+                break
+            del entries[key]
+            self.expired += 1
+
+    def _enforce_cap(self) -> None:
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Stats
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def stats(self) -> Dict[str, Any]:
+        """State size and eviction counters."""
+        states = 0
+        events = 0
+        for _, rule_states in self._entries.values():
+            states += len(rule_states)
+            for state in rule_states.values():
+                events += _state_size(state)
+
+        return {
+            "users": len(self._entries),
+            "rule_states": states,
+            "buffered_events": events,
+            "max_users": self.max_users,
+            "idle_ttl_seconds": self.idle_ttl,
+            "expired_users": self.expired,
+            "evicted_users": self.evicted,
+        }
+
+
+def _state_size(state: Any) -> int:
+    """Number of events held by a rule state (window or list of step windows)."""
+    if isinstance(state, list):
+        return sum(len(step) for step in state)
+    return len(state)
@@ -0,0 +1,194 @@
+"""
+Event Streaming for Arxis SOC
+
+An in-process publish/subscribe broker behind the Server-Sent Events
+endpoints. Events get a monotonically increasing sequence number and the
+most recent ones are kept in a ring buffer, so a subscriber that reconnects
+with its last seen id (SSE `Last-Event-ID`) resumes without gaps.
+
+Publishing is thread-safe: agent analysis runs in the threadpool and hands
+its events to the event loop that owns the subscribers.
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+
+# (seq, event, data)
+StreamEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[StreamEvent]" = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+
+class EventBroker:
+    """
+    Fan-out of events to any number of async subscribers.
+
+    A subscriber that falls more than `queue_size` events behind is dropped
+    (its stream ends) rather than slowing down publishers; it can reconnect
+    and resume from the ring buffer.
+    """
+
+    def __init__(self, history: int = 1000, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._events: "deque[StreamEvent]" = deque(maxlen=history)
+        self._subscribers: Set[_Subscriber] = set()
+        self._seq = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Bind to the event loop that serves subscribers (call at startup)."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the latest event."""
+        return self._seq
+
+    @property
+    def buffer_cursor(self) -> int:
+        """Cursor that replays every buffered event (and never yields a reset)."""
+        return self._events[0][0] - 1 if self._events else self._seq
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Publishing
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Publish an event (from the event loop or any other thread)."""
+        loop = self._loop
+        if loop is None or threading.get_ident() == self._loop_thread:
+            self._publish(event, data)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._publish, event, data)
+
+    def _publish(self, event: str, data: Dict[str, Any]) -> None:
+        self._seq += 1
+        item = (self._seq, event, data)
+        self._events.append(item)
+
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                subscriber.lagged = True
+                self._subscribers.discard(subscriber)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Subscribing
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def subscribe(
+        self,
+        after: Optional[int] = None,
+        keepalive: float = 15.0
+    ) -> AsyncIterator[Optional[StreamEvent]]:
+        """
+        Yield events as they are published.
+
+        Args:
+            after: Resume cursor; buffered events with a higher sequence
+                number are replayed first. If events after the cursor have
+                already left the buffer, a "reset" event is yielded first
+                so the client can refetch state.
+            keepalive: Yield None after this many idle seconds
+
+        Yields:
+            (seq, event, data) tuples, or None on keepalive
+        """
+        subscriber = _Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        last_seq = self._seq
+
+        try:
+            if after is not None:
+                oldest = self._events[0][0] if self._events else self._seq + 1
+                if after < oldest - 1:
+                    yield (self._seq, "reset", {"cursor": self._seq, "missed_from": after + 1})
+                for item in list(self._events):
+                    if item[0] > after and item[0] <= last_seq:
+                        yield item
+
+            while not subscriber.lagged or not subscriber.queue.empty():
+                try:
+                    item = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if item[0] > last_seq:
+                    last_seq = item[0]
+                    yield item
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Server-Sent Events
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+}
+
+
+def sse_message(seq: int, event: str, data: Dict[str, Any]) -> str:
+    """Format one SSE message."""
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def parse_cursor(value: Optional[str]) -> Optional[int]:
+    """Parse a Last-Event-ID header / cursor query value."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+async def sse_events(
+    broker: EventBroker,
+    is_disconnected: Callable[[], Any],
+    after: Optional[int] = None,
+    accept: Optional[Callable[[str, Dict[str, Any]], bool]] = None,
+    until: Optional[Callable[[str, Dict[str, Any]], bool]] = None,
+    keepalive: float = 15.0
+) -> AsyncIterator[str]:
+    """
+    Render a broker subscription as an SSE byte stream.
+
+    Args:
+        broker: Source of events
+        is_disconnected: Request.is_disconnected (checked on keepalives)
+        after: Resume cursor
+        accept: Filter; events it rejects are not sent
+        until: Stop after sending an event it accepts
+        keepalive: Seconds between keepalive comments on an idle stream
+    """
+    async for item in broker.subscribe(after=after, keepalive=keepalive):
+        if item is None:
+            if await is_disconnected():
+                break
+            yield ": keepalive\n\n"
+            continue
+
+        seq, event, data = item
+        if event != "reset" and accept and not accept(event, data):
+            continue
+        yield sse_message(seq, event, data)
+        if until and until(event, data):
+            break
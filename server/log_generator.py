@@ -3,19 +3,30 @@ Synthetic Log Generator for Arxis SOC POC
 
 Generates realistic security event logs to simulate a live SOC environment.
 Emits events every 1-3 seconds with randomized but believable patterns.
+
+With --rate, switches to a high-rate asyncio mode that replays production
+volumes (10k+ events/s) against a staging instance: several producers share
+a pooled keep-alive aiohttp session, post batches to /logs/batch, and are
+held to the target rate by a shared rate limiter.
 """
 
+import argparse
+import asyncio
 import random
 import time
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import requests
 import json
 
 # Configuration
 INGESTION_URL = "http://localhost:8000/logs"
+BATCH_INGESTION_URL = "http://localhost:8000/logs/batch"
 EVENT_INTERVAL = (1, 3)  # seconds
 
+# Seconds between progress lines in async mode
+REPORT_INTERVAL = 5.0
+
 # Synthetic Data Pools
 USERS = [
     "john.doe@company.com",
@@ -53,40 +64,61 @@ EVENT_TYPES = [
     "new_country_login",
 ]
 
+# Weighted event distribution (most events are benign), aligned with EVENT_TYPES
+EVENT_WEIGHTS = [0.5, 0.25, 0.05, 0.15, 0.05]
+
+# Events drawn from SAFE_LOCATIONS + SUSPICIOUS_LOCATIONS with these weights;
+# all others come from SAFE_LOCATIONS only
+RISKY_EVENT_TYPES = ["failed_login", "new_country_login", "privilege_escalation"]
+RISKY_LOCATION_WEIGHTS = [0.3, 0.3, 0.3, 0.3, 0.3, 0.4, 0.4, 0.4, 0.3, 0.3]
+
+
+def user_pool(size: int = 0) -> List[str]:
+    """USERS padded with generated accounts up to `size` users."""
+    extra = max(0, size - len(USERS))
+    return USERS + [f"user{index:05d}@company.com" for index in range(extra)]
 
-def generate_ip() -> str:
+
+def generate_ip(rng: random.Random = random) -> str:
     """Generate a random IP address."""
-    return f"{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}"
+    return f"{rng.randint(1, 255)}.{rng.randint(1, 255)}.{rng.randint(1, 255)}.{rng.randint(1, 255)}"
 
 
-def generate_log() -> Dict[str, Any]:
+def generate_log(
+    rng: random.Random = random,
+    timestamp: Optional[str] = None,
+    users: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Generate a single synthetic security log.
     
+    Args:
+        rng: Random source (pass a seeded random.Random for reproducible traffic)
+        timestamp: ISO timestamp to stamp the log with (default: now)
+        users: User pool to draw from (default: USERS)
+    
     Returns:
         Dict containing timestamp, user, event_type, ip, location, and asset
     """
-    # Weighted event distribution (most events are benign)
-    event_weights = [0.5, 0.25, 0.05, 0.15, 0.05]
-    event_type = random.choices(EVENT_TYPES, weights=event_weights)[0]
+    event_type = rng.choices(EVENT_TYPES, weights=EVENT_WEIGHTS)[0]
     
-    user = random.choice(USERS)
-    asset = random.choice(ASSETS)
+    user = rng.choice(users or USERS)
+    asset = rng.choice(ASSETS)
     
     # Location logic: suspicious events more likely from suspicious locations
-    if event_type in ["failed_login", "new_country_login", "privilege_escalation"]:
-        location = random.choices(
+    if event_type in RISKY_EVENT_TYPES:
+        location = rng.choices(
             SAFE_LOCATIONS + SUSPICIOUS_LOCATIONS,
-            weights=[0.3, 0.3, 0.3, 0.3, 0.3, 0.4, 0.4, 0.4, 0.3, 0.3]
+            weights=RISKY_LOCATION_WEIGHTS
         )[0]
     else:
-        location = random.choice(SAFE_LOCATIONS)
+        location = rng.choice(SAFE_LOCATIONS)
     
     log = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
         "user": user,
         "event_type": event_type,
-        "ip": generate_ip(),
+        "ip": generate_ip(rng),
         "location": location,
         "asset": asset,
     }
@@ -146,5 +178,163 @@ def run_generator():
             time.sleep(1)
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# High-Rate Async Mode
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class RateLimiter:
+    """
+    Shared events/second limiter for asyncio producers.
+    
+    Each acquire(n) reserves the next n/rate seconds of the schedule and
+    sleeps until its slot, so the aggregate rate holds however many
+    producers share the limiter. Up to `burst` seconds of unused schedule
+    can be caught up after a stall.
+    """
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self._next = time.monotonic()
+    
+    async def acquire(self, count: int = 1) -> None:
+        now = time.monotonic()
+        self._next = max(self._next, now - self.burst)
+        slot = self._next
+        self._next += count / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def run_async_generator(
+    url: str = BATCH_INGESTION_URL,
+    rate: float = 1000,
+    producers: int = 8,
+    batch_size: int = 100,
+    total: Optional[int] = None,
+    duration: Optional[float] = None
+) -> Dict[str, int]:
+    """
+    Send generated logs at a target rate until `total` logs or `duration`
+    seconds (or forever if neither is set).
+    
+    Args:
+        url: /logs/batch endpoint (or /logs when batch_size is 1)
+        rate: Target events per second across all producers
+        producers: Concurrent producer tasks (and pooled connections)
+        batch_size: Logs per request
+        total: Stop after this many logs
+        duration: Stop after this many seconds
+    
+    Returns:
+        Counters: sent, accepted, failed (logs), requests, detections
+    """
+    import aiohttp
+    
+    limiter = RateLimiter(rate)
+    stats = {"sent": 0, "accepted": 0, "failed": 0, "requests": 0, "detections": 0}
+    deadline = time.monotonic() + duration if duration else None
+    batched = batch_size > 1
+    
+    def remaining() -> int:
+        if deadline and time.monotonic() >= deadline:
+            return 0
+        if total is None:
+            return batch_size
+        return min(batch_size, total - stats["sent"])
+    
+    async def producer(session: "aiohttp.ClientSession") -> None:
+        while True:
+            count = remaining()
+            if count <= 0:
+                return
+            stats["sent"] += count
+            await limiter.acquire(count)
+            logs = [generate_log() for _ in range(count)]
+            
+            try:
+                async with session.post(url, json=logs if batched else logs[0]) as response:
+                    body = await response.json(content_type=None)
+                    stats["requests"] += 1
+                    if response.status != 200:
+                        stats["failed"] += count
+                        continue
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                stats["failed"] += count
+                print(f"⚠️  Failed to send batch: {e}")
+                await asyncio.sleep(0.5)
+                continue
+            
+            if batched:
+                stats["accepted"] += body.get("accepted", 0)
+                stats["failed"] += body.get("rejected", 0)
+                stats["detections"] += len(body.get("detections", []))
+            else:
+                stats["accepted"] += 1
+                stats["detections"] += body.get("status") == "detected"
+    
+    async def reporter() -> None:
+        started = last_time = time.monotonic()
+        last_accepted = 0
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            now = time.monotonic()
+            current_rate = (stats["accepted"] - last_accepted) / (now - last_time)
+            print(f"📈 {stats['accepted']} accepted | {current_rate:,.0f} eps now | "
+                  f"{stats['accepted'] / (now - started):,.0f} eps avg | "
+                  f"{stats['failed']} failed | {stats['detections']} detections")
+            last_time, last_accepted = now, stats["accepted"]
+    
+    connector = aiohttp.TCPConnector(limit=producers, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        progress = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(*(producer(session) for _ in range(producers)))
+        finally:
+            progress.cancel()
+    
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arxis synthetic log generator")
+    parser.add_argument("--rate", type=float, help="Target events/s; enables the high-rate async mode")
+    parser.add_argument("--producers", type=int, default=8, help="Concurrent producers (async mode)")
+    parser.add_argument("--batch", type=int, default=100, help="Logs per request (async mode; 1 = POST /logs)")
+    parser.add_argument("--count", type=int, help="Stop after this many logs (async mode)")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds (async mode)")
+    parser.add_argument("--url", help="Ingestion endpoint (default: /logs/batch, or /logs for --batch 1)")
+    args = parser.parse_args()
+    
+    if args.rate is None:
+        run_generator()
+        return
+    
+    url = args.url or (BATCH_INGESTION_URL if args.batch > 1 else INGESTION_URL)
+    print("🔥 Arxis Log Generator Started (async)")
+    print(f"📡 Sending logs to: {url}")
+    print(f"⏱️  Target: {args.rate:,.0f} events/s | {args.producers} producers | batch {args.batch}\n")
+    
+    started = time.monotonic()
+    try:
+        stats = asyncio.run(run_async_generator(
+            url=url,
+            rate=args.rate,
+            producers=args.producers,
+            batch_size=args.batch,
+            total=args.count,
+            duration=args.duration
+        ))
+    except KeyboardInterrupt:
+        print("\n\n✅ Generator stopped.")
+        return
+    
+    elapsed = time.monotonic() - started
+    print(f"\n✅ Generator finished. {stats['accepted']} logs accepted in {elapsed:.1f}s "
+          f"({stats['accepted'] / elapsed:,.0f} eps), {stats['failed']} failed, "
+          f"{stats['detections']} detections")
+
+
 if __name__ == "__main__":
-    run_generator()
+    main()
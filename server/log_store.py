@@ -0,0 +1,194 @@
+"""
+Ring-Buffer Log Store for Arxis SOC
+
+Fixed-capacity, columnar store for recent SecurityLogs. Low-cardinality
+fields (user, event type, location, asset) are dictionary-encoded into
+typed arrays, so millions of events can stay in memory without creating a
+garbage-collected dict per log. Dictionary entries are reference-counted
+by the rows that use them, so values that leave the buffer are dropped and
+memory stays bounded by capacity even with high-cardinality users.
+"""
+
+from array import array
+from collections import deque
+from itertools import islice
+from typing import List, Dict, Any, Deque, Optional
+from models import SecurityLog
+
+
+class _Dictionary:
+    """
+    Maps repeated string values to small integer codes and back.
+
+    Each encode() takes a reference that release() gives back; a value with
+    no references left is dropped and its code reused.
+    """
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[Optional[str]] = []
+        self._refs: List[int] = []
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            if self._free:
+                code = self._free.pop()
+                self.values[code] = value
+            else:
+                code = len(self.values)
+                self.values.append(value)
+                self._refs.append(0)
+            self.codes[value] = code
+        self._refs[code] += 1
+        return code
+
+    def release(self, code: int) -> None:
+        remaining = self._refs[code] - 1
+        self._refs[code] = remaining
+        if not remaining:
+            del self.codes[self.values[code]]
+            self.values[code] = None
+            self._free.append(code)
+
+
+class LogRingBuffer:
+    """
+    Fixed-capacity ring buffer of security logs.
+
+    - append() is O(1) and overwrites the oldest log once full
+    - recent(k) is O(k)
+    - for_user(user, k) is O(k) via a per-user index of sequence numbers
+    - after(cursor, k) is O(k): logs are numbered 1, 2, ... in append order
+
+    Not thread-safe on its own; ArxisStorage guards it with its lock.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._init_columns()
+
+    def _init_columns(self) -> None:
+        capacity = self.capacity
+
+        # Free-form columns
+        self._timestamps: List[str] = [""] * capacity
+        self._ips: List[str] = [""] * capacity
+
+        # Dictionary-encoded columns
+        self._users = array("I", bytes(4 * capacity))
+        self._event_types = array("I", bytes(4 * capacity))
+        self._locations = array("I", bytes(4 * capacity))
+        self._assets = array("I", bytes(4 * capacity))
+
+        self._user_dict = _Dictionary()
+        self._event_type_dict = _Dictionary()
+        self._location_dict = _Dictionary()
+        self._asset_dict = _Dictionary()
+
+        # Sequence numbers of buffered logs per user code, oldest first
+        self._user_index: Dict[int, Deque[int]] = {}
+
+        # Total logs ever appended; the next log gets this sequence number
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Writes
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def append(self, log: SecurityLog) -> None:
+        """Append a log, evicting the oldest one when full."""
+        seq = self._next_seq
+        slot = seq % self.capacity
+
+        evicted = None
+        if seq >= self.capacity:
+            # The evicted log is always the oldest one for its user
+            evicted_user = self._users[slot]
+            user_seqs = self._user_index[evicted_user]
+            user_seqs.popleft()
+            if not user_seqs:
+                del self._user_index[evicted_user]
+            evicted = (evicted_user, self._event_types[slot], self._locations[slot], self._assets[slot])
+
+        user_code = self._user_dict.encode(log.user)
+        event_type = log.event_type
+        self._timestamps[slot] = log.timestamp
+        self._ips[slot] = log.ip
+        self._users[slot] = user_code
+        self._event_types[slot] = self._event_type_dict.encode(getattr(event_type, "value", event_type))
+        self._locations[slot] = self._location_dict.encode(log.location)
+        self._assets[slot] = self._asset_dict.encode(log.asset)
+
+        user_seqs = self._user_index.get(user_code)
+        if user_seqs is None:
+            user_seqs = self._user_index[user_code] = deque()
+        user_seqs.append(seq)
+
+        # Released after encoding, so a value the new log repeats keeps its code
+        if evicted is not None:
+            user_code, event_type_code, location_code, asset_code = evicted
+            self._user_dict.release(user_code)
+            self._event_type_dict.release(event_type_code)
+            self._location_dict.release(location_code)
+            self._asset_dict.release(asset_code)
+
+        self._next_seq = seq + 1
+
+    def clear(self) -> None:
+        """Drop all buffered logs."""
+        self._init_columns()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Reads
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Most recent logs, oldest first."""
+        if limit <= 0:
+            return []
+        end = self._next_seq
+        start = max(end - limit, end - len(self))
+        return [self._row(seq) for seq in range(start, end)]
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the latest appended log (0 when none)."""
+        return self._next_seq
+
+    def after(self, cursor: int, limit: int) -> List[Dict[str, Any]]:
+        """Most recent logs (at most `limit`) appended after `cursor`, oldest first."""
+        if limit <= 0:
+            return []
+        end = self._next_seq
+        start = max(cursor, end - limit, end - len(self))
+        return [self._row(seq) for seq in range(start, end)]
+
+    def for_user(self, user: str, limit: int) -> List[Dict[str, Any]]:
+        """Most recent logs for a user, oldest first."""
+        user_code = self._user_dict.codes.get(user)
+        user_seqs = self._user_index.get(user_code)
+        if not user_seqs or limit <= 0:
+            return []
+        seqs = list(islice(reversed(user_seqs), limit))
+        return [self._row(seq) for seq in reversed(seqs)]
+
+    def _row(self, seq: int) -> Dict[str, Any]:
+        slot = seq % self.capacity
+        return {
+            "timestamp": self._timestamps[slot],
+            "user": self._user_dict.values[self._users[slot]],
+            "event_type": self._event_type_dict.values[self._event_types[slot]],
+            "ip": self._ips[slot],
+            "location": self._location_dict.values[self._locations[slot]],
+            "asset": self._asset_dict.values[self._assets[slot]],
+        }
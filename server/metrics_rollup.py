@@ -0,0 +1,209 @@
+"""
+Metrics Rollups for Arxis SOC
+
+Running counters behind the dashboard metrics. Storage updates them as logs,
+signals and alerts are inserted, so /metrics and /metrics/realtime read
+totals, per-severity / threat type / user counts and per-minute rates in
+O(1) instead of scanning stores under the storage lock.
+
+Rates are kept as fixed-width time buckets (one per minute by default) for
+the last `retention_buckets` buckets.
+"""
+
+import time
+from collections import Counter, deque
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Per-bucket counter slots
+LOGS, SIGNALS, ALERTS = 0, 1, 2
+SERIES = {"logs": LOGS, "signals": SIGNALS, "alerts": ALERTS}
+
+
+class MetricsRollup:
+    """
+    Thread-safe running totals and time-bucketed rates.
+
+    Has its own lock, held only for counter updates and small copies, so
+    metric reads never wait on storage I/O or index maintenance.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 60,
+        retention_buckets: int = 60,
+        recent_alerts: int = 20,
+        clock: Callable[[], float] = time.time
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self.clock = clock
+
+        self.total_logs = 0
+        self.total_signals = 0
+        self.pending_signals = 0
+        self.total_alerts = 0
+        self.alerts_by_severity: Counter = Counter()
+        self.alerts_by_threat_type: Counter = Counter()
+        self.alerts_by_user: Counter = Counter()
+        self._recent_alerts: "deque[Dict[str, Any]]" = deque(maxlen=recent_alerts)
+
+        # bucket index (epoch // bucket_seconds) -> [logs, signals, alerts]
+        self._buckets: Dict[int, List[int]] = {}
+        self._lock = Lock()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Recording
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def record_logs(self, count: int, at: Optional[float] = None) -> None:
+        """Count ingested logs."""
+        with self._lock:
+            self.total_logs += count
+            self._bump(LOGS, count, at)
+
+    def record_signals(self, count: int, at: Optional[float] = None) -> None:
+        """Count newly stored (pending) signals."""
+        with self._lock:
+            self.total_signals += count
+            self.pending_signals += count
+            self._bump(SIGNALS, count, at)
+
+    def record_processed(self, count: int = 1) -> None:
+        """Retire signals from the pending gauge."""
+        with self._lock:
+            self.pending_signals = max(0, self.pending_signals - count)
+
+    def record_alert(self, record: Dict[str, Any], at: Optional[float] = None) -> None:
+        """
+        Count a stored alert.
+
+        Args:
+            record: Alert record (model_dump)
+            at: Epoch seconds to bucket the alert under (default: now)
+        """
+        severity = getattr(record["severity"], "value", record["severity"])
+        with self._lock:
+            self.total_alerts += 1
+            self.alerts_by_severity[severity] += 1
+            self.alerts_by_threat_type[record["threat_type"]] += 1
+            self.alerts_by_user[record["user"]] += 1
+            self._recent_alerts.append(record)
+            self._bump(ALERTS, 1, at)
+
+    def seed(
+        self,
+        logs: int = 0,
+        signals: int = 0,
+        pending_signals: int = 0,
+        alert_counts: Iterable[Tuple[str, str, str, int]] = (),
+        recent_alerts: Iterable[Dict[str, Any]] = ()
+    ) -> None:
+        """
+        Load totals for data that already existed at startup.
+
+        Seeded data only affects totals, never the rate buckets.
+
+        Args:
+            logs / signals / pending_signals: Existing counts
+            alert_counts: (severity, threat_type, user, count) groups
+            recent_alerts: Most recent alert records, oldest first
+        """
+        with self._lock:
+            self.total_logs += logs
+            self.total_signals += signals
+            self.pending_signals += pending_signals
+            for severity, threat_type, user, count in alert_counts:
+                self.total_alerts += count
+                self.alerts_by_severity[severity] += count
+                self.alerts_by_threat_type[threat_type] += count
+                self.alerts_by_user[user] += count
+            self._recent_alerts.extend(recent_alerts)
+
+    def _bump(self, slot: int, count: int, at: Optional[float]) -> None:
+        now_bucket = int(self.clock() // self.bucket_seconds)
+        bucket = now_bucket if at is None else int(at // self.bucket_seconds)
+        oldest = now_bucket - self.retention_buckets + 1
+        if bucket < oldest or bucket > now_bucket:
+            return
+
+        counts = self._buckets.get(bucket)
+        if counts is None:
+            counts = self._buckets[bucket] = [0, 0, 0]
+            if len(self._buckets) > self.retention_buckets:
+                for stale in [b for b in self._buckets if b < oldest]:
+                    del self._buckets[stale]
+        counts[slot] += count
+
+    def clear(self) -> None:
+        """Reset every counter."""
+        with self._lock:
+            self.total_logs = self.total_signals = self.pending_signals = self.total_alerts = 0
+            self.alerts_by_severity.clear()
+            self.alerts_by_threat_type.clear()
+            self.alerts_by_user.clear()
+            self._recent_alerts.clear()
+            self._buckets.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Reading
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def severity_counts(self, severities: Iterable[str]) -> Dict[str, int]:
+        """Alert counts for the given severities (zero-filled)."""
+        with self._lock:
+            return {severity: self.alerts_by_severity.get(severity, 0) for severity in severities}
+
+    def recent_alerts(self, limit: int) -> List[Dict[str, Any]]:
+        """Most recent alerts, oldest first (up to the retained number)."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            return list(self._recent_alerts)[-limit:]
+
+    def rate(self, series: str, buckets: int = 1) -> int:
+        """Events of a series ("logs", "signals", "alerts") in the last `buckets` buckets."""
+        return sum(self.series(series, buckets))
+
+    def series(self, series: str, buckets: int) -> List[int]:
+        """Per-bucket counts of a series for the last `buckets` buckets, oldest first."""
+        slot = SERIES[series]
+        buckets = max(0, min(buckets, self.retention_buckets))
+        now_bucket = int(self.clock() // self.bucket_seconds)
+        with self._lock:
+            return [
+                self._buckets[bucket][slot] if bucket in self._buckets else 0
+                for bucket in range(now_bucket - buckets + 1, now_bucket + 1)
+            ]
+
+    def rollups(self, buckets: int = 60, top: int = 10) -> Dict[str, Any]:
+        """
+        Rate graph data and top breakdowns.
+
+        Args:
+            buckets: Number of most recent buckets per series
+            top: Number of threat types / users to include
+
+        Returns:
+            {"bucket_seconds", "start", "series": {name: [counts]},
+             "totals", "top_threat_types", "top_users"}
+        """
+        buckets = max(1, min(buckets, self.retention_buckets))
+        start_bucket = int(self.clock() // self.bucket_seconds) - buckets + 1
+        series = {name: self.series(name, buckets) for name in SERIES}
+        with self._lock:
+            return {
+                "bucket_seconds": self.bucket_seconds,
+                "start": start_bucket * self.bucket_seconds,
+                "series": series,
+                "totals": {
+                    "logs": self.total_logs,
+                    "signals": self.total_signals,
+                    "pending_signals": self.pending_signals,
+                    "alerts": self.total_alerts,
+                },
+                "alerts_by_severity": dict(self.alerts_by_severity),
+                "top_threat_types": dict(self.alerts_by_threat_type.most_common(top)),
+                "top_users": dict(self.alerts_by_user.most_common(top)),
+            }
@@ -6,7 +6,7 @@ Pydantic models defining the shape of data flowing through the system.
 
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 
 
@@ -28,6 +28,16 @@ class SecurityLog(BaseModel):
     location: str
     asset: str
 
+    @field_validator("timestamp")
+    @classmethod
+    def _iso_timestamp(cls, value: str) -> str:
+        # Detection windows parse this; reject it here rather than mid-batch
+        try:
+            datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("timestamp must be an ISO-8601 date-time")
+        return value
+
 
 class Severity(str, Enum):
     """Alert severity levels."""
@@ -0,0 +1,273 @@
+"""
+Pipeline Instrumentation for Arxis SOC
+
+Measured latency and throughput for each pipeline stage (ingest handler,
+detection, storage, agent queue wait, agent analysis). Every stage keeps a
+log-scale latency histogram (p50/p95/p99) and a rolling per-second window
+for rates and recent latency.
+
+Recording is lock-free: each thread writes to its own shard of counters and
+readers merge the shards, so the ingest path never contends with metric
+reads or with other writers.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Histogram buckets: upper bounds MIN_LATENCY * 2^(i / SUBBUCKETS), so each
+# bucket is ~19% wide; 100 buckets span 10µs .. ~335s
+MIN_LATENCY = 1e-5
+SUBBUCKETS = 4
+BUCKETS = 100
+BUCKET_BOUNDS = [MIN_LATENCY * 2 ** (i / SUBBUCKETS) for i in range(BUCKETS)]
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Pipeline stages, in the order they are reported
+STAGES = ("ingest", "detection", "storage", "triage", "queue_wait", "agent_analysis")
+
+
+def _bucket_for(seconds: float) -> int:
+    if seconds <= MIN_LATENCY:
+        return 0
+    return min(BUCKETS - 1, math.ceil(math.log2(seconds / MIN_LATENCY) * SUBBUCKETS))
+
+
+class _Shard:
+    """One thread's counters for one stage (single writer)."""
+
+    __slots__ = ("counts", "total", "sum", "window_stamps", "window_ops", "window_items", "window_sums")
+
+    def __init__(self, window: int):
+        self.counts = [0] * BUCKETS
+        self.total = 0
+        self.sum = 0.0
+        # Ring of per-second slots: second, operations, items, summed latency
+        self.window_stamps = [-1] * window
+        self.window_ops = [0] * window
+        self.window_items = [0] * window
+        self.window_sums = [0.0] * window
+
+
+class StageTimer:
+    """
+    Latency histogram plus rolling window for one stage.
+
+    Args:
+        window_seconds: Length of the rolling window used for rates and
+            recent latency history
+        clock: Monotonic clock for the rolling window
+    """
+
+    def __init__(self, window_seconds: int = 60, clock=time.monotonic):
+        self.window_seconds = max(1, window_seconds)
+        self.clock = clock
+        self._shards: List[_Shard] = []
+        self._local = threading.local()
+        self._register_lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(self.window_seconds)
+            # Taken once per thread, never on the hot path
+            with self._register_lock:
+                self._shards = self._shards + [shard]
+        return shard
+
+    def observe(self, seconds: float, count: int = 1) -> None:
+        """
+        Record one timed operation.
+
+        Args:
+            seconds: Latency of the operation
+            count: Items it covered (e.g. logs in a batch), for rates
+        """
+        shard = self._shard()
+        shard.counts[_bucket_for(seconds)] += 1
+        shard.total += 1
+        shard.sum += seconds
+
+        second = int(self.clock())
+        slot = second % self.window_seconds
+        if shard.window_stamps[slot] != second:
+            shard.window_stamps[slot] = second
+            shard.window_ops[slot] = 0
+            shard.window_items[slot] = 0
+            shard.window_sums[slot] = 0.0
+        shard.window_ops[slot] += 1
+        shard.window_items[slot] += count
+        shard.window_sums[slot] += seconds
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Reading
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def histogram(self) -> Tuple[List[int], int, float]:
+        """Merged (bucket counts, total count, latency sum) across threads."""
+        counts = [0] * BUCKETS
+        total = 0
+        latency_sum = 0.0
+        for shard in self._shards:
+            for index, value in enumerate(shard.counts):
+                if value:
+                    counts[index] += value
+            total += shard.total
+            latency_sum += shard.sum
+        return counts, total, latency_sum
+
+    def quantiles(self, quantiles: Iterable[float] = QUANTILES) -> Dict[float, float]:
+        """Latency quantiles in seconds (bucket upper bounds; 0 when empty)."""
+        counts, total, _ = self.histogram()
+        result = {}
+        for q in quantiles:
+            if not total:
+                result[q] = 0.0
+                continue
+            target = max(1, math.ceil(q * total))
+            seen = 0
+            for index, value in enumerate(counts):
+                seen += value
+                if seen >= target:
+                    result[q] = BUCKET_BOUNDS[index]
+                    break
+        return result
+
+    def recent(self, seconds: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """
+        Per-second (operations, items, summed latency) for the last
+        `seconds` seconds, oldest first.
+        """
+        seconds = min(seconds or self.window_seconds, self.window_seconds)
+        now = int(self.clock())
+        slots = [[0, 0, 0.0] for _ in range(seconds)]
+        for shard in self._shards:
+            for offset in range(seconds):
+                second = now - seconds + 1 + offset
+                slot = second % self.window_seconds
+                if shard.window_stamps[slot] == second:
+                    slots[offset][0] += shard.window_ops[slot]
+                    slots[offset][1] += shard.window_items[slot]
+                    slots[offset][2] += shard.window_sums[slot]
+        return [tuple(slot) for slot in slots]
+
+    def rate(self) -> float:
+        """Items per second over the rolling window."""
+        return sum(items for _, items, _ in self.recent()) / self.window_seconds
+
+
+class PipelineMetrics:
+    """Stage timers for the whole pipeline."""
+
+    def __init__(self, window_seconds: int = 60, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.stages: Dict[str, StageTimer] = {
+            stage: StageTimer(window_seconds, clock) for stage in STAGES
+        }
+
+    def observe(self, stage: str, seconds: float, count: int = 1) -> None:
+        """Record a latency for a stage."""
+        self.stages[stage].observe(seconds, count)
+
+    @contextmanager
+    def time(self, stage: str, count: int = 1) -> Iterator[None]:
+        """Time the enclosed block as one operation of `stage`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage].observe(time.perf_counter() - started, count)
+
+    def stage_stats(self, stage: str, history: int = 10) -> Dict[str, Any]:
+        """
+        Latency and throughput summary for one stage.
+
+        Returns:
+            {"count", "rate", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "history"}
+            where rate is items/second over the rolling window and history is
+            the mean latency (ms) of each of the last `history` seconds
+        """
+        timer = self.stages[stage]
+        _, total, latency_sum = timer.histogram()
+        quantiles = timer.quantiles()
+        return {
+            "count": total,
+            "rate": round(timer.rate(), 3),
+            "p50_ms": _ms(quantiles[0.5]),
+            "p95_ms": _ms(quantiles[0.95]),
+            "p99_ms": _ms(quantiles[0.99]),
+            "mean_ms": _ms(latency_sum / total) if total else 0.0,
+            "history": [
+                _ms(latency / ops) if ops else 0.0
+                for ops, _, latency in timer.recent(history)
+            ],
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """stage_stats() for every stage."""
+        return {stage: self.stage_stats(stage) for stage in self.stages}
+
+    def prometheus(self, prefix: str = "arxis") -> str:
+        """Stage latency summaries and rates in Prometheus text format."""
+        latency_samples = []
+        rate_samples = []
+        for stage, timer in self.stages.items():
+            _, total, latency_sum = timer.histogram()
+            labels = {"stage": stage}
+            for q, value in timer.quantiles().items():
+                latency_samples.append(("", {**labels, "quantile": str(q)}, value))
+            latency_samples.append(("_sum", labels, latency_sum))
+            latency_samples.append(("_count", labels, total))
+            rate_samples.append(("", labels, timer.rate()))
+
+        return "".join([
+            render_metric(f"{prefix}_stage_latency_seconds", "summary",
+                          "Pipeline stage latency", latency_samples),
+            render_metric(f"{prefix}_stage_rate", "gauge",
+                          f"Items per second over the last {self.window_seconds}s",
+                          rate_samples),
+        ])
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def render_metric(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[Tuple[str, Dict[str, str], float]]
+) -> str:
+    """
+    Render one metric family in Prometheus text exposition format.
+
+    Args:
+        name: Metric name
+        kind: counter, gauge, summary or histogram
+        help_text: HELP line
+        samples: (name suffix, labels, value) tuples
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+        lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def create_pipeline_metrics() -> PipelineMetrics:
+    """Build pipeline metrics from ARXIS_METRICS_WINDOW (rolling window seconds)."""
+    return PipelineMetrics(window_seconds=int(os.getenv("ARXIS_METRICS_WINDOW", "60")))
+
+
+# Global pipeline metrics instance
+pipeline_metrics = create_pipeline_metrics()
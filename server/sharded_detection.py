@@ -0,0 +1,371 @@
+"""
+Sharded Detection for Arxis SOC
+
+Runs one DetectionEngine per worker process and hash-partitions logs by
+SecurityLog.user, so each worker owns the window state for its slice of
+users. Batches are fanned out to all shards at once and signals flow back
+to the API process, preserving per-user ordering.
+
+Each shard's slice of a batch crosses the pipe as six delimited column
+strings (a handful of objects to pickle rather than a tuple per log), and
+only the logs that triggered a signal come back. An exception inside a shard is sent
+back and re-raised in the caller; a shard process that dies is restarted with empty
+window state and the request is retried on it once.
+
+Partitioning by user only keeps window state complete for rules grouped by
+user, so stateful rules with any other `group_by` are rejected at startup.
+
+analyze() blocks on pipe round-trips, so callers on an event loop should run
+it in a worker thread (see the `blocking` attribute).
+
+Enable with ARXIS_DETECTION_SHARDS=<n> (n > 1).
+"""
+
+import multiprocessing
+import pickle
+import zlib
+from pathlib import Path
+from threading import Lock
+from typing import Any, List, Optional, Dict, Tuple, Union
+from models import SecurityLog, DetectionSignal
+from detection_rules import (
+    DEFAULT_RULES_PATH,
+    MatchRule,
+    RuleError,
+    compile_rules,
+    load_rule_specs,
+    pack_log,
+    unpack_log,
+)
+
+
+# Separates values within a column of the wire format (ASCII record separator)
+RECORD_SEP = "\x1e"
+
+# Stop caching user -> shard beyond this many users
+SHARD_CACHE_SIZE = 100_000
+
+# Log field that logs are partitioned by
+SHARD_KEY = "user"
+
+
+def shard_for(user: str, shards: int) -> int:
+    """Stable shard index for a user (same in every process and run)."""
+    return zlib.crc32(user.encode("utf-8")) % shards
+
+
+def check_shardable(rules_path: Optional[str]) -> None:
+    """
+    Reject rule sets whose window state would be split across shards.
+
+    Raises:
+        RuleError: If a threshold/sequence rule groups by anything but user
+    """
+    rules = compile_rules(load_rule_specs(Path(rules_path or DEFAULT_RULES_PATH)))
+    for rule in rules:
+        if not isinstance(rule, MatchRule) and rule.group_by != SHARD_KEY:
+            raise RuleError(
+                f"{rule.id}: group_by {rule.group_by!r} is not supported with sharded "
+                f"detection (logs are partitioned by {SHARD_KEY}); use ARXIS_DETECTION_SHARDS=1"
+            )
+
+
+def encode_logs(logs: List[SecurityLog]) -> Union[Tuple[str, ...], List[tuple]]:
+    """
+    Encode logs for a shard as one delimited string per field (columns in
+    pack_log() order).
+
+    Falls back to packed tuples when a value itself contains the delimiter.
+    """
+    columns = (
+        RECORD_SEP.join([log.timestamp for log in logs]),
+        RECORD_SEP.join([log.user for log in logs]),
+        RECORD_SEP.join([getattr(log.event_type, "value", log.event_type) for log in logs]),
+        RECORD_SEP.join([log.ip for log in logs]),
+        RECORD_SEP.join([log.location for log in logs]),
+        RECORD_SEP.join([log.asset for log in logs]),
+    )
+    if all(column.count(RECORD_SEP) == len(logs) - 1 for column in columns):
+        return columns
+    return [pack_log(log) for log in logs]
+
+
+def decode_logs(payload: Union[Tuple[str, ...], List[tuple]]) -> List[SecurityLog]:
+    """Rebuild logs encoded by encode_logs()."""
+    if isinstance(payload, tuple):
+        payload = zip(*(column.split(RECORD_SEP) for column in payload))
+    return [unpack_log(row) for row in payload]
+
+
+def _shard_main(conn, options: Dict[str, Any]) -> None:
+    """Worker process loop: own a DetectionEngine and serve commands."""
+    from detection_engine import DetectionEngine
+
+    engine = DetectionEngine(**options)
+
+    while True:
+        try:
+            command, payload = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if command == "stop":
+            break
+
+        try:
+            if command == "analyze":
+                # Only (position, signal) pairs for the logs that matched
+                signals = engine.analyze_batch(decode_logs(payload))
+                reply = [(index, signal) for index, signal in enumerate(signals) if signal]
+            elif command == "stats":
+                reply = engine.state_stats()
+            elif command == "export":
+                reply = engine.export_state()
+            elif command == "import":
+                engine.import_state(payload)
+                reply = True
+            else:
+                reply = ValueError(f"unknown shard command {command!r}")
+        except Exception as e:
+            # Sent back as the reply and re-raised by the caller
+            reply = e
+
+        try:
+            conn.send(reply)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            conn.send(RuntimeError(f"detection shard reply could not be sent: {e}"))
+
+    conn.close()
+
+
+class ShardedDetectionEngine:
+    """
+    Drop-in replacement for DetectionEngine backed by a process pool.
+
+    Exposes the same analyze()/analyze_batch() surface. Worker processes
+    are started lazily on first use (so merely importing this module in a
+    worker never spawns more workers).
+    """
+
+    # Calls wait on worker processes; run them off the event loop
+    blocking = True
+
+    def __init__(
+        self,
+        shards: int,
+        rules_path: Optional[str] = None,
+        state_ttl: float = 3600.0,
+        max_users: int = 100_000
+    ):
+        if shards < 2:
+            raise ValueError("sharded detection needs at least 2 shards")
+        check_shardable(rules_path)
+        self.shards = shards
+
+        # Each shard gets an equal slice of the global user cap
+        self.options = {
+            "rules_path": rules_path,
+            "state_ttl": state_ttl,
+            "max_users": -(-max_users // shards),
+        }
+
+        self._connections: list = []
+        self._processes: list = []
+        self._lock = Lock()
+        self._shard_of: Dict[str, int] = {}
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lifecycle
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def start(self) -> None:
+        """Spawn the shard processes (no-op if already running)."""
+        with self._lock:
+            if self._processes:
+                return
+
+            for shard in range(self.shards):
+                connection, process = self._spawn(shard)
+                self._connections.append(connection)
+                self._processes.append(process)
+
+            print(f"✅ Sharded detection started ({self.shards} processes)")
+
+    def _spawn(self, shard: int):
+        # spawn, not fork: the API process runs threads (uvicorn, threadpool)
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=_shard_main,
+            args=(child_conn, self.options),
+            name=f"arxis-detect-{shard}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return parent_conn, process
+
+    def _restart(self, shard: int) -> None:
+        """Replace a dead shard process (its window state is lost)."""
+        process = self._processes[shard]
+        try:
+            self._connections[shard].close()
+        except OSError:
+            pass
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+        print(f"♻️  Detection shard {shard} died (exit code {process.exitcode}); "
+              f"restarted with empty window state")
+        self._connections[shard], self._processes[shard] = self._spawn(shard)
+
+    def _exchange(self, messages: Dict[int, tuple]) -> Dict[int, Any]:
+        """
+        Send one message per shard, then gather the replies.
+
+        Shards work concurrently between the two phases. A shard that died is
+        restarted and asked once more. Every reply is read before an error is
+        raised, so the pipes stay in step. Callers hold self._lock.
+
+        Raises:
+            The exception a shard replied with, or RuntimeError if a shard
+            died again on the retry
+        """
+        failed = []
+        for shard, message in messages.items():
+            try:
+                self._connections[shard].send(message)
+            except OSError:
+                failed.append(shard)
+
+        replies: Dict[int, Any] = {}
+        for shard in messages:
+            if shard in failed:
+                continue
+            try:
+                replies[shard] = self._connections[shard].recv()
+            except (EOFError, OSError):
+                failed.append(shard)
+
+        for shard in failed:
+            self._restart(shard)
+            try:
+                self._connections[shard].send(messages[shard])
+                replies[shard] = self._connections[shard].recv()
+            except (EOFError, OSError):
+                self._restart(shard)
+                replies[shard] = RuntimeError(
+                    f"detection shard {shard} died twice on {messages[shard][0]!r}"
+                )
+
+        for reply in replies.values():
+            if isinstance(reply, BaseException):
+                raise reply
+        return replies
+
+    def close(self) -> None:
+        """Stop all shard processes."""
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.send(("stop", None))
+                    conn.close()
+                except (OSError, BrokenPipeError):
+                    pass
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._connections.clear()
+            self._processes.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Detection
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def analyze(self, log: SecurityLog) -> Optional[DetectionSignal]:
+        """Analyze a single log on its user's shard."""
+        return self.analyze_batch([log])[0]
+
+    def analyze_batch(self, logs: List[SecurityLog]) -> List[Optional[DetectionSignal]]:
+        """
+        Analyze a batch of logs across all shards in parallel.
+
+        Returns:
+            One entry per log, in input order: the DetectionSignal it
+            triggered, or None
+        """
+        if not self._processes:
+            self.start()
+
+        # Partition by user, remembering each log's position in the batch
+        positions: Dict[int, List[int]] = {}
+        partitions: Dict[int, List[SecurityLog]] = {}
+        shard_of = self._shard_of
+        for index, log in enumerate(logs):
+            shard = shard_of.get(log.user)
+            if shard is None:
+                shard = shard_for(log.user, self.shards)
+                if len(shard_of) < SHARD_CACHE_SIZE:
+                    shard_of[log.user] = shard
+            positions.setdefault(shard, []).append(index)
+            partitions.setdefault(shard, []).append(log)
+
+        messages = {shard: ("analyze", encode_logs(part)) for shard, part in partitions.items()}
+        with self._lock:
+            replies = self._exchange(messages)
+
+        results: List[Optional[DetectionSignal]] = [None] * len(logs)
+        for shard, matches in replies.items():
+            shard_positions = positions[shard]
+            for offset, signal in matches:
+                results[shard_positions[offset]] = signal
+        return results
+
+    def state_stats(self) -> Dict[str, Any]:
+        """Detection state size and eviction counters summed over all shards."""
+        if not self._processes:
+            self.start()
+
+        with self._lock:
+            replies = self._exchange({shard: ("stats", None) for shard in range(self.shards)})
+        per_shard = [replies[shard] for shard in range(self.shards)]
+
+        totals = {
+            key: sum(stats[key] for stats in per_shard)
+            for key in ("users", "rule_states", "buffered_events", "max_users",
+                        "expired_users", "evicted_users")
+        }
+        totals["idle_ttl_seconds"] = per_shard[0]["idle_ttl_seconds"]
+        totals["shards"] = self.shards
+        return totals
+
+    def export_state(self) -> Dict[str, Any]:
+        """Snapshot window state from every shard (same format as DetectionEngine)."""
+        if not self._processes:
+            self.start()
+
+        with self._lock:
+            snapshots = list(self._exchange({shard: ("export", None) for shard in range(self.shards)}).values())
+
+        users = [entry for snapshot in snapshots for entry in snapshot["users"]]
+        users.sort(key=lambda entry: entry[1])
+        return {
+            "clock": max(snapshot["clock"] for snapshot in snapshots),
+            "users": users
+        }
+
+    def import_state(self, snapshot: Dict[str, Any]) -> None:
+        """Restore window state, re-partitioning users across the current shards."""
+        if not self._processes:
+            self.start()
+
+        partitions: List[list] = [[] for _ in range(self.shards)]
+        for entry in snapshot["users"]:
+            partitions[shard_for(entry[0], self.shards)].append(entry)
+
+        with self._lock:
+            self._exchange({
+                shard: ("import", {"clock": snapshot["clock"], "users": users})
+                for shard, users in enumerate(partitions)
+            })
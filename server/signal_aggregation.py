@@ -0,0 +1,176 @@
+"""
+Signal Aggregation for Arxis SOC
+
+Folds repeat detection signals for the same (user, signal_type) into a
+single incident before agent analysis. A sustained brute-force attack then
+costs one agent run per aggregation window instead of one per failed login.
+
+The first signal for a key is released immediately and opens a window.
+Repeats inside the window are merged into one follow-up incident, released
+when the window closes; releasing it opens the next window, so a sustained
+attack keeps folding while a quiet key closes and its next signal is again
+released at once.
+
+Windows are kept in a heap ordered by deadline, so each tick only touches
+the windows that have closed, however many keys are open.
+"""
+
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import DetectionSignal, Severity
+
+
+SEVERITY_RANK = {
+    Severity.LOW: 0,
+    Severity.MEDIUM: 1,
+    Severity.HIGH: 2,
+    Severity.CRITICAL: 3,
+}
+
+
+def _event_key(log) -> tuple:
+    return (log.timestamp, log.user, log.event_type, log.ip, log.location, log.asset)
+
+
+class SignalAggregator:
+    """
+    Holds aggregation windows and their follow-up incidents, keyed by
+    (user, signal_type).
+
+    A follow-up incident keeps the id of the first repeat folded into it, so
+    callers can report it for every folded signal. Events are merged
+    (deduplicated, most recent `max_events` kept), metadata takes the newest
+    values, and severity escalates to the highest seen.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 30.0,
+        max_events: int = 100,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.window_seconds = window_seconds
+        self.max_events = max_events
+        self.clock = clock
+
+        # (user, signal_type) -> [window opened_at, follow-up incident or None, signal count]
+        self._open: Dict[Tuple[str, str], list] = {}
+        # (deadline, sequence, key): one entry per open window
+        self._deadlines: List[tuple] = []
+        self._sequence = 0
+
+        self.received = 0
+        self.released = 0
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Aggregation
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def add(self, signal: DetectionSignal) -> Tuple[DetectionSignal, bool]:
+        """
+        Route a signal: release it now or fold it into its key's follow-up.
+
+        Returns:
+            (incident, release_now): the signal itself and True when it opens
+            a window (the caller releases it), otherwise the follow-up
+            incident it was folded into and False
+        """
+        self.received += 1
+        key = (signal.user, signal.signal_type.value)
+        entry = self._open.get(key)
+
+        if entry is None:
+            self._open_window(key, self.clock())
+            self.released += 1
+            return signal, True
+
+        entry[2] += 1
+        if entry[1] is None:
+            incident = entry[1] = signal.model_copy(deep=True)
+            incident.metadata["first_detected_at"] = signal.detected_at
+            incident.metadata["aggregated_signals"] = 1
+        else:
+            self._merge(entry[1], signal, entry[2])
+        return entry[1], False
+
+    def _open_window(self, key: Tuple[str, str], now: float) -> None:
+        self._open[key] = [now, None, 0]
+        self._sequence += 1
+        heapq.heappush(self._deadlines, (now + self.window_seconds, self._sequence, key))
+
+    def _merge(self, incident: DetectionSignal, signal: DetectionSignal, count: int) -> None:
+        seen = {_event_key(log) for log in incident.events}
+        for log in signal.events:
+            key = _event_key(log)
+            if key not in seen:
+                seen.add(key)
+                incident.events.append(log)
+        if len(incident.events) > self.max_events:
+            del incident.events[:-self.max_events]
+
+        if SEVERITY_RANK[signal.severity] > SEVERITY_RANK[incident.severity]:
+            incident.severity = signal.severity
+
+        first_detected_at = incident.metadata["first_detected_at"]
+        incident.metadata.update(signal.metadata)
+        incident.metadata["first_detected_at"] = first_detected_at
+        incident.metadata["aggregated_signals"] = count
+        incident.detected_at = signal.detected_at
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Release
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def due(self, now: Optional[float] = None) -> List[DetectionSignal]:
+        """
+        Close windows that have elapsed and pop their follow-up incidents.
+
+        A window that produced a follow-up is reopened (the attack is still
+        going); an empty one is dropped.
+        """
+        now = self.clock() if now is None else now
+        deadlines = self._deadlines
+
+        incidents = []
+        while deadlines and deadlines[0][0] <= now:
+            _, _, key = heapq.heappop(deadlines)
+            incident = self._open.pop(key)[1]
+            if incident is not None:
+                incidents.append(incident)
+                self._open_window(key, now)
+        self.released += len(incidents)
+        return incidents
+
+    def drain(self) -> List[DetectionSignal]:
+        """Pop every pending follow-up incident and close all windows (e.g. on shutdown)."""
+        incidents = [entry[1] for entry in self._open.values() if entry[1] is not None]
+        self._open.clear()
+        self._deadlines.clear()
+        self.released += len(incidents)
+        return incidents
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the oldest open window closes (None if idle)."""
+        if not self._deadlines:
+            return None
+        return max(0.0, self._deadlines[0][0] - self.clock())
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Metrics
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregation counters."""
+        pending = sum(1 for entry in self._open.values() if entry[1] is not None)
+        return {
+            "window_seconds": self.window_seconds,
+            "open_windows": len(self._open),
+            "pending_incidents": pending,
+            "signals_received": self.received,
+            "incidents_released": self.released,
+            "signals_folded": self.received - self.released - pending,
+        }
@@ -0,0 +1,461 @@
+"""
+SQLite Storage Backend for Arxis SOC
+
+Durable alternative to the in-memory ArxisStorage with the same method
+surface. Logs, signals and alerts live in a single SQLite database in WAL
+mode, so history survives restarts without being held in RAM. The logs
+table keeps the most recent `log_retention` rows; older logs are pruned in
+batches as new ones arrive.
+
+Enable with ARXIS_STORAGE_BACKEND=sqlite.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import List, Dict, Any, Optional, Iterable
+from models import SecurityLog, DetectionSignal, Alert, Severity
+from alert_index import parse_timestamp, AlertKey
+from alert_journal import AlertJournal
+from metrics_rollup import MetricsRollup
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id          INTEGER PRIMARY KEY,
+    timestamp   TEXT NOT NULL,
+    user        TEXT NOT NULL,
+    event_type  TEXT NOT NULL,
+    ip          TEXT NOT NULL,
+    location    TEXT NOT NULL,
+    asset       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_logs_user ON logs (user, id);
+
+CREATE TABLE IF NOT EXISTS signals (
+    id          INTEGER PRIMARY KEY,
+    signal_id   TEXT NOT NULL UNIQUE,
+    signal_type TEXT NOT NULL,
+    user        TEXT NOT NULL,
+    severity    TEXT NOT NULL,
+    detected_at TEXT NOT NULL,
+    processed   INTEGER NOT NULL DEFAULT 0,
+    body        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_pending ON signals (id) WHERE processed = 0;
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id          INTEGER PRIMARY KEY,
+    alert_id    TEXT NOT NULL UNIQUE,
+    timestamp   TEXT NOT NULL,
+    epoch       REAL,
+    user        TEXT NOT NULL,
+    threat_type TEXT NOT NULL,
+    severity    TEXT NOT NULL,
+    body        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts (severity, id);
+CREATE INDEX IF NOT EXISTS idx_alerts_user ON alerts (user, id);
+CREATE INDEX IF NOT EXISTS idx_alerts_threat_type ON alerts (threat_type, id);
+CREATE INDEX IF NOT EXISTS idx_alerts_epoch ON alerts (epoch);
+CREATE INDEX IF NOT EXISTS idx_alerts_key ON alerts (COALESCE(epoch, 0), alert_id);
+"""
+
+# Statements are kept as constants so sqlite3's statement cache reuses the
+# prepared form on every call
+INSERT_LOG = (
+    "INSERT INTO logs (timestamp, user, event_type, ip, location, asset) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_SIGNAL = (
+    "INSERT OR IGNORE INTO signals (signal_id, signal_type, user, severity, detected_at, body) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_ALERT = (
+    "INSERT OR REPLACE INTO alerts (alert_id, timestamp, epoch, user, threat_type, severity, body) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+PRUNE_LOGS = "DELETE FROM logs WHERE id <= (SELECT MAX(id) FROM logs) - ?"
+
+LOG_COLUMNS = ("timestamp", "user", "event_type", "ip", "location", "asset")
+
+
+class SQLiteStorage:
+    """
+    SQLite-backed storage (WAL mode) with the ArxisStorage interface.
+
+    Args:
+        db_path: Database file
+        import_alerts_from: Data directory of the memory backend; its alert
+            snapshot and journal seed an empty alerts table
+        log_retention: Most recent logs to keep (0 = keep every log)
+    """
+
+    # Logs survive a restart, so a checkpoint's log cursor can be replayed
+    persistent_logs = True
+
+    def __init__(
+        self,
+        db_path: str = "data/arxis.db",
+        import_alerts_from: Optional[str] = None,
+        log_retention: int = 1_000_000
+    ):
+        self.db_path = Path(db_path)
+        self.log_retention = log_retention
+        # Prune once this many logs arrived since the last prune, so the
+        # table holds at most ~10% more than log_retention rows
+        self._prune_every = max(1000, log_retention // 10)
+        self._logs_since_prune = self._prune_every
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            cached_statements=128
+        )
+        self._conn.row_factory = sqlite3.Row
+
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        # Thread safety: one connection shared across threads
+        self._lock = Lock()
+
+        if import_alerts_from:
+            self._import_alerts(Path(import_alerts_from))
+
+        # Running metrics, seeded once from the tables and read without queries
+        self.rollup = MetricsRollup()
+        self._seed_rollup()
+
+        print(f"✅ SQLite storage ready at {self.db_path} ({self.get_alert_count()} alerts)")
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Logs
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def add_log(self, log: SecurityLog) -> None:
+        """Add a security log."""
+        self.add_logs([log])
+
+    def add_logs(self, logs: List[SecurityLog]) -> None:
+        """Add a batch of security logs in a single transaction."""
+        rows = [
+            (log.timestamp, log.user, _enum_value(log.event_type), log.ip, log.location, log.asset)
+            for log in logs
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(INSERT_LOG, rows)
+            if self.log_retention > 0:
+                self._logs_since_prune += len(rows)
+                if self._logs_since_prune >= self._prune_every:
+                    self._conn.execute(PRUNE_LOGS, (self.log_retention,))
+                    self._logs_since_prune = 0
+        self.rollup.record_logs(len(rows))
+
+    def get_recent_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get most recent logs."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM (SELECT * FROM logs ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (limit,)
+            ).fetchall()
+        return [_log_row(row) for row in rows]
+
+    def get_log_cursor(self) -> int:
+        """Ingestion sequence number (row id) of the latest stored log."""
+        return self._count("SELECT COALESCE(MAX(id), 0) FROM logs")
+
+    def get_logs_after(self, cursor: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Most recent logs stored after `cursor` (ingestion order), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM (SELECT * FROM logs WHERE id > ? ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (cursor, limit)
+            ).fetchall()
+        return [_log_row(row) for row in rows]
+
+    def get_logs_for_user(self, user: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get logs for a specific user."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM (SELECT * FROM logs WHERE user = ? ORDER BY id DESC LIMIT ?) "
+                "ORDER BY id",
+                (user, limit)
+            ).fetchall()
+        return [_log_row(row) for row in rows]
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Detection Signals
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def add_signal(self, signal: DetectionSignal) -> None:
+        """Add a detection signal."""
+        self.add_signals([signal])
+
+    def add_signals(self, signals: List[DetectionSignal]) -> None:
+        """Add a batch of detection signals in a single transaction."""
+        if not signals:
+            return
+        rows = []
+        for signal in signals:
+            body = signal.model_dump(mode="json")
+            rows.append((
+                signal.signal_id,
+                body["signal_type"],
+                signal.user,
+                body["severity"],
+                signal.detected_at,
+                json.dumps(body)
+            ))
+        with self._lock, self._conn:
+            inserted = self._conn.executemany(INSERT_SIGNAL, rows).rowcount
+        self.rollup.record_signals(inserted)
+
+    def get_pending_signals(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get signals not yet processed by agents, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body FROM signals WHERE processed = 0 ORDER BY id LIMIT ?",
+                (-1 if limit is None else limit,)
+            ).fetchall()
+        return [json.loads(row["body"]) for row in rows]
+
+    def mark_signal_processed(self, signal_id: str) -> None:
+        """Mark a signal as processed."""
+        with self._lock, self._conn:
+            retired = self._conn.execute(
+                "UPDATE signals SET processed = 1 WHERE signal_id = ? AND processed = 0",
+                (signal_id,)
+            ).rowcount
+        if retired:
+            self.rollup.record_processed(retired)
+
+    def get_signal_count(self) -> int:
+        """Get the total number of signals ever stored."""
+        return self._count("SELECT COUNT(*) FROM signals")
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Alerts
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def add_alert(self, alert: Alert) -> None:
+        """Add a finalized alert."""
+        record = alert.model_dump(mode="json")
+        with self._lock, self._conn:
+            self._conn.execute(INSERT_ALERT, _alert_row(record))
+        self.rollup.record_alert(record)
+
+    def get_all_alerts(self) -> List[Dict[str, Any]]:
+        """Get all alerts."""
+        return self._alerts("SELECT body FROM alerts ORDER BY id")
+
+    def get_recent_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the most recent alerts, oldest first."""
+        return self._alerts(
+            "SELECT body FROM (SELECT id, body FROM alerts ORDER BY id DESC LIMIT ?) ORDER BY id",
+            (limit,)
+        )
+
+    def get_alert_count(self) -> int:
+        """Get the total number of alerts."""
+        return self._count("SELECT COUNT(*) FROM alerts")
+
+    def get_alert_by_id(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific alert by ID."""
+        alerts = self._alerts("SELECT body FROM alerts WHERE alert_id = ?", (alert_id,))
+        return alerts[0] if alerts else None
+
+    def get_alerts_by_severity(
+        self,
+        severity: Severity,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get alerts filtered by severity."""
+        return self._filtered_alerts("severity", severity.value, limit)
+
+    def get_alerts_for_user(self, user: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get alerts raised for a specific user."""
+        return self._filtered_alerts("user", user, limit)
+
+    def get_alerts_by_threat_type(
+        self,
+        threat_type: str,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get alerts of a specific threat type."""
+        return self._filtered_alerts("threat_type", threat_type, limit)
+
+    def query_alerts(
+        self,
+        limit: int = 100,
+        before: Optional[AlertKey] = None,
+        after: Optional[AlertKey] = None,
+        severity: Optional[Severity] = None,
+        user: Optional[str] = None,
+        threat_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one keyset page of alerts, newest first.
+        
+        `before`/`after` are (epoch, alert_id) keys of the page boundary
+        (see alert_index.encode_cursor); filters combine with AND.
+        """
+        if limit <= 0:
+            return []
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("severity", severity.value if severity else None),
+                              ("user", user), ("threat_type", threat_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("COALESCE(epoch, 0) >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("COALESCE(epoch, 0) < ?")
+            params.append(end.timestamp())
+        if before is not None:
+            clauses.append("(COALESCE(epoch, 0), alert_id) < (?, ?)")
+            params.extend(before)
+        if after is not None:
+            clauses.append("(COALESCE(epoch, 0), alert_id) > (?, ?)")
+            params.extend(after)
+
+        # Newer page: take the oldest `limit` past the cursor, then flip
+        forward = after is not None and before is None
+        direction = "ASC" if forward else "DESC"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        alerts = self._alerts(
+            f"SELECT body FROM alerts {where} "
+            f"ORDER BY COALESCE(epoch, 0) {direction}, alert_id {direction} LIMIT ?",
+            (*params, limit)
+        )
+        if forward:
+            alerts.reverse()
+        return alerts
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Metrics
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """System metrics from the running counters (no queries)."""
+        return {
+            "total_logs": self.rollup.total_logs,
+            "total_alerts": self.rollup.total_alerts,
+            "alerts_by_severity": self.rollup.severity_counts(severity.value for severity in Severity),
+            "recent_activity": self.rollup.recent_alerts(10)
+        }
+
+    def get_rollups(self, buckets: int = 60) -> Dict[str, Any]:
+        """Per-minute rate series and top breakdowns (see MetricsRollup.rollups)."""
+        return self.rollup.rollups(buckets)
+
+    def _seed_rollup(self) -> None:
+        """Load existing totals into the rollup (once, at startup)."""
+        with self._lock:
+            alert_counts = [
+                (row["severity"], row["threat_type"], row["user"], row["n"])
+                for row in self._conn.execute(
+                    "SELECT severity, threat_type, user, COUNT(*) AS n FROM alerts "
+                    "GROUP BY severity, threat_type, user"
+                )
+            ]
+            pending = self._conn.execute(
+                "SELECT COUNT(*) FROM signals WHERE processed = 0"
+            ).fetchone()[0]
+        self.rollup.seed(
+            logs=self._count("SELECT COUNT(*) FROM logs"),
+            signals=self.get_signal_count(),
+            pending_signals=pending,
+            alert_counts=alert_counts,
+            recent_alerts=self.get_recent_alerts(20)
+        )
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Persistence
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def flush(self) -> None:
+        """Checkpoint the WAL into the main database file."""
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except sqlite3.Error as e:
+                print(f"⚠️  Failed to checkpoint SQLite WAL: {e}")
+
+    def clear_all(self) -> None:
+        """Clear all data (for testing)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM logs")
+            self._conn.execute("DELETE FROM signals")
+            self._conn.execute("DELETE FROM alerts")
+        self.rollup.clear()
+
+    def _import_alerts(self, data_dir: Path) -> None:
+        """Seed an empty alerts table from the memory backend's snapshot + journal."""
+        if self.get_alert_count():
+            return
+        try:
+            records = AlertJournal(data_dir).load()
+            if not records:
+                return
+            with self._lock, self._conn:
+                self._conn.executemany(INSERT_ALERT, (_alert_row(record) for record in records))
+            print(f"✅ Imported {len(records)} alerts from {data_dir}")
+        except Exception as e:
+            print(f"⚠️  Failed to import alerts: {e}")
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Internals
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _count(self, sql: str) -> int:
+        with self._lock:
+            return self._conn.execute(sql).fetchone()[0]
+
+    def _alerts(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        return [json.loads(row["body"]) for row in rows]
+
+    def _filtered_alerts(self, column: str, value: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        # `column` is always one of our own indexed column names, never user input
+        if limit is None:
+            return self._alerts(f"SELECT body FROM alerts WHERE {column} = ? ORDER BY id", (value,))
+        return self._alerts(
+            f"SELECT body FROM (SELECT id, body FROM alerts WHERE {column} = ? "
+            f"ORDER BY id DESC LIMIT ?) ORDER BY id",
+            (value, limit)
+        )
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _log_row(row: sqlite3.Row) -> Dict[str, Any]:
+    return {column: row[column] for column in LOG_COLUMNS}
+
+
+def _alert_row(record: Dict[str, Any]) -> tuple:
+    return (
+        record["alert_id"],
+        record["timestamp"],
+        parse_timestamp(record["timestamp"]),
+        record["user"],
+        record["threat_type"],
+        _enum_value(record["severity"]),
+        json.dumps(record)
+    )
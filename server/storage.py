@@ -1,28 +1,56 @@
 """
 In-Memory Storage for Arxis SOC POC
 
-Simple, elegant in-memory storage with JSON persistence.
+Simple, elegant in-memory storage with append-only JSON persistence.
 """
 
-import json
+import os
+from itertools import islice
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 from models import SecurityLog, DetectionSignal, Alert, Severity
+from alert_journal import AlertJournal
+from alert_index import AlertIndex, AlertKey
+from log_store import LogRingBuffer
+from metrics_rollup import MetricsRollup
 from threading import Lock
 
 
 class ArxisStorage:
     """Thread-safe in-memory storage with optional JSON persistence."""
     
-    def __init__(self, data_dir: str = "data"):
+    # Logs live only in the ring buffer and do not survive a restart
+    persistent_logs = False
+    
+    def __init__(
+        self,
+        data_dir: str = "data",
+        log_capacity: int = 1000,
+        fsync_every: int = 1,
+        fsync_interval: float = 0.0,
+        compact_min_entries: int = 1000
+    ):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
+        # Alert persistence: snapshot + append-only journal
+        self._journal = AlertJournal(
+            self.data_dir,
+            fsync_every=fsync_every,
+            fsync_interval=fsync_interval,
+            compact_min_entries=compact_min_entries
+        )
+        
         # In-memory stores
-        self.logs: List[Dict[str, Any]] = []
-        self.signals: List[Dict[str, Any]] = []
-        self.alerts: List[Dict[str, Any]] = []
+        self.logs = LogRingBuffer(log_capacity)
+        # Pending signals keyed by id; processed signals are retired, not kept
+        self.pending_signals: Dict[str, Dict[str, Any]] = {}
+        self.signal_count = 0
+        self.alerts = AlertIndex()
+        
+        # Running metrics, read without taking the storage lock
+        self.rollup = MetricsRollup()
         
         # Thread safety
         self._lock = Lock()
@@ -35,23 +63,38 @@ class ArxisStorage:
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
     def add_log(self, log: SecurityLog) -> None:
-        """Add a security log."""
+        """Add a security log (oldest logs are overwritten once at capacity)."""
+        with self._lock:
+            self.logs.append(log)
+        self.rollup.record_logs(1)
+    
+    def add_logs(self, logs: List[SecurityLog]) -> None:
+        """Add a batch of security logs under a single lock acquire."""
         with self._lock:
-            self.logs.append(log.model_dump())
-            # Keep only last 1000 logs to prevent memory overflow
-            if len(self.logs) > 1000:
-                self.logs = self.logs[-1000:]
+            append = self.logs.append
+            for log in logs:
+                append(log)
+        self.rollup.record_logs(len(logs))
     
     def get_recent_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get most recent logs."""
         with self._lock:
-            return self.logs[-limit:]
+            return self.logs.recent(limit)
+    
+    def get_log_cursor(self) -> int:
+        """Ingestion sequence number of the latest stored log."""
+        with self._lock:
+            return self.logs.cursor
+    
+    def get_logs_after(self, cursor: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Most recent logs stored after `cursor` (ingestion order), oldest first."""
+        with self._lock:
+            return self.logs.after(cursor, limit)
     
     def get_logs_for_user(self, user: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get logs for a specific user."""
         with self._lock:
-            user_logs = [log for log in self.logs if log["user"] == user]
-            return user_logs[-limit:]
+            return self.logs.for_user(user, limit)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Detection Signals
@@ -59,21 +102,35 @@ class ArxisStorage:
     
     def add_signal(self, signal: DetectionSignal) -> None:
         """Add a detection signal."""
+        self.add_signals([signal])
+    
+    def add_signals(self, signals: List[DetectionSignal]) -> None:
+        """Add a batch of detection signals."""
+        if not signals:
+            return
+        dumped = [signal.model_dump() for signal in signals]
         with self._lock:
-            self.signals.append(signal.model_dump())
+            for signal in dumped:
+                self.pending_signals[signal["signal_id"]] = signal
+            self.signal_count += len(dumped)
+        self.rollup.record_signals(len(dumped))
     
-    def get_pending_signals(self) -> List[Dict[str, Any]]:
-        """Get signals not yet processed by agents."""
+    def get_pending_signals(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get signals not yet processed by agents, oldest first."""
         with self._lock:
-            return [s for s in self.signals if not s.get("processed", False)]
+            return list(islice(self.pending_signals.values(), limit))
     
     def mark_signal_processed(self, signal_id: str) -> None:
-        """Mark a signal as processed."""
+        """Mark a signal as processed, retiring it from the pending set."""
+        with self._lock:
+            retired = self.pending_signals.pop(signal_id, None)
+        if retired is not None:
+            self.rollup.record_processed()
+    
+    def get_signal_count(self) -> int:
+        """Get the total number of signals ever stored."""
         with self._lock:
-            for signal in self.signals:
-                if signal["signal_id"] == signal_id:
-                    signal["processed"] = True
-                    break
+            return self.signal_count
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Alerts
@@ -82,89 +139,174 @@ class ArxisStorage:
     def add_alert(self, alert: Alert) -> None:
         """Add a finalized alert."""
         with self._lock:
-            self.alerts.append(alert.model_dump())
-            self._persist_to_disk()
+            record = alert.model_dump()
+            self.alerts.add(record)
+            self._persist_alert(record)
+        self.rollup.record_alert(record)
     
     def get_all_alerts(self) -> List[Dict[str, Any]]:
         """Get all alerts."""
         with self._lock:
-            return self.alerts.copy()
+            return self.alerts.recent()
+    
+    def get_recent_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the most recent alerts, oldest first."""
+        with self._lock:
+            return self.alerts.recent(limit)
+    
+    def get_alert_count(self) -> int:
+        """Get the total number of alerts."""
+        with self._lock:
+            return len(self.alerts)
     
     def get_alert_by_id(self, alert_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific alert by ID."""
         with self._lock:
-            for alert in self.alerts:
-                if alert["alert_id"] == alert_id:
-                    return alert.copy()
-            return None
+            alert = self.alerts.get(alert_id)
+            return alert.copy() if alert else None
     
-    def get_alerts_by_severity(self, severity: Severity) -> List[Dict[str, Any]]:
+    def get_alerts_by_severity(
+        self,
+        severity: Severity,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """Get alerts filtered by severity."""
         with self._lock:
-            return [a for a in self.alerts if a["severity"] == severity.value]
+            return self.alerts.with_severity(severity.value, limit)
+    
+    def get_alerts_for_user(self, user: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get alerts raised for a specific user."""
+        with self._lock:
+            return self.alerts.for_user(user, limit)
+    
+    def get_alerts_by_threat_type(
+        self,
+        threat_type: str,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get alerts of a specific threat type."""
+        with self._lock:
+            return self.alerts.with_threat_type(threat_type, limit)
+    
+    def query_alerts(
+        self,
+        limit: int = 100,
+        before: Optional[AlertKey] = None,
+        after: Optional[AlertKey] = None,
+        severity: Optional[Severity] = None,
+        user: Optional[str] = None,
+        threat_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one keyset page of alerts, newest first.
+        
+        `before`/`after` are (epoch, alert_id) keys of the page boundary
+        (see alert_index.encode_cursor); filters combine with AND.
+        """
+        with self._lock:
+            return self.alerts.page(
+                limit,
+                before=before,
+                after=after,
+                severity=severity.value if severity else None,
+                user=user,
+                threat_type=threat_type,
+                start=start.timestamp() if start else None,
+                end=end.timestamp() if end else None
+            )
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Metrics
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Calculate system metrics."""
-        with self._lock:
-            # Count alerts by severity
-            severity_counts = {
-                "LOW": 0,
-                "MEDIUM": 0,
-                "HIGH": 0,
-                "CRITICAL": 0
-            }
-            
-            for alert in self.alerts:
-                severity = alert["severity"]
-                if severity in severity_counts:
-                    severity_counts[severity] += 1
-            
-            # Recent activity (last 10 alerts)
-            recent = self.alerts[-10:] if len(self.alerts) >= 10 else self.alerts
-            
-            return {
-                "total_logs": len(self.logs),
-                "total_alerts": len(self.alerts),
-                "alerts_by_severity": severity_counts,
-                "recent_activity": recent
-            }
+        """System metrics from the running counters (no storage lock)."""
+        return {
+            "total_logs": self.rollup.total_logs,
+            "total_alerts": self.rollup.total_alerts,
+            "alerts_by_severity": self.rollup.severity_counts(severity.value for severity in Severity),
+            "recent_activity": self.rollup.recent_alerts(10)
+        }
+    
+    def get_rollups(self, buckets: int = 60) -> Dict[str, Any]:
+        """Per-minute rate series and top breakdowns (see MetricsRollup.rollups)."""
+        return self.rollup.rollups(buckets)
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Persistence
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
-    def _persist_to_disk(self) -> None:
-        """Persist alerts to disk."""
-        alerts_file = self.data_dir / "alerts.json"
+    def _persist_alert(self, record: Dict[str, Any]) -> None:
+        """Append an alert to the journal, compacting when it grows large."""
         try:
-            with open(alerts_file, "w") as f:
-                json.dump(self.alerts, f, indent=2)
+            self._journal.append(record)
+            if self._journal.needs_compaction():
+                self._journal.compact(self.alerts.records)
         except Exception as e:
-            print(f"⚠️  Failed to persist alerts: {e}")
+            print(f"⚠️  Failed to persist alert: {e}")
     
     def _load_from_disk(self) -> None:
-        """Load alerts from disk on startup."""
-        alerts_file = self.data_dir / "alerts.json"
-        if alerts_file.exists():
+        """Load alerts from the snapshot plus journal tail on startup."""
+        try:
+            self.alerts = AlertIndex(self._journal.load())
+            for record in self.alerts.records:
+                self.rollup.record_alert(record, at=self.alerts.keys[record["alert_id"]][0])
+            print(f"✅ Loaded {len(self.alerts)} alerts from disk")
+            if self._journal.needs_compaction():
+                self._journal.compact(self.alerts.records)
+        except Exception as e:
+            print(f"⚠️  Failed to load alerts: {e}")
+    
+    def flush(self) -> None:
+        """Force any batched alert writes to disk."""
+        with self._lock:
             try:
-                with open(alerts_file, "r") as f:
-                    self.alerts = json.load(f)
-                print(f"✅ Loaded {len(self.alerts)} alerts from disk")
+                self._journal.sync()
             except Exception as e:
-                print(f"⚠️  Failed to load alerts: {e}")
+                print(f"⚠️  Failed to flush alerts: {e}")
     
     def clear_all(self) -> None:
         """Clear all data (for testing)."""
         with self._lock:
             self.logs.clear()
-            self.signals.clear()
+            self.pending_signals.clear()
+            self.signal_count = 0
             self.alerts.clear()
-            self._persist_to_disk()
+            self._journal.reset()
+            self.rollup.clear()
+
+
+def create_storage():
+    """
+    Build the storage backend selected by ARXIS_STORAGE_BACKEND.
+    
+    - memory (default): in-memory stores with append-only alert persistence
+    - sqlite: durable SQLite database in WAL mode (see sqlite_storage.py)
+    """
+    backend = os.getenv("ARXIS_STORAGE_BACKEND", "memory").lower()
+    data_dir = os.getenv("ARXIS_DATA_DIR", "data")
+    
+    if backend == "sqlite":
+        from sqlite_storage import SQLiteStorage
+        return SQLiteStorage(
+            db_path=os.getenv("ARXIS_SQLITE_PATH", str(Path(data_dir) / "arxis.db")),
+            import_alerts_from=data_dir,
+            log_retention=int(os.getenv("ARXIS_SQLITE_LOG_RETENTION", "1000000"))
+        )
+    
+    if backend != "memory":
+        raise ValueError(f"Unknown ARXIS_STORAGE_BACKEND: {backend}")
+    
+    return ArxisStorage(
+        data_dir=data_dir,
+        log_capacity=int(os.getenv("ARXIS_LOG_CAPACITY", "1000")),
+        fsync_every=int(os.getenv("ARXIS_ALERT_FSYNC_EVERY", "1")),
+        fsync_interval=float(os.getenv("ARXIS_ALERT_FSYNC_INTERVAL", "0")),
+        compact_min_entries=int(os.getenv("ARXIS_ALERT_COMPACT_MIN", "1000"))
+    )
 
 
 # Global storage instance
-storage = ArxisStorage()
+storage = create_storage()